@@ -1,3 +1,27 @@
 from django.conf import settings
 
 CT_PINGER_VALID_STATES = getattr(settings, 'CT_PINGER_VALID_STATES', ["Member"])
+
+CT_PINGER_CONDITIONAL_REQUESTS = getattr(settings, 'CT_PINGER_CONDITIONAL_REQUESTS', True)
+
+CT_PINGER_ASYNC_FETCH = getattr(settings, 'CT_PINGER_ASYNC_FETCH', False)
+
+CT_PINGER_ASYNC_FETCH_CONCURRENCY = getattr(settings, 'CT_PINGER_ASYNC_FETCH_CONCURRENCY', 50)
+
+CT_PINGER_PIPELINE_MODE = getattr(settings, 'CT_PINGER_PIPELINE_MODE', "celery")
+
+CT_PINGER_SHARDING = getattr(settings, 'CT_PINGER_SHARDING', False)
+
+CT_PINGER_SHARD_QUEUE = getattr(settings, 'CT_PINGER_SHARD_QUEUE', "pingbot")
+
+CT_PINGER_PARALLEL_PARSE_THRESHOLD = getattr(settings, 'CT_PINGER_PARALLEL_PARSE_THRESHOLD', 250)
+
+CT_PINGER_PARALLEL_PARSE_WORKERS = getattr(settings, 'CT_PINGER_PARALLEL_PARSE_WORKERS', None)
+
+CT_PINGER_DELIVERY_POOL_SIZE = getattr(settings, 'CT_PINGER_DELIVERY_POOL_SIZE', 10)
+
+CT_PINGER_DELIVERY_TIMEOUT = getattr(settings, 'CT_PINGER_DELIVERY_TIMEOUT', 15)
+
+CT_PINGER_DELIVERY_HTTP2 = getattr(settings, 'CT_PINGER_DELIVERY_HTTP2', False)
+
+CT_PINGER_GLOBAL_RATE_LIMIT = getattr(settings, 'CT_PINGER_GLOBAL_RATE_LIMIT', 50)
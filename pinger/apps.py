@@ -7,3 +7,6 @@ class PingerConfig(AppConfig):
     label = 'pinger'
 
     verbose_name = f"Pinger v{__version__}"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,67 @@
+"""
+Index of notifications that have already been handled.
+
+A redis sorted set of notification ids scored by the notification timestamp.
+Anything older than the window is trimmed, so lookups stay the same cost no
+matter how big the Ping table gets.
+"""
+import datetime
+import time
+
+from django.utils import timezone
+
+from .providers import cache_client
+
+SEEN_KEY = "ct-pinger-seen-notifications"
+
+# notifications older than LOOK_BACK_HOURS are ignored anyway, keep a day extra.
+SEEN_WINDOW_SECONDS = (6 + 24) * 60 * 60
+
+
+def _to_epoch(timestamp):
+    if isinstance(timestamp, datetime.datetime):
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
+def _warm():
+    """Seed the index from recent pings if redis has lost it."""
+    from .models import Ping
+
+    cutoff = timezone.now() - datetime.timedelta(seconds=SEEN_WINDOW_SECONDS)
+    recent = Ping.objects.filter(time__gte=cutoff, notification_id__gt=0).values_list(
+        "notification_id", "time"
+    )
+    mapping = {str(nid): _to_epoch(t) for nid, t in recent}
+    if mapping:
+        cache_client.zadd(SEEN_KEY, mapping)
+
+
+def get_seen(notification_ids):
+    """Returns the subset of `notification_ids` that have been handled already."""
+    notification_ids = list(notification_ids)
+    if not notification_ids:
+        return set()
+
+    if not cache_client.exists(SEEN_KEY):
+        _warm()
+
+    pipe = cache_client.pipeline()
+    for nid in notification_ids:
+        pipe.zscore(SEEN_KEY, str(nid))
+    scores = pipe.execute()
+    return {nid for nid, score in zip(notification_ids, scores) if score is not None}
+
+
+def mark_seen(notifications):
+    """Add `{notification_id: timestamp}` to the index and trim old entries."""
+    if not notifications:
+        return
+    pipe = cache_client.pipeline()
+    pipe.zadd(SEEN_KEY, {str(nid): _to_epoch(ts) for nid, ts in notifications.items()})
+    pipe.zremrangebyscore(SEEN_KEY, "-inf", time.time() - SEEN_WINDOW_SECONDS)
+    pipe.execute()
+
+
+def get_index_size():
+    return cache_client.zcard(SEEN_KEY)
@@ -0,0 +1,111 @@
+"""
+HTTP client for discord webhooks.
+
+Every process keeps one pooled client so pings reuse their keep-alive
+connections to discord instead of a new TCP and TLS handshake each. The
+client is a `requests.Session`, or an `httpx.Client` when HTTP/2 is enabled.
+
+Clients are never shared over a fork, a child process that finds a client
+created by its parent starts its own.
+"""
+import logging
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from django.conf import settings
+
+from . import __title__, __version__
+from .app_settings import (
+    CT_PINGER_DELIVERY_HTTP2, CT_PINGER_DELIVERY_POOL_SIZE,
+    CT_PINGER_DELIVERY_TIMEOUT,
+)
+
+try:
+    import httpx
+except ModuleNotFoundError:  # pragma: no cover
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 5
+
+_lock = threading.Lock()
+_client = None
+_pid = None
+
+
+def _user_agent():
+    contact = getattr(settings, "ESI_USER_CONTACT_EMAIL", "")
+    return f"{__title__.replace(' ', '')}/{__version__} ({contact})"
+
+
+def _headers():
+    return {"Content-Type": "application/json", "User-Agent": _user_agent()}
+
+
+def _build_client():
+    if CT_PINGER_DELIVERY_HTTP2:
+        if httpx is None:
+            logger.warning("PINGER: httpx is not installed, webhooks fall back to HTTP/1.1")
+        else:
+            return httpx.Client(
+                http2=True,
+                headers=_headers(),
+                timeout=httpx.Timeout(CT_PINGER_DELIVERY_TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=CT_PINGER_DELIVERY_POOL_SIZE,
+                    max_keepalive_connections=CT_PINGER_DELIVERY_POOL_SIZE,
+                ),
+            )
+
+    session = requests.Session()
+    session.headers.update(_headers())
+    adapter = HTTPAdapter(
+        pool_connections=CT_PINGER_DELIVERY_POOL_SIZE,
+        pool_maxsize=CT_PINGER_DELIVERY_POOL_SIZE,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _reset():
+    global _client, _pid
+    _client = None
+    _pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    # don't let a prefork child write to its parent's sockets
+    os.register_at_fork(after_in_child=_reset)
+
+
+def get_client():
+    global _client, _pid
+    pid = os.getpid()
+    if _client is None or _pid != pid:
+        with _lock:
+            if _client is None or _pid != pid:
+                _client = _build_client()
+                _pid = pid
+    return _client
+
+
+def close():
+    """Close this process's client, eg on worker shutdown."""
+    with _lock:
+        if _client is not None and _pid == os.getpid():
+            _client.close()
+        _reset()
+
+
+def post_webhook(url, payload):
+    """POST a JSON `payload` string to a webhook, returns the response."""
+    client = get_client()
+    if isinstance(client, requests.Session):
+        timeout = (CONNECT_TIMEOUT, CT_PINGER_DELIVERY_TIMEOUT)
+        return client.post(url, data=payload, params={"wait": True}, timeout=timeout)
+    return client.post(url, content=payload, params={"wait": True})
@@ -2,3 +2,9 @@
 
 class MutedException(Exception):
     pass
+
+
+class WebhookCooloff(Exception):
+    def __init__(self, countdown):
+        super().__init__(countdown)
+        self.countdown = countdown
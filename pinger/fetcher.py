@@ -0,0 +1,166 @@
+"""
+Concurrent notification fetcher.
+
+Pulls the notification endpoint for many characters from a single event loop
+so one worker can keep hundreds of corporations up to date.
+"""
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+
+from . import __title__, __version__, governor
+
+try:
+    import httpx
+except ModuleNotFoundError:  # pragma: no cover
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+ESI_BASE_URL = "https://esi.evetech.net/latest"
+ESI_NOTIFICATIONS_PATH = "/characters/{character_id}/notifications/"
+
+
+def fetcher_available():
+    return httpx is not None
+
+
+def _user_agent():
+    contact = getattr(settings, "ESI_USER_CONTACT_EMAIL", "")
+    return f"{__title__.replace(' ', '')}/{__version__} ({contact})"
+
+
+class FetchJob:
+    # Request
+    corporation_id = None
+    character_id = None
+    access_token = None
+    etag = ""
+
+    # Response
+    sent = False
+    status = None
+    headers = None
+    notifications = None
+    error = None
+    latency = None
+
+    def __init__(self, corporation_id, character_id, access_token, etag=""):
+        self.corporation_id = corporation_id
+        self.character_id = character_id
+        self.access_token = access_token
+        self.etag = etag
+        self.headers = {}
+        self.notifications = []
+
+    @property
+    def not_modified(self):
+        return self.status == 304
+
+    @property
+    def ok(self):
+        return self.status in (200, 304)
+
+
+class _ErrorBudget:
+    """Tracks the ESI error limit inside one batch, seeded from the shared budget."""
+
+    def __init__(self):
+        self.remain, self.reset = governor.get_budget()
+        self.headers = None
+
+    def update(self, headers):
+        remain, reset = governor.read_headers(headers)
+        if remain is None:
+            return
+        if self.remain is None or remain <= self.remain:
+            self.remain = remain
+            self.reset = reset
+            self.headers = headers
+
+    @property
+    def exhausted(self):
+        return self.remain is not None and self.remain <= governor.PAUSE_THRESHOLD
+
+
+def _parse_notifications(data):
+    # match what bravado gives us so the rest of the pipeline is the same
+    for n in data:
+        if isinstance(n.get("timestamp"), str):
+            n["timestamp"] = parse_datetime(n["timestamp"])
+    return data
+
+
+async def _fetch_one(client, semaphore, budget, job):
+    async with semaphore:
+        if budget.exhausted:
+            return job
+
+        headers = {"Authorization": f"Bearer {job.access_token}"}
+        if job.etag:
+            headers["If-None-Match"] = job.etag
+
+        job.sent = True
+        start = time.perf_counter()
+        try:
+            response = await client.get(
+                ESI_NOTIFICATIONS_PATH.format(character_id=job.character_id),
+                headers=headers,
+                params={"datasource": "tranquility"},
+            )
+        except httpx.HTTPError as e:
+            job.error = str(e)
+            logger.warning(f"PINGER: ASYNC {job.character_id} Request failed {e}")
+            return job
+
+        job.status = response.status_code
+        job.headers = response.headers
+        budget.update(response.headers)
+
+        if response.status_code == 200:
+            job.notifications = _parse_notifications(response.json())
+        elif response.status_code != 304:
+            job.error = response.text
+
+        job.latency = time.perf_counter() - start
+        logger.debug(
+            f"PINGER: ASYNC {job.character_id} {job.status} in {job.latency:.3f}s"
+        )
+        return job
+
+
+async def _fetch_all(jobs, concurrency, timeout):
+    semaphore = asyncio.Semaphore(concurrency)
+    budget = _ErrorBudget()
+    async with httpx.AsyncClient(
+        base_url=ESI_BASE_URL,
+        headers={"User-Agent": _user_agent()},
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=concurrency),
+    ) as client:
+        await asyncio.gather(
+            *[_fetch_one(client, semaphore, budget, job) for job in jobs]
+        )
+    if budget.headers is not None:
+        # share the lowest budget we saw with everyone else
+        governor.update_from_headers(budget.headers)
+    return jobs
+
+
+def fetch_notifications(jobs, concurrency=50, timeout=30):
+    """
+    Fetch notifications for every `FetchJob` concurrently.
+
+    Results are written onto the jobs themselves. Jobs that could not be sent
+    because the error budget ran out are returned with `sent` still `False`.
+    """
+    if not fetcher_available():
+        raise RuntimeError("httpx is required for the async notification fetcher")
+
+    if not jobs:
+        return jobs
+
+    return asyncio.run(_fetch_all(jobs, concurrency, timeout))
@@ -0,0 +1,106 @@
+"""
+Shared ESI error budget.
+
+Every ESI response carries `X-ESI-Error-Limit-Remain` and
+`X-ESI-Error-Limit-Reset`. The lowest remaining count seen in the current
+window is kept in redis so every worker can slow down before ESI starts
+answering with 420s.
+"""
+import time
+
+from .providers import cache_client
+
+BUDGET_KEY = "ct-pinger-esi-budget"
+
+# below this many errors left requests get spread over the rest of the window
+SLOW_THRESHOLD = 50
+# at or below this many errors left nothing is sent until the window resets
+PAUSE_THRESHOLD = 20
+
+_UPDATE_SCRIPT = """
+local cur_remain = tonumber(redis.call('HGET', KEYS[1], 'remain'))
+local cur_reset = tonumber(redis.call('HGET', KEYS[1], 'reset_at'))
+local remain = tonumber(ARGV[1])
+local reset_at = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+if cur_remain == nil or cur_reset == nil or cur_reset <= now
+        or reset_at > cur_reset + 1 or remain < cur_remain then
+    redis.call('HSET', KEYS[1], 'remain', remain, 'reset_at', reset_at)
+    redis.call('EXPIREAT', KEYS[1], math.ceil(reset_at) + 1)
+end
+return 1
+"""
+
+_update = None
+
+
+def read_headers(headers):
+    try:
+        return (
+            int(headers.get("X-ESI-Error-Limit-Remain")),
+            int(headers.get("X-ESI-Error-Limit-Reset")),
+        )
+    except (AttributeError, TypeError, ValueError):
+        return None, None
+
+
+def update_from_headers(headers, now=None):
+    """Feed the budget from any ESI response headers."""
+    global _update
+    remain, reset = read_headers(headers)
+    if remain is None:
+        return
+
+    if _update is None:
+        _update = cache_client.register_script(_UPDATE_SCRIPT)
+
+    if now is None:
+        now = time.time()
+
+    _update(keys=[BUDGET_KEY], args=[remain, now + reset, now])
+
+
+def exhaust(reset, now=None):
+    """We got a 420, nothing left until the window resets."""
+    if now is None:
+        now = time.time()
+    update_from_headers(
+        {"X-ESI-Error-Limit-Remain": 0, "X-ESI-Error-Limit-Reset": reset}, now=now
+    )
+
+
+def get_budget(now=None):
+    """Returns `(remain, seconds_till_reset)`, `(None, 0)` when unknown."""
+    if now is None:
+        now = time.time()
+
+    budget = cache_client.hgetall(BUDGET_KEY)
+    if not budget:
+        return None, 0
+
+    reset_at = float(budget[b"reset_at"])
+    if reset_at <= now:
+        return None, 0
+
+    return int(budget[b"remain"]), reset_at - now
+
+
+def get_delay(now=None):
+    """How long a request should wait before being sent to ESI."""
+    remain, reset_in = get_budget(now=now)
+    if remain is None or remain >= SLOW_THRESHOLD:
+        return 0
+    if remain <= PAUSE_THRESHOLD:
+        return reset_in
+    # spread the remaining requests over what is left of the window
+    return reset_in * (SLOW_THRESHOLD - remain) / (SLOW_THRESHOLD - PAUSE_THRESHOLD) / 10
+
+
+def is_budget_paused(remain):
+    """Whether a `remain` from `get_budget()` is too low to send anything."""
+    return remain is not None and remain <= PAUSE_THRESHOLD
+
+
+def is_paused(now=None):
+    remain, _ = get_budget(now=now)
+    return is_budget_paused(remain)
@@ -0,0 +1,95 @@
+"""
+Per character health for the notification rotation.
+
+Tracks consecutive failures, the last success and recent request latency for
+each character. Failing characters are backed off exponentially so the rest
+of their corporation keeps its polling cadence.
+"""
+import statistics
+import time
+
+from .providers import cache_client
+
+# first back off after a failure, doubled for each failure in a row
+BACKOFF_BASE_SECONDS = 60
+BACKOFF_MAX_SECONDS = 6 * 60 * 60
+
+LATENCY_SAMPLES = 20
+
+# forget about characters we have not touched in a while
+HEALTH_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+def _build_health_key(char_id):
+    return f"ct-pinger-char-health-{char_id}"
+
+
+def _build_latency_key(char_id):
+    return f"ct-pinger-char-latency-{char_id}"
+
+
+def record_success(char_id, latency=None):
+    pipe = cache_client.pipeline()
+    pipe.hset(
+        _build_health_key(char_id),
+        mapping={"failures": 0, "last_success": time.time(), "backoff_until": 0},
+    )
+    pipe.expire(_build_health_key(char_id), HEALTH_TTL_SECONDS)
+    if latency is not None:
+        pipe.lpush(_build_latency_key(char_id), latency)
+        pipe.ltrim(_build_latency_key(char_id), 0, LATENCY_SAMPLES - 1)
+        pipe.expire(_build_latency_key(char_id), HEALTH_TTL_SECONDS)
+    pipe.execute()
+
+
+def record_failure(char_id, reason=""):
+    """Returns how many seconds the character is backed off for."""
+    failures = cache_client.hincrby(_build_health_key(char_id), "failures", 1)
+    backoff = min(BACKOFF_BASE_SECONDS * 2 ** (failures - 1), BACKOFF_MAX_SECONDS)
+    now = time.time()
+    pipe = cache_client.pipeline()
+    pipe.hincrby(_build_health_key(char_id), "total_failures", 1)
+    pipe.hset(
+        _build_health_key(char_id),
+        mapping={
+            "last_failure": now,
+            "last_error": str(reason)[:200],
+            "backoff_until": now + backoff,
+        },
+    )
+    pipe.expire(_build_health_key(char_id), HEALTH_TTL_SECONDS)
+    pipe.execute()
+    return backoff
+
+
+def get_health(char_id):
+    data = {
+        k.decode("utf-8"): v.decode("utf-8")
+        for k, v in cache_client.hgetall(_build_health_key(char_id)).items()
+    }
+    latencies = [
+        float(x) for x in cache_client.lrange(_build_latency_key(char_id), 0, -1)
+    ]
+    return {
+        "failures": int(data.get("failures", 0)),
+        "total_failures": int(data.get("total_failures", 0)),
+        "last_success": float(data.get("last_success", 0)),
+        "last_failure": float(data.get("last_failure", 0)),
+        "last_error": data.get("last_error", ""),
+        "backoff_until": float(data.get("backoff_until", 0)),
+        "median_latency": statistics.median(latencies) if latencies else None,
+    }
+
+
+def get_backoff(char_id, now=None):
+    """Seconds left before this character should be used again."""
+    if now is None:
+        now = time.time()
+    backoff_until = cache_client.hget(_build_health_key(char_id), "backoff_until")
+    if not backoff_until:
+        return 0
+    return max(float(backoff_until) - now, 0)
+
+
+def is_healthy(char_id, now=None):
+    return get_backoff(char_id, now=now) == 0
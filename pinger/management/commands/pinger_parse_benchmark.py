@@ -0,0 +1,89 @@
+import ast
+import os
+import textwrap
+import timeit
+
+import yaml
+
+from django.core.management.base import BaseCommand
+
+from pinger import notifications
+from pinger.notifications import parser
+
+
+def _strip_header(text):
+    # most notes start with the notification name, drop it
+    lines = text.splitlines()
+    while lines and ":" not in lines[0]:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def _get_samples():
+    """Sample payloads from the notes under each notification class."""
+    samples = {}
+    folder = os.path.dirname(notifications.__file__)
+    for file_name in sorted(os.listdir(folder)):
+        if not file_name.endswith(".py"):
+            continue
+        with open(os.path.join(folder, file_name)) as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.ClassDef):
+                continue
+            for item in node.body:
+                if isinstance(item, ast.Expr) and isinstance(item.value, ast.Constant) \
+                        and isinstance(item.value.value, str):
+                    text = _strip_header(textwrap.dedent(item.value.value).strip())
+                    try:
+                        data = yaml.load(text, Loader=yaml.UnsafeLoader)
+                    except yaml.YAMLError:
+                        continue
+                    if isinstance(data, dict):
+                        samples[node.name] = text
+                        break
+    return samples
+
+
+class Command(BaseCommand):
+    help = 'Benchmark notification parsing against the sample payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=100)
+
+    def handle(self, *args, **options):
+        rounds = options['rounds']
+        samples = _get_samples()
+        texts = list(samples.values())
+        self.stdout.write(
+            f"{len(texts)} Samples, {rounds} Rounds, C Loader: {parser.is_c_loader()}")
+
+        for name, text in samples.items():
+            if parser.parse(text) != yaml.load(text, Loader=yaml.UnsafeLoader):
+                self.stdout.write(f"  Mismatch in {name}!")
+
+        def unsafe():
+            for text in texts:
+                yaml.load(text, Loader=yaml.UnsafeLoader)
+
+        def uncached():
+            for text in texts:
+                parser.parse(text)
+
+        def cached():
+            for i, text in enumerate(texts):
+                parser.parse_notification(i, text)
+
+        parser.clear_cache()
+        results = [
+            ("yaml.UnsafeLoader", timeit.timeit(unsafe, number=rounds)),
+            ("NotificationLoader", timeit.timeit(uncached, number=rounds)),
+            ("NotificationLoader cached", timeit.timeit(cached, number=rounds)),
+        ]
+        parser.clear_cache()
+
+        base = results[0][1]
+        for name, total in results:
+            per_note = total / (rounds * max(len(texts), 1)) * 1000000
+            self.stdout.write(
+                f"{name}: {total:.3f}s total, {per_note:.1f}us per notification ({base / total:.1f}x)")
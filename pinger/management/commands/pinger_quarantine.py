@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from pinger import quarantine
+from pinger.models import QuarantinedNotification
+
+
+class Command(BaseCommand):
+    help = 'List, replay or purge notifications that failed to process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['list', 'replay', 'purge'])
+        parser.add_argument('--type', default=None,
+                            help='Only notifications of this type')
+        parser.add_argument('--id', type=int, nargs='*', default=None,
+                            help='Only these notification ids')
+
+    def get_queryset(self, options):
+        qs = QuarantinedNotification.objects.all()
+        if options['type']:
+            qs = qs.filter(notification_type=options['type'])
+        if options['id']:
+            qs = qs.filter(notification_id__in=options['id'])
+        return qs.order_by('timestamp')
+
+    def handle(self, *args, **options):
+        qs = self.get_queryset(options)
+
+        if options['action'] == 'list':
+            for notification_type, count in quarantine.get_counts():
+                self.stdout.write(f"{notification_type:<50} {count}")
+            self.stdout.write("")
+            for q in qs:
+                error = q.error.strip().splitlines()[-1] if q.error else ""
+                self.stdout.write(
+                    f"{q.notification_id} {q.notification_type} {q.stage} "
+                    f"x{q.attempts} {q.timestamp} {error}")
+
+        elif options['action'] == 'replay':
+            replayed, failed = quarantine.replay(qs)
+            self.stdout.write(f"Replayed {replayed} notifications, {failed} failed again")
+
+        elif options['action'] == 'purge':
+            deleted, _ = qs.delete()
+            self.stdout.write(f"Purged {deleted} notifications")
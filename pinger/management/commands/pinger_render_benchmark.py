@@ -0,0 +1,80 @@
+import datetime
+import json
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from pinger.notifications import get_available_types, templates
+
+
+def _package_ping(template, title, values, description, footer, timestamp):
+    # what `NotificationPing.package_ping()` does with the same embed
+    custom_data = {'color': template.colour,
+                   'title': title,
+                   'description': description,
+                   'timestamp': timestamp.replace(tzinfo=None).isoformat(),
+                   }
+    custom_data['fields'] = [
+        {'name': f.name, 'value': values[f.key], 'inline': f.inline}
+        for f in template.fields
+    ]
+    custom_data['footer'] = footer
+    return json.dumps(custom_data)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark rendering the templated pings against building them with json.dumps'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        rounds = options['rounds']
+        timestamp = datetime.datetime.now(datetime.timezone.utc)
+        footer = {
+            "icon_url": "https://images.evetech.net/corporations/1/logo?size=64",
+            "text": "Corporation (TICK)",
+        }
+        encoded_footer = templates.encode(footer)
+
+        cases = []
+        for name, ping_class in sorted(get_available_types().items()):
+            template = getattr(ping_class, "template", None)
+            if template is None:
+                continue
+            values = {
+                f.key: f"[{f.name} Value](https://evemaps.dotlan.net/{f.key})"
+                for f in template.fields
+            }
+            description = template.description or "Structure under Attack!"
+            cases.append((name, template, values, description))
+
+        self.stdout.write(f"{len(cases)} Templated Pings, {rounds} Rounds")
+
+        for name, template, values, description in cases:
+            rendered = template.render(
+                name, timestamp, values=values, description=description,
+                footer=encoded_footer)
+            if rendered != _package_ping(template, name, values, description, footer, timestamp):
+                self.stdout.write(f"  Mismatch in {name}!")
+
+        def dumps():
+            for name, template, values, description in cases:
+                _package_ping(template, name, values, description, footer, timestamp)
+
+        def render():
+            for name, template, values, description in cases:
+                template.render(
+                    name, timestamp, values=values, description=description,
+                    footer=encoded_footer)
+
+        results = [
+            ("json.dumps", timeit.timeit(dumps, number=rounds)),
+            ("EmbedTemplate", timeit.timeit(render, number=rounds)),
+        ]
+
+        base = results[0][1]
+        for name, total in results:
+            per_ping = total / (rounds * max(len(cases), 1)) * 1000000
+            self.stdout.write(
+                f"{name}: {total:.3f}s total, {per_ping:.1f}us per ping ({base / total:.1f}x)")
@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
-from django_celery_beat.models import CrontabSchedule, PeriodicTask
+from django_celery_beat.models import (
+    CrontabSchedule, IntervalSchedule, PeriodicTask,
+)
 
 
 class Command(BaseCommand):
@@ -25,4 +27,36 @@ class Command(BaseCommand):
             }
         )
 
+        schedule_dispatch, _ = IntervalSchedule.objects.get_or_create(
+            every=10,
+            period=IntervalSchedule.SECONDS
+        )
+
+        PeriodicTask.objects.update_or_create(
+            task='pinger.tasks.dispatch_notification_updates',
+            defaults={
+                'interval': schedule_dispatch,
+                'name': 'CorpTools Pinger Dispatch',
+                'enabled': True
+            }
+        )
+
+        schedule_mutes, _ = CrontabSchedule.objects.get_or_create(
+            minute='15',
+            hour='*',
+            day_of_week='*',
+            day_of_month='*',
+            month_of_year='*',
+            timezone='UTC'
+        )
+
+        PeriodicTask.objects.update_or_create(
+            task='pinger.tasks.cleanup_mutes',
+            defaults={
+                'crontab': schedule_mutes,
+                'name': 'CorpTools Pinger Mute Cleanup',
+                'enabled': True
+            }
+        )
+
         self.stdout.write("Done!")
@@ -5,8 +5,16 @@ from django.db.models.query_utils import Q
 
 from allianceauth.eveonline.models import EveCharacter
 
-from pinger.app_settings import CT_PINGER_VALID_STATES
-from pinger.tasks import _get_cache_data_for_corp, get_settings
+from pinger import (
+    dedupe, governor, health, pipeline, quarantine, ratelimit, scheduler,
+    sharding, staging,
+)
+from pinger.app_settings import (
+    CT_PINGER_PIPELINE_MODE, CT_PINGER_SHARDING, CT_PINGER_VALID_STATES,
+)
+from pinger.tasks import (
+    _get_cache_data_for_corp, get_corp_activity, get_etag_stats, get_settings,
+)
 
 
 class Command(BaseCommand):
@@ -49,12 +57,80 @@ class Command(BaseCommand):
                     last_char_model = EveCharacter.objects.get(
                         character_id=last_char)
                     done[c[1]
-                         ] = f"{c[1]} Total Characters : {len(chars)}, Last Character: {last_char_model.character_name} ({last_char}), Next Update: {last_update} Seconds"
+                         ] = f"{c[1]} Total Characters : {len(chars)}, Last Character: {last_char_model.character_name} ({last_char}), Next Update: {last_update} Seconds, Activity: {get_corp_activity(c[0])}"
                 else:
                     done[c[1]] = f"{c[1]} Not Updated Yet"
 
+                for char_id in chars:
+                    char_health = health.get_health(char_id)
+                    latency = char_health["median_latency"]
+                    latency = f"{latency:.2f}s" if latency is not None else "-"
+                    backoff = health.get_backoff(char_id)
+                    if char_health["failures"] or backoff:
+                        done[c[1]] += (
+                            f"\n    Unhealthy {char_id}: {char_health['failures']} Failures"
+                            f" ({char_health['last_error']}), Backed off {backoff:.0f}s,"
+                            f" Median Latency {latency}")
+                    else:
+                        done[c[1]] += f"\n    Healthy {char_id}: Median Latency {latency}"
+
         self.stdout.write(f"Found {len(done)} Valid Corps!")
         sorted_keys = list(done.keys())
         sorted_keys.sort()
         for id in sorted_keys:
             self.stdout.write(done[id])
+
+        self.stdout.write(
+            f"Scheduled Characters: {scheduler.get_schedule_size()}")
+
+        self.stdout.write(
+            f"Dedupe Index: {dedupe.get_index_size()} Notifications")
+
+        remain, reset_in = governor.get_budget()
+        if remain is None:
+            self.stdout.write("ESI Error Budget: No errors this window")
+        else:
+            self.stdout.write(
+                f"ESI Error Budget: {remain} remaining, resets in {reset_in:.0f}s")
+
+        etags = get_etag_stats()
+        hits = etags.get("hit", 0)
+        total = hits + etags.get("miss", 0)
+        if total:
+            self.stdout.write(
+                f"Conditional Requests: {hits}/{total} Not Modified ({hits / total * 100:.1f}%)")
+        else:
+            self.stdout.write("Conditional Requests: No Data Yet")
+
+        payloads = staging.get_payload_stats()
+        if payloads.get("batches"):
+            self.stdout.write(
+                f"Process Payloads: {payloads['batches']} Sampled Batches, "
+                f"{payloads['inline_bytes'] / payloads['batches']:.0f} bytes inline vs "
+                f"{payloads['staged_bytes'] / payloads['batches']:.0f} bytes staged on average")
+
+        webhooks = ratelimit.get_stats()
+        if webhooks.get("sent"):
+            limited = webhooks.get("429", 0)
+            self.stdout.write(
+                f"Webhook Requests: {webhooks['sent']} Sent, {limited} Rate Limited "
+                f"({limited / webhooks['sent'] * 100:.2f}%)")
+
+        quarantined = quarantine.get_counts()
+        if quarantined:
+            self.stdout.write(
+                f"Quarantined Notifications: {sum(c for _, c in quarantined)}, see `pinger_quarantine list`")
+            for notification_type, count in quarantined:
+                self.stdout.write(f"    {notification_type}: {count}")
+
+        if CT_PINGER_PIPELINE_MODE == "streams":
+            for stage, (length, pending) in pipeline.get_stage_stats().items():
+                self.stdout.write(
+                    f"Stream {stage}: {length} Queued, {pending} In Progress")
+
+        if CT_PINGER_SHARDING:
+            ring = sharding.get_ring()
+            shards = sharding.assign(ring, ((cid, 0) for cid in seen_cid))
+            for node in ring.nodes:
+                self.stdout.write(
+                    f"Node {node}: {len(shards.get(node, []))} Corps")
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from pinger import pipeline
+from pinger.tasks import process_stream_entry, send_stream_entry, send_stream_key
+
+HANDLERS = {
+    "process": process_stream_entry,
+    "send": send_stream_entry,
+}
+
+# entries with the same key are handled in order
+KEYS = {
+    "send": send_stream_key,
+}
+
+
+class Command(BaseCommand):
+    help = 'Run a consumer for one stage of the pinger stream pipeline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('stage', choices=list(HANDLERS.keys()))
+        parser.add_argument('--consumer', default=None,
+                            help='Consumer name, defaults to host-pid')
+        parser.add_argument('--count', type=int, default=10,
+                            help='Entries to read per batch')
+
+    def handle(self, *args, **options):
+        stage = options['stage']
+        consumer = options['consumer'] or pipeline.default_consumer_name()
+        pipeline.ensure_group(stage)
+        self.stdout.write(f"Consuming {stage} as {consumer}")
+
+        while True:
+            close_old_connections()
+            pipeline.consume(
+                stage,
+                HANDLERS[stage],
+                consumer=consumer,
+                count=options['count'],
+                key=KEYS.get(stage),
+            )
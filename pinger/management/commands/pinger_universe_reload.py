@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from pinger import universe
+
+
+class Command(BaseCommand):
+    help = 'Reload the cached map data in every pinger process, run after an SDE update'
+
+    def handle(self, *args, **options):
+        version = universe.reload()
+        self.stdout.write(
+            f"Universe cache is now v{version}, workers reload within "
+            f"{universe.VERSION_CHECK_SECONDS} seconds")
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pinger', '0022_add_more_types'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuarantinedNotification',
+            fields=[
+                ('id', models.AutoField(auto_created=True,
+                 primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_id', models.BigIntegerField(unique=True)),
+                ('character_id', models.BigIntegerField()),
+                ('notification_type', models.CharField(max_length=100)),
+                ('timestamp', models.DateTimeField()),
+                ('text', models.TextField()),
+                ('stage', models.CharField(max_length=10)),
+                ('error', models.TextField()),
+                ('attempts', models.IntegerField(default=1)),
+                ('first_failed', models.DateTimeField(auto_now_add=True)),
+                ('last_failed', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='quarantinednotification',
+            index=models.Index(
+                fields=['notification_type'], name='pinger_quar_notific_4309cc_idx'),
+        ),
+    ]
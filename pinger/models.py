@@ -72,7 +72,7 @@ class Ping(models.Model):
     def send_ping(self):
         from . import tasks
 
-        tasks.send_ping.apply_async(priority=2, args=[self.id])
+        tasks.queue_ping(self.id, self.hook_id)
 
 
 class FuelPingRecord(models.Model):
@@ -98,10 +98,11 @@ class FuelPingRecord(models.Model):
     def build_ping_ob(self, message):
         _title = f"{self.structure.name}"
 
-        _system_name = f"[{self.structure.system_name.name}]({dotlan.solar_system_url(self.structure.system_name.name)})"
-        _region_name = (
-            self.structure.system_name.constellation.region.name
-        )  # Get region name
+        from . import universe
+
+        system = universe.get_system(self.structure.system_name_id)
+        _system_name = f"[{system.name}]({dotlan.solar_system_url(system.name)})"
+        _region_name = system.constellation.region.name  # Get region name
 
         _url = eveimageserver.type_icon_url(self.structure.type_id, 64)
 
@@ -154,54 +155,29 @@ class FuelPingRecord(models.Model):
         return custom_data
 
     def ping_task_ob(self, message):
+        from . import routing, universe
+
         embed = self.build_ping_ob(message)
         logger.info(f"PINGER: FUEL Sending Pings for {self.structure.name}")
 
-        webhooks = DiscordWebhook.objects.filter(fuel_pings=True).prefetch_related(
-            "alliance_filter", "corporation_filter", "region_filter"
-        )
-        logger.info(f"PINGER: FUEL Webhooks {webhooks.count()}")
+        corp_filter = self.structure.corporation.corporation.corporation_id
+        alli_filter = self.structure.corporation.corporation.alliance
+        if alli_filter:
+            alli_filter = alli_filter.alliance_id
+        region_filter = universe.get_system(
+            self.structure.system_name_id
+        ).constellation.region.region_id
 
-        for hook in webhooks:
-            regions = hook.region_filter.all().values_list("region_id", flat=True)
-            alliances = hook.alliance_filter.all().values_list("alliance_id", flat=True)
-            corporations = hook.corporation_filter.all().values_list(
-                "corporation_id", flat=True
-            )
+        hook_ids = routing.get_targets(
+            routing.FUEL_PINGS, corp_filter, alli_filter, region_filter
+        )
+        logger.info(f"PINGER: FUEL Webhooks {len(hook_ids)}")
 
-            corp_filter = self.structure.corporation.corporation.corporation_id
-            alli_filter = self.structure.corporation.corporation.alliance
-            if alli_filter:
-                alli_filter = alli_filter.alliance_id
-            region_filter = self.structure.system_name.constellation.region.region_id
-
-            if corp_filter is not None and len(corporations) > 0:
-                if corp_filter not in corporations:
-                    logger.info(
-                        f"PINGER: FUEL  Skipped {self.structure.name} Corp {corp_filter} not in {corporations}"
-                    )
-                    continue
-
-            if alli_filter is not None and len(alliances) > 0:
-                if alli_filter not in alliances:
-                    logger.info(
-                        f"PINGER: FUEL  Skipped {self.structure.name} Alliance {alli_filter} not in {alli_filter}"
-                    )
-                    continue
-
-            if region_filter is not None and len(regions) > 0:
-                if region_filter not in regions:
-                    logger.info(
-                        f"PINGER: FUEL  Skipped {self.structure.name} Region {region_filter} not in {regions}"
-                    )
-                    continue
-
-            alert = False
-            if (self.structure.fuel_expires - timezone.now()).days < 3:
-                alert = True
+        alert = (self.structure.fuel_expires - timezone.now()).days < 3
+        for hook_id in hook_ids:
             p = Ping.objects.create(
                 notification_id=-1 * self.structure.structure_id,
-                hook=hook,
+                hook_id=hook_id,
                 body=json.dumps(embed),
                 time=timezone.now(),
                 alerting=alert,
@@ -260,6 +236,25 @@ class MutedStructure(models.Model):
         return f"{self.structure_id}"
 
 
+class QuarantinedNotification(models.Model):
+    notification_id = models.BigIntegerField(unique=True)
+    character_id = models.BigIntegerField()
+    notification_type = models.CharField(max_length=100)
+    timestamp = models.DateTimeField()
+    text = models.TextField()
+    stage = models.CharField(max_length=10)
+    error = models.TextField()
+    attempts = models.IntegerField(default=1)
+    first_failed = models.DateTimeField(auto_now_add=True)
+    last_failed = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = (models.Index(fields=["notification_type"]),)
+
+    def __str__(self):
+        return f"{self.notification_id} {self.notification_type}"
+
+
 class StructureLoThreshold(models.Model):
     structure = models.OneToOneField(
         Structure, related_name="lo_th", on_delete=models.CASCADE
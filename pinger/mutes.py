@@ -0,0 +1,116 @@
+"""
+Mute index.
+
+Every `MutedStructure` is mirrored to a redis key that expires when the mute
+does, so checking a structure is a single `EXISTS` and a whole batch is one
+`MGET`. The keys are kept in sync by the model signals, `cleanup_mutes` drops
+expired rows and rebuilds the index from the database in case redis was
+flushed.
+"""
+import logging
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .providers import cache_client
+
+logger = logging.getLogger(__name__)
+
+MUTE_SECONDS = 48 * 60 * 60
+
+# present while the index matches the database
+READY_KEY = "ct-pinger-mute-index"
+READY_SECONDS = 2 * 60 * 60
+
+
+def _build_mute_key(structure_id):
+    return f"ct-pinger-mute-{structure_id}"
+
+
+def _remaining(date_added):
+    return int(MUTE_SECONDS - (timezone.now() - date_added).total_seconds())
+
+
+def mute(structure_id, date_added):
+    ttl = _remaining(date_added)
+    if ttl > 0:
+        cache_client.set(_build_mute_key(structure_id), 1, ex=ttl)
+    else:
+        cache_client.delete(_build_mute_key(structure_id))
+
+
+def unmute(structure_id):
+    cache_client.delete(_build_mute_key(structure_id))
+
+
+def refresh(structure_id):
+    """
+    Mirror the newest live row for a structure, a structure can have more than
+    one so deleting a row only unmutes it when none are left.
+    """
+    from .models import MutedStructure
+
+    cutoff = timezone.now() - timedelta(seconds=MUTE_SECONDS)
+    date_added = (
+        MutedStructure.objects.filter(structure_id=structure_id, date_added__gt=cutoff)
+        .order_by("-date_added")
+        .values_list("date_added", flat=True)
+        .first()
+    )
+    if date_added is None:
+        unmute(structure_id)
+    else:
+        mute(structure_id, date_added)
+
+
+def rebuild():
+    """Load every live mute from the database into redis."""
+    from .models import MutedStructure
+
+    cutoff = timezone.now() - timedelta(seconds=MUTE_SECONDS)
+    pipe = cache_client.pipeline()
+    count = 0
+    for structure_id, date_added in MutedStructure.objects.filter(
+        date_added__gt=cutoff
+    ).values_list("structure_id", "date_added"):
+        ttl = _remaining(date_added)
+        if ttl > 0:
+            pipe.set(_build_mute_key(structure_id), 1, ex=ttl)
+            count += 1
+    pipe.set(READY_KEY, 1, ex=READY_SECONDS)
+    pipe.execute()
+    return count
+
+
+def get_muted(structure_ids):
+    """The set of `structure_ids` that are muted right now."""
+    structure_ids = [int(s) for s in structure_ids]
+    if not structure_ids:
+        return set()
+
+    ready, *muted = cache_client.mget(
+        [READY_KEY] + [_build_mute_key(s) for s in structure_ids]
+    )
+    if ready is None:
+        logger.info("PINGER: Mute index missing, rebuilding")
+        rebuild()
+        muted = cache_client.mget([_build_mute_key(s) for s in structure_ids])
+
+    return {s for s, m in zip(structure_ids, muted) if m is not None}
+
+
+def is_muted(structure_id):
+    return int(structure_id) in get_muted([structure_id])
+
+
+def cleanup():
+    """
+    Delete expired mutes and refresh the index, returns rows removed. Each
+    delete refreshes its structure so a newer row for it keeps it muted.
+    """
+    from .models import MutedStructure
+
+    cutoff = timezone.now() - timedelta(seconds=MUTE_SECONDS)
+    deleted, _ = MutedStructure.objects.filter(date_added__lte=cutoff).delete()
+    rebuild()
+    return deleted
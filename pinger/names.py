@@ -0,0 +1,162 @@
+"""
+Structure name cache.
+
+Structure names come from corptools' `fetch_location_name`, which can mean
+an ESI call for every notification. Names are kept in a small in-process LRU
+in front of redis:
+
+- fresh names are used as they are
+- names older than `FRESH_SECONDS` are still used while a background task
+  refreshes them
+- structures that could not be resolved are remembered for
+  `NEGATIVE_SECONDS` so a wave of attack notifications only tries once
+
+Only one process resolves a given structure at a time, the rest wait for it.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from .providers import cache_client
+
+logger = logging.getLogger(__name__)
+
+LOCAL_SIZE = 1024
+LOCAL_SECONDS = 60
+
+FRESH_SECONDS = 6 * 60 * 60
+NEGATIVE_SECONDS = 15 * 60
+# stale names are kept around this long in case ESI can't tell us anymore
+KEEP_SECONDS = 7 * 24 * 60 * 60
+
+LOCK_SECONDS = 30
+LOCK_WAIT_SECONDS = 5
+
+_local = OrderedDict()
+_lock = threading.Lock()
+
+
+def _build_name_key(structure_id):
+    return f"ct-pinger-structure-name-{structure_id}"
+
+
+def _build_lock_key(structure_id):
+    return f"ct-pinger-structure-name-lock-{structure_id}"
+
+
+def _build_refresh_key(structure_id):
+    return f"ct-pinger-structure-name-refresh-{structure_id}"
+
+
+def _get_local(structure_id, now):
+    with _lock:
+        entry = _local.get(structure_id)
+        if entry is None:
+            return None
+        if now - entry[0] > LOCAL_SECONDS:
+            del _local[structure_id]
+            return None
+        _local.move_to_end(structure_id)
+        return entry[1]
+
+
+def _set_local(structure_id, entry, now):
+    with _lock:
+        _local[structure_id] = (now, entry)
+        _local.move_to_end(structure_id)
+        while len(_local) > LOCAL_SIZE:
+            _local.popitem(last=False)
+
+
+def _get_cached(structure_id, now):
+    entry = _get_local(structure_id, now)
+    if entry is None:
+        raw = cache_client.get(_build_name_key(structure_id))
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        _set_local(structure_id, entry, now)
+    return entry
+
+
+def _store(structure_id, name, now=None):
+    if now is None:
+        now = time.time()
+    if not name:
+        # don't lose a name we already had to a failed refresh
+        old = cache_client.get(_build_name_key(structure_id))
+        if old is not None:
+            old = json.loads(old)
+            if old.get("name"):
+                return old
+
+    entry = {"name": name, "at": now}
+    ttl = KEEP_SECONDS if name else NEGATIVE_SECONDS
+    cache_client.set(_build_name_key(structure_id), json.dumps(entry), ex=ttl)
+    _set_local(structure_id, entry, now)
+    return entry
+
+
+def resolve(structure_id, character_id):
+    """Ask corptools for the name and cache the result, None if unresolvable."""
+    from corptools.task_helpers.update_tasks import fetch_location_name
+
+    try:
+        location = fetch_location_name(structure_id, "solar_system", character_id)
+        name = location.location_name if location else None
+    except Exception as e:
+        logger.error(f"PINGER: Error fetching structure name {structure_id}? {e}")
+        name = None
+
+    if not name:
+        logger.warning(
+            f"PINGER: Failed to fetch structure name (structureID={structure_id}, charID={character_id})"
+        )
+    return _store(structure_id, name)["name"]
+
+
+def _queue_refresh(structure_id, character_id):
+    if cache_client.set(_build_refresh_key(structure_id), 1, nx=True, ex=LOCK_SECONDS):
+        from .tasks import refresh_structure_name
+
+        refresh_structure_name.apply_async(args=[structure_id, character_id])
+
+
+def _resolve_once(structure_id, character_id):
+    lock_key = _build_lock_key(structure_id)
+    if cache_client.set(lock_key, 1, nx=True, ex=LOCK_SECONDS):
+        try:
+            return resolve(structure_id, character_id)
+        finally:
+            cache_client.delete(lock_key)
+
+    # someone else is on it, wait for them
+    waited = 0
+    while waited < LOCK_WAIT_SECONDS:
+        time.sleep(0.25)
+        waited += 0.25
+        raw = cache_client.get(_build_name_key(structure_id))
+        if raw is not None:
+            entry = json.loads(raw)
+            _set_local(structure_id, entry, time.time())
+            return entry["name"]
+    return resolve(structure_id, character_id)
+
+
+def get_structure_name(structure_id, character_id):
+    """The name of a structure, None if it can't be resolved."""
+    now = time.time()
+    entry = _get_cached(structure_id, now)
+    if entry is not None:
+        age = now - entry["at"]
+        if entry["name"] is None:
+            if age < NEGATIVE_SECONDS:
+                return None
+        else:
+            if age >= FRESH_SECONDS:
+                _queue_refresh(structure_id, character_id)
+            return entry["name"]
+
+    return _resolve_once(structure_id, character_id)
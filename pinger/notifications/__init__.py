@@ -1,9 +1,6 @@
-from .character import *  # noqa Flake8(F401)
-from .corporate import *  # noqa Flake8(F401)
-from .moons import *  # noqa Flake8(F401)
-from .orbital import *  # noqa Flake8(F401)
-from .sov import *  # noqa Flake8(F401)
-from .structure import *  # noqa Flake8(F401)
-from .towers import *  # noqa Flake8(F401)
-from .war import *  # noqa Flake8(F401)
-from .projects import *  # noqa Flake8(F401)
+from ..exceptions import MutedException  # noqa Flake8(F401)
+from .base import (  # noqa Flake8(F401)
+    NotificationPing, get_available_types, get_parser, load_parsers,
+    normalise_type,
+)
+from .context import ResolvedContext  # noqa Flake8(F401)
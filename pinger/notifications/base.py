@@ -1,20 +1,54 @@
+import importlib
 import json
 import logging
+from types import MappingProxyType
 
-import yaml
+from .. import names, universe
+from . import parser
+from .context import ResolvedContext
 
 logger = logging.getLogger(__name__)
 
+# modules holding NotificationPing classes, imported on first lookup
+PARSER_MODULES = [
+    "character",
+    "corporate",
+    "moons",
+    "orbital",
+    "sov",
+    "structure",
+    "towers",
+    "war",
+    "projects",
+]
 
-def get_available_types():
-    classes = NotificationPing.__subclasses__()
+_registry = {}
+_types = MappingProxyType(_registry)
+_loaded = False
+
+
+def normalise_type(notification_type):
+    return notification_type.replace(" ", "").replace("(", "").replace(")", "")
+
+
+def load_parsers():
+    global _loaded
+    if _loaded:
+        return
+    for module in PARSER_MODULES:
+        importlib.import_module(f"{__package__}.{module}")
+    _loaded = True
 
-    output = {}
 
-    for c in classes:
-        output[c.__name__] = c
+def get_available_types():
+    """Read only `{type tag: NotificationPing class}` of every parser."""
+    load_parsers()
+    return _types
+
 
-    return output
+def get_parser(notification_type):
+    load_parsers()
+    return _registry.get(normalise_type(notification_type))
 
 
 class NotificationPing:
@@ -32,14 +66,59 @@ class NotificationPing:
     _alli = None
     _region = None
 
-    def __init__(self, notification):
+    def __init_subclass__(cls, abstract=False, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # intermediate base classes use `class X(NotificationPing, abstract=True)`
+        if not abstract:
+            _registry[normalise_type(cls.__name__)] = cls
+
+    def __init__(self, notification, context=None):
         self._notification = notification
+        self._context = context if context is not None else ResolvedContext()
         self._data = self.parse_notification()
         self.build_ping()
 
     def parse_notification(self):
-        return yaml.load(
-            self._notification.notification_text, Loader=yaml.UnsafeLoader)
+        return parser.parse_notification(
+            self._notification.notification_id,
+            self._notification.notification_text)
+
+    @classmethod
+    def get_routing_key(cls, notification, data):
+        """
+        `(corp, alliance, region, type)` the ping will be filtered on, worked
+        out without building it. Matches what `get_filters()` returns after.
+        """
+        character = notification.character.character
+        region = None
+        system_id = data.get("solarSystemID", data.get("solarsystemID"))
+        if system_id:
+            region = universe.get_system(system_id).constellation.region.region_id
+        return (character.corporation_id, character.alliance_id, region, cls.__name__)
+
+    def get_system(self, system_id):
+        return self._context.get_system(system_id)
+
+    def get_item_type(self, type_id):
+        return self._context.get_item_type(type_id)
+
+    def get_moon(self, moon_id):
+        return self._context.get_moon(moon_id)
+
+    def get_planet(self, planet_id):
+        return self._context.get_planet(planet_id)
+
+    def get_name(self, eve_id):
+        return self._context.get_name(eve_id)
+
+    def is_muted(self, structure_id):
+        return self._context.is_muted(structure_id)
+
+    def get_structure_name(self, structure_id, default):
+        name = names.get_structure_name(
+            structure_id, self._notification.character.character.character_id
+        )
+        return name if name else default
 
     def build_ping(self):
         raise NotImplementedError(
@@ -71,5 +150,17 @@ class NotificationPing:
 
         self._ping = json.dumps(custom_data)
 
+    def render_template(self, template, title, values=None, description=None,
+                        footer=None, img_url=None):
+        """`package_ping()` for classes declaring an `EmbedTemplate`."""
+        self._ping = template.render(
+            title,
+            self._notification.timestamp,
+            values=values,
+            description=description,
+            footer=footer,
+            img_url=img_url,
+        )
+
     def get_filters(self):
         return (self._corp, self._alli, self._region)
@@ -0,0 +1,183 @@
+"""
+Batched lookups for a set of notifications.
+
+`ResolvedContext.build()` walks the parsed notifications of a batch, collects
+every type, moon, planet and entity id they reference and loads them with one
+`in` query per model. Entity names missing from the database are created with
+one bulk `/universe/names/` lookup, systems come from the process local map in
+`pinger.universe` and mutes are checked in one go against `pinger.mutes`.
+Parsers read everything through the `get_*` helpers which fall back to the
+single object lookups for anything the pre-pass did not see.
+"""
+import logging
+
+from corptools import models as ctm
+
+from .. import mutes, universe
+
+logger = logging.getLogger(__name__)
+
+TYPE_KEYS = {"typeID", "structureTypeID"}
+TYPE_MAP_KEYS = {"oreVolumeByType"}
+MOON_KEYS = {"moonID"}
+PLANET_KEYS = {"planetID"}
+MUTE_KEYS = {"structureID", "moonID"}
+NAME_KEYS = {
+    "aggressorAllianceID",
+    "aggressorCharacterID",
+    "aggressorCorpID",
+    "aggressorID",
+    "againstID",
+    "charID",
+    "closer_id",
+    "corpID",
+    "corporation_id",
+    "creator_id",
+    "declaredByID",
+    "invokingCharID",
+    "newOwnerCorpID",
+    "oldOwnerCorpID",
+}
+
+
+def _add(ids, value):
+    try:
+        ids.add(int(value))
+    except (TypeError, ValueError):
+        pass
+
+
+class ResolvedContext:
+    def __init__(self):
+        self.item_types = {}
+        self.moons = {}
+        self.planets = {}
+        self.names = {}
+        self.mute_ids = set()
+        self.muted = set()
+
+    @classmethod
+    def build(cls, notifications_data):
+        """Resolve everything referenced by a list of parsed notifications."""
+        ids = {
+            "item_types": set(),
+            "moons": set(),
+            "planets": set(),
+            "names": set(),
+            "mutes": set(),
+        }
+        for data in notifications_data:
+            cls._collect(data, ids)
+
+        context = cls()
+        context._load(ids)
+        return context
+
+    @classmethod
+    def _collect(cls, data, ids):
+        if isinstance(data, list):
+            for item in data:
+                cls._collect(item, ids)
+            return
+        if not isinstance(data, dict):
+            return
+
+        for key, value in data.items():
+            if key in MUTE_KEYS:
+                _add(ids["mutes"], value)
+            if key in TYPE_KEYS:
+                _add(ids["item_types"], value)
+            elif key in TYPE_MAP_KEYS and isinstance(value, dict):
+                for type_id in value.keys():
+                    _add(ids["item_types"], type_id)
+            elif key in MOON_KEYS:
+                _add(ids["moons"], value)
+            elif key in PLANET_KEYS:
+                _add(ids["planets"], value)
+            elif key in NAME_KEYS:
+                _add(ids["names"], value)
+            elif isinstance(value, (dict, list)):
+                cls._collect(value, ids)
+
+    def _load(self, ids):
+        if ids["item_types"]:
+            self.item_types = {
+                t.type_id: t
+                for t in ctm.EveItemType.objects.filter(type_id__in=ids["item_types"])
+            }
+        if ids["moons"]:
+            self.moons = {
+                m.moon_id: m
+                for m in ctm.MapSystemMoon.objects.filter(moon_id__in=ids["moons"])
+            }
+        if ids["planets"]:
+            self.planets = {
+                p.planet_id: p
+                for p in ctm.MapSystemPlanet.objects.filter(
+                    planet_id__in=ids["planets"]
+                )
+            }
+        if ids["names"]:
+            self._load_names(ids["names"])
+        if ids["mutes"]:
+            self.mute_ids = ids["mutes"]
+            self.muted = mutes.get_muted(ids["mutes"])
+
+    def _query_names(self, eve_ids):
+        return {
+            n.eve_id: n
+            for n in ctm.EveName.objects.filter(eve_id__in=eve_ids).select_related(
+                "corporation", "alliance"
+            )
+        }
+
+    def _load_names(self, eve_ids):
+        self.names = self._query_names(eve_ids)
+        missing = set(eve_ids) - set(self.names.keys())
+        if not missing:
+            return
+        try:
+            # one /universe/names/ call for everything we have not seen before
+            ctm.EveName.objects.create_bulk_from_esi(list(missing))
+        except Exception as e:
+            logger.warning(f"PINGER: Failed to bulk resolve {len(missing)} names {e}")
+            return
+        self.names.update(self._query_names(missing))
+
+    def is_muted(self, structure_id):
+        if int(structure_id) in self.mute_ids:
+            return int(structure_id) in self.muted
+        return mutes.is_muted(structure_id)
+
+    def get_system(self, system_id):
+        return universe.get_system(system_id)
+
+    def get_item_type(self, type_id):
+        item_type = self.item_types.get(int(type_id))
+        if item_type is None:
+            item_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(type_id)
+            self.item_types[int(type_id)] = item_type
+        return item_type
+
+    def get_moon(self, moon_id):
+        moon = self.moons.get(int(moon_id))
+        if moon is None:
+            moon, _ = ctm.MapSystemMoon.objects.get_or_create_from_esi(moon_id)
+            self.moons[int(moon_id)] = moon
+        return moon
+
+    def get_planet(self, planet_id):
+        planet = self.planets.get(int(planet_id))
+        if planet is None:
+            planet, _ = ctm.MapSystemPlanet.objects.get_or_create_from_esi(
+                planet_id=planet_id
+            )
+            self.planets[int(planet_id)] = planet
+        return planet
+
+    def get_name(self, eve_id):
+        name = self.names.get(int(eve_id))
+        if name is None:
+            name, _ = ctm.EveName.objects.get_or_create_from_esi(eve_id)
+            self.names[int(eve_id)] = name
+        return name
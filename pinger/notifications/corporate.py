@@ -1,6 +1,3 @@
-
-from corptools import models as ctm
-
 from django.utils.html import strip_tags
 
 from allianceauth.eveonline.evelinks import eveimageserver, evewho, zkillboard
@@ -22,10 +19,8 @@ class CorpAppAcceptMsg(NotificationPing):
 
     def build_ping(self):
         title = "Corp Application Accepted"
-        app_char, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['charID'])
-        app_corp, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['corpID'])
+        app_char = self.get_name(self._data['charID'])
+        app_corp = self.get_name(self._data['corpID'])
         try:
             eve_main = EveCharacter.objects.get(
                 character_id=self._data['charID']
@@ -72,10 +67,8 @@ class CorpAppInvitedMsg(NotificationPing):
 
     def build_ping(self):
         title = "Corp Invite Sent"
-        app_char, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['charID'])
-        invoked_by, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['invokingCharID'])
+        app_char = self.get_name(self._data['charID'])
+        invoked_by = self.get_name(self._data['invokingCharID'])
         try:
             eve_main = EveCharacter.objects.get(
                 character_id=self._data['charID']).character_ownership.user.profile.main_character
@@ -124,8 +117,7 @@ class CorpAppNewMsg(NotificationPing):
 
     def build_ping(self):
         title = "New Corp Application"
-        app_char, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['charID'])
+        app_char = self.get_name(self._data['charID'])
         try:
             eve_main = EveCharacter.objects.get(
                 character_id=self._data['charID']).character_ownership.user.profile.main_character
@@ -172,8 +164,7 @@ class CorpAppRejectMsg(NotificationPing):
 
     def build_ping(self):
         title = "Corp Application Rejected"
-        app_char, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['charID'])
+        app_char = self.get_name(self._data['charID'])
         try:
             eve_main = EveCharacter.objects.get(
                 character_id=self._data['charID']).character_ownership.user.profile.main_character
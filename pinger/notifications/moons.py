@@ -1,7 +1,6 @@
 import datetime
 import logging
 
-from corptools import models as ctm
 from django.utils.html import strip_tags
 
 from .base import NotificationPing
@@ -34,20 +33,18 @@ class MoonminingExtractionFinished(NotificationPing):
     """
 
     def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarSystemID"])
+        system_db = self.get_system(self._data["solarSystemID"])
 
         system_name = system_db.name
         system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
 
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
+        structure_type = self.get_item_type(self._data["structureTypeID"])
 
         structure_name = self._data["structureName"]
         if len(structure_name) < 1:
             structure_name = "Moon Notification"
 
-        moon, _ = ctm.MapSystemMoon.objects.get_or_create_from_esi(self._data["moonID"])
+        moon = self.get_moon(self._data["moonID"])
 
         title = "Moon Extraction Complete!"
         body = "Ready to Fracture!"
@@ -65,7 +62,7 @@ class MoonminingExtractionFinished(NotificationPing):
         ores = {}
         totalm3 = 0
         for t, q in self._data["oreVolumeByType"].items():
-            ore, _ = ctm.EveItemType.objects.get_or_create_from_esi(t)
+            ore = self.get_item_type(t)
             ores[t] = ore.name
             totalm3 += q
         ore_string = []
@@ -119,20 +116,18 @@ class MoonminingAutomaticFracture(NotificationPing):
     """
 
     def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarSystemID"])
+        system_db = self.get_system(self._data["solarSystemID"])
 
         system_name = system_db.name
         system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
 
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
+        structure_type = self.get_item_type(self._data["structureTypeID"])
 
         structure_name = self._data["structureName"]
         if len(structure_name) < 1:
             structure_name = "Moon Notification"
 
-        moon, _ = ctm.MapSystemMoon.objects.get_or_create_from_esi(self._data["moonID"])
+        moon = self.get_moon(self._data["moonID"])
 
         title = "Moon Auto-Fractured!"
         body = "Ready to Mine!"
@@ -149,7 +144,7 @@ class MoonminingAutomaticFracture(NotificationPing):
         ores = {}
         totalm3 = 0
         for t, q in self._data["oreVolumeByType"].items():
-            ore, _ = ctm.EveItemType.objects.get_or_create_from_esi(t)
+            ore = self.get_item_type(t)
             ores[t] = ore.name
             totalm3 += q
         ore_string = []
@@ -200,20 +195,18 @@ class MoonminingLaserFired(NotificationPing):
     """
 
     def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarSystemID"])
+        system_db = self.get_system(self._data["solarSystemID"])
 
         system_name = system_db.name
         system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
 
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
+        structure_type = self.get_item_type(self._data["structureTypeID"])
 
         structure_name = self._data["structureName"]
         if len(structure_name) < 1:
             structure_name = "Moon Notification"
 
-        moon, _ = ctm.MapSystemMoon.objects.get_or_create_from_esi(self._data["moonID"])
+        moon = self.get_moon(self._data["moonID"])
 
         title = "Moon Laser Fired!"
         body = "Fired By [{0}](https://zkillboard.com/search/{1}/)".format(
@@ -233,7 +226,7 @@ class MoonminingLaserFired(NotificationPing):
         ores = {}
         totalm3 = 0
         for t, q in self._data["oreVolumeByType"].items():
-            ore, _ = ctm.EveItemType.objects.get_or_create_from_esi(t)
+            ore = self.get_item_type(t)
             ores[t] = ore.name
             totalm3 += q
         ore_string = []
@@ -286,20 +279,18 @@ class MoonminingExtractionStarted(NotificationPing):
     """
 
     def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarSystemID"])
+        system_db = self.get_system(self._data["solarSystemID"])
 
         system_name = system_db.name
         system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
 
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
+        structure_type = self.get_item_type(self._data["structureTypeID"])
 
         structure_name = self._data["structureName"]
         if len(structure_name) < 1:
             structure_name = "Moon Notification"
 
-        moon, _ = ctm.MapSystemMoon.objects.get_or_create_from_esi(self._data["moonID"])
+        moon = self.get_moon(self._data["moonID"])
 
         title = "Moon Extraction Started!"
         body = "Fired By [{0}](https://zkillboard.com/search/{1}/)".format(
@@ -322,7 +313,7 @@ class MoonminingExtractionStarted(NotificationPing):
         ores = {}
         totalm3 = 0
         for t, q in self._data["oreVolumeByType"].items():
-            ore, _ = ctm.EveItemType.objects.get_or_create_from_esi(t)
+            ore = self.get_item_type(t)
             ores[t] = ore.name
             totalm3 += q
         ore_string = []
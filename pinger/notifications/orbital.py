@@ -2,10 +2,10 @@ import datetime
 import logging
 
 from allianceauth.eveonline.evelinks import dotlan, eveimageserver, zkillboard
-from corptools import models as ctm
 
 from django.utils import timezone
 
+from . import templates
 from .base import NotificationPing
 from .helpers import (
     create_timer,
@@ -14,9 +14,39 @@ from .helpers import (
     time_till_to_td,
     timers_enabled,
 )
+from .templates import EmbedTemplate, Field
 
 logger = logging.getLogger(__name__)
 
+ORBITAL_ATTACK_FIELDS = (
+    Field("System/Planet", "planet"),
+    Field("Region", "region"),
+    Field("Type", "type"),
+    Field("Attacker", "attacker", inline=False),
+)
+
+ORBITAL_TIMER_FIELDS = (
+    Field("System", "system"),
+    Field("Type", "type"),
+    Field("Owner", "corporation", inline=False),
+    Field("Time Till Out", "time_till", inline=False),
+    Field("Date Out", "date_out", inline=False),
+)
+
+MERCENARY_DEN_FIELDS = (
+    Field("System/Planet", "planet"),
+    Field("Region", "region"),
+    Field("Type", "type"),
+    Field("Owner", "corporation", inline=False),
+)
+MERCENARY_DEN_ATTACK_FIELDS = MERCENARY_DEN_FIELDS + (
+    Field("Attacker", "attacker", inline=False),
+)
+MERCENARY_DEN_TIMER_FIELDS = MERCENARY_DEN_FIELDS + (
+    Field("Time Till Out", "time_till", inline=False),
+    Field("Date Out", "date_out", inline=False),
+)
+
 
 class OrbitalAttacked(NotificationPing):
     category = "orbital-attack"  # Structure Alerts
@@ -32,22 +62,15 @@ class OrbitalAttacked(NotificationPing):
     typeID: 2233
     """
 
-    def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarSystemID"])
-        planet_db, _ = ctm.MapSystemPlanet.objects.get_or_create_from_esi(
-            planet_id=self._data["planetID"]
-        )
+    template = EmbedTemplate(15158332, ORBITAL_ATTACK_FIELDS)
 
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
-        planet_name = planet_db.name
+    def build_ping(self):
+        system_db = self.get_system(self._data["solarSystemID"])
+        planet_db = self.get_planet(self._data["planetID"])
 
-        system_name = f"[{planet_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
+        region_db = system_db.constellation.region
 
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["typeID"]
-        )
+        structure_type = self.get_item_type(self._data["typeID"])
 
         title = "Poco Under Attack"
         shld = float(self._data["shieldLevel"]) * 100
@@ -55,26 +78,14 @@ class OrbitalAttacked(NotificationPing):
             structure_type.name, shld
         )
 
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
-        }
+        character = self._notification.character.character
 
-        attacking_char, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data["aggressorID"]
-        )
-        attacking_corp, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data["aggressorCorpID"]
-        )
+        attacking_char = self.get_name(self._data["aggressorID"])
+        attacking_corp = self.get_name(self._data["aggressorCorpID"])
 
         attacking_alli = None
         if self._data["aggressorAllianceID"]:
-            attacking_alli, _ = ctm.EveName.objects.get_or_create_from_esi(
-                self._data["aggressorAllianceID"]
-            )
+            attacking_alli = self.get_name(self._data["aggressorAllianceID"])
 
         attackerStr = "%s, %s, %s" % (
             f"*[{attacking_char.name}]({zkillboard.character_url(attacking_char.eve_id)})*",
@@ -86,25 +97,26 @@ class OrbitalAttacked(NotificationPing):
             ),
         )
 
-        fields = [
-            {"name": "System/Planet", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-            {"name": "Attacker", "value": attackerStr, "inline": False},
-        ]
-
-        self.package_ping(
+        self.render_template(
+            self.template,
             title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=15158332,
+            {
+                "planet": templates.planet_link(planet_db.name, system_db.name),
+                "region": templates.region_link(region_db.name),
+                "type": structure_type.name,
+                "attacker": attackerStr,
+            },
+            description=body,
+            footer=templates.corporation_footer(
+                character.corporation_id,
+                character.corporation_name,
+                character.corporation_ticker,
+            ),
         )
 
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
+        self._corp = character.corporation_id
+        self._alli = character.alliance_id
+        self._region = region_db.region_id
         self.force_at_ping = True
 
 
@@ -122,18 +134,14 @@ class OrbitalReinforced(NotificationPing):
     typeID: 2233
     """
 
+    template = EmbedTemplate(7419530, ORBITAL_TIMER_FIELDS)
+
     def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarSystemID"])
-        planet_db, _ = ctm.MapSystemPlanet.objects.get_or_create_from_esi(
-            planet_id=self._data["planetID"]
-        )
+        system_db = self.get_system(self._data["solarSystemID"])
+        planet_db = self.get_planet(self._data["planetID"])
 
-        system_name = system_db.name
         planet_name = planet_db.name
-        system_name = f"[{planet_name}]({dotlan.solar_system_url(system_name)})"
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["typeID"]
-        )
+        structure_type = self.get_item_type(self._data["typeID"])
 
         _timeTill = filetime_to_dt(self._data["reinforceExitTime"]).replace(
             tzinfo=datetime.timezone.utc
@@ -144,37 +152,25 @@ class OrbitalReinforced(NotificationPing):
         title = "Poco Reinforced"
         body = f"{structure_type.name} has lost its Shields"
 
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % (
-            self._notification.character.character.corporation_name,
-            zkillboard.corporation_url(corp_id),
-        )
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
-        }
-
-        fields = [
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-            {"name": "Owner", "value": corp_name, "inline": False},
-            {"name": "Time Till Out", "value": tile_till, "inline": False},
+        character = self._notification.character.character
+        self.render_template(
+            self.template,
+            title,
             {
-                "name": "Date Out",
-                "value": _timeTill.strftime("%Y-%m-%d %H:%M"),
-                "inline": False,
+                "system": templates.planet_link(planet_name, system_db.name),
+                "type": structure_type.name,
+                "corporation": templates.corporation_link(
+                    character.corporation_id, character.corporation_name
+                ),
+                "time_till": tile_till,
+                "date_out": _timeTill.strftime("%Y-%m-%d %H:%M"),
             },
-        ]
-
-        self.package_ping(
-            title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=7419530,
+            description=body,
+            footer=templates.corporation_footer(
+                character.corporation_id,
+                character.corporation_name,
+                character.corporation_ticker,
+            ),
         )
 
         if timers_enabled():
@@ -187,13 +183,13 @@ class OrbitalReinforced(NotificationPing):
                     system_db.name,
                     TimerType.ARMOR,
                     _timeTill,
-                    self._notification.character.character.corporation,
+                    character.corporation,
                 )
             except Exception as e:
                 logger.exception(f"PINGER: Failed to build timer OrbitalReinforced {e}")
 
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
+        self._corp = character.corporation_id
+        self._alli = character.alliance_id
         self._region = system_db.constellation.region.region_id
 
 
@@ -231,20 +227,20 @@ class SkyhookUnderAttack(NotificationPing):
         typeID: 81080
     """
 
+    template = EmbedTemplate(15158332, ORBITAL_ATTACK_FIELDS)
+
     def build_ping(self):
         logger.debug(f"Starting build_ping with data: {self._data}")
 
         try:
-            system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
+            system_db = self.get_system(self._data["solarsystemID"])
             logger.debug(f"Loaded system: {system_db.name} (ID: {system_db.system_id})")
         except Exception as e:
             logger.exception("Failed to load MapSystem")
             raise
 
         try:
-            planet_db, _ = ctm.MapSystemPlanet.objects.get_or_create_from_esi(
-                planet_id=self._data["planetID"]
-            )
+            planet_db = self.get_planet(self._data["planetID"])
             logger.debug(
                 f"Loaded planet: {planet_db.name} (ID: {self._data['planetID']})"
             )
@@ -252,13 +248,11 @@ class SkyhookUnderAttack(NotificationPing):
             logger.exception("Failed to load or create MapSystemPlanet")
             raise
 
-        system_name = f"[{planet_db.name}]({dotlan.solar_system_url(system_db.name)})"
-        region_name = f"[{system_db.constellation.region.name}]({dotlan.region_url(system_db.constellation.region.name)})"
+        system_name = templates.planet_link(planet_db.name, system_db.name)
+        region_name = templates.region_link(system_db.constellation.region.name)
 
         try:
-            structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-                self._data["typeID"]
-            )
+            structure_type = self.get_item_type(self._data["typeID"])
             logger.debug(
                 f"Structure type: {structure_type.name} (ID: {self._data['typeID']})"
             )
@@ -277,18 +271,9 @@ class SkyhookUnderAttack(NotificationPing):
         logger.debug(f"Notification body: {body}")
 
         character = self._notification.character.character
-        corp_id = character.corporation_id
-        corp_ticker = character.corporation_ticker
-
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": f"{character.corporation_name} ({corp_ticker})",
-        }
 
         try:
-            attacking_char, _ = ctm.EveName.objects.get_or_create_from_esi(
-                self._data["charID"]
-            )
+            attacking_char = self.get_name(self._data["charID"])
             logger.debug(
                 f"Attacking character: {attacking_char.name} (ID: {attacking_char.eve_id})"
             )
@@ -310,23 +295,24 @@ class SkyhookUnderAttack(NotificationPing):
         if attacking_alli_name:
             attackerStr += f", **[{attacking_alli_name}]({zkillboard.alliance_url(attacking_alli_id)})**"
 
-        fields = [
-            {"name": "System/Planet", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-            {"name": "Attacker", "value": attackerStr, "inline": False},
-        ]
-
-        self.package_ping(
+        self.render_template(
+            self.template,
             title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=15158332,
+            {
+                "planet": system_name,
+                "region": region_name,
+                "type": structure_type.name,
+                "attacker": attackerStr,
+            },
+            description=body,
+            footer=templates.corporation_footer(
+                character.corporation_id,
+                character.corporation_name,
+                character.corporation_ticker,
+            ),
         )
 
-        self._corp = corp_id
+        self._corp = character.corporation_id
         self._alli = character.alliance_id
         self._region = system_db.constellation.region.region_id
         self.force_at_ping = True
@@ -353,18 +339,14 @@ class SkyhookLostShields(NotificationPing):
     vulnerableTime: 9000000000            # figure out what this is
     """
 
+    template = EmbedTemplate(7419530, ORBITAL_TIMER_FIELDS)
+
     def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
-        planet_db, _ = ctm.MapSystemPlanet.objects.get_or_create_from_esi(
-            planet_id=self._data["planetID"]
-        )
+        system_db = self.get_system(self._data["solarsystemID"])
+        planet_db = self.get_planet(self._data["planetID"])
 
-        system_name = system_db.name
         planet_name = planet_db.name
-        system_name = f"[{planet_name}]({dotlan.solar_system_url(system_name)})"
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["typeID"]
-        )
+        structure_type = self.get_item_type(self._data["typeID"])
 
         _timeTill = filetime_to_dt(self._data["timestamp"]).replace(
             tzinfo=datetime.timezone.utc
@@ -375,37 +357,25 @@ class SkyhookLostShields(NotificationPing):
         title = "Poco Reinforced"
         body = f"{structure_type.name} has lost its Shields"
 
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % (
-            self._notification.character.character.corporation_name,
-            zkillboard.corporation_url(corp_id),
-        )
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
-        }
-
-        fields = [
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-            {"name": "Owner", "value": corp_name, "inline": False},
-            {"name": "Time Till Out", "value": tile_till, "inline": False},
+        character = self._notification.character.character
+        self.render_template(
+            self.template,
+            title,
             {
-                "name": "Date Out",
-                "value": _timeTill.strftime("%Y-%m-%d %H:%M"),
-                "inline": False,
+                "system": templates.planet_link(planet_name, system_db.name),
+                "type": structure_type.name,
+                "corporation": templates.corporation_link(
+                    character.corporation_id, character.corporation_name
+                ),
+                "time_till": tile_till,
+                "date_out": _timeTill.strftime("%Y-%m-%d %H:%M"),
             },
-        ]
-
-        self.package_ping(
-            title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=7419530,
+            description=body,
+            footer=templates.corporation_footer(
+                character.corporation_id,
+                character.corporation_name,
+                character.corporation_ticker,
+            ),
         )
 
         if timers_enabled():
@@ -418,13 +388,13 @@ class SkyhookLostShields(NotificationPing):
                     system_db.name,
                     TimerType.ARMOR,
                     _timeTill,
-                    self._notification.character.character.corporation,
+                    character.corporation,
                 )
             except Exception as e:
                 logger.exception(f"PINGER: Failed to build timer OrbitalReinforced {e}")
 
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
+        self._corp = character.corporation_id
+        self._alli = character.alliance_id
         self._region = system_db.constellation.region.region_id
 
 
@@ -447,12 +417,8 @@ class SkyhookOnline(NotificationPing):
     """
 
     def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(
-            system_id=self._data["solarsystemID"]
-        )  # WTF...
-        planet_db, _ = ctm.MapSystemPlanet.objects.get_or_create_from_esi(
-            planet_id=self._data["planetID"]
-        )
+        system_db = self.get_system(self._data["solarsystemID"])  # WTF...
+        planet_db = self.get_planet(self._data["planetID"])
 
         system_name = system_db.name
         region_name = system_db.constellation.region.name
@@ -461,9 +427,7 @@ class SkyhookOnline(NotificationPing):
         system_name = f"[{planet_name}]({dotlan.solar_system_url(system_name)})"
         region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
 
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["typeID"]
-        )
+        structure_type = self.get_item_type(self._data["typeID"])
 
         title = "Skyhook Online"
         body = "{} - {} - {} Online".format(system_name, region_name, planet_name)
@@ -522,12 +486,8 @@ class SkyhookDeployed(NotificationPing):
     """
 
     def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(
-            system_id=self._data["solarsystemID"]
-        )  # WTF...
-        planet_db, _ = ctm.MapSystemPlanet.objects.get_or_create_from_esi(
-            planet_id=self._data["planetID"]
-        )
+        system_db = self.get_system(self._data["solarsystemID"])  # WTF...
+        planet_db = self.get_planet(self._data["planetID"])
 
         system_name = system_db.name
         region_name = system_db.constellation.region.name
@@ -536,9 +496,7 @@ class SkyhookDeployed(NotificationPing):
         system_name = f"[{planet_name}]({dotlan.solar_system_url(system_name)})"
         region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
 
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["typeID"]
-        )
+        structure_type = self.get_item_type(self._data["typeID"])
 
         title = "Skyhook Online"
         body = "{} - {} - {} Online".format(system_name, region_name, planet_name)
@@ -603,22 +561,16 @@ class MercenaryDenAttacked(NotificationPing):
     typeID: 85230
     """
 
+    template = EmbedTemplate(15158332, MERCENARY_DEN_ATTACK_FIELDS)
+
     def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
-        planet_db, _ = ctm.MapSystemPlanet.objects.get_or_create_from_esi(
-            planet_id=self._data["planetID"]
-        )
+        system_db = self.get_system(self._data["solarsystemID"])
+        planet_db = self.get_planet(self._data["planetID"])
 
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
+        region_db = system_db.constellation.region
         planet_name = planet_db.name
 
-        system_name = f"[{planet_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
-
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["typeID"]
-        )
+        structure_type = self.get_item_type(self._data["typeID"])
 
         title = "Merc Den Under Attack"
         shld = float(self._data["shieldPercentage"])
@@ -628,47 +580,40 @@ class MercenaryDenAttacked(NotificationPing):
             structure_type.name, shld, armr, hull
         )
 
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % (
-            self._notification.character.character.corporation_name,
-            zkillboard.corporation_url(corp_id),
-        )
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
+        character = self._notification.character.character
+        values = {
+            "planet": templates.planet_link(planet_name, system_db.name),
+            "region": templates.region_link(region_db.name),
+            "type": structure_type.name,
+            "corporation": templates.corporation_link(
+                character.corporation_id, character.corporation_name
+            ),
         }
 
-        attacking_char, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data["aggressorCharacterID"]
-        )
+        attacking_char = self.get_name(self._data["aggressorCharacterID"])
 
         attackerStr = "[%s](%s)" % (
             attacking_char.name,
             zkillboard.character_url(attacking_char.eve_id),
         )
 
-        fields = [
-            {"name": "System/Planet", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-            {"name": "Owner", "value": corp_name, "inline": False},
-            {"name": "Attacker", "value": attackerStr, "inline": False},
-        ]
+        values["attacker"] = attackerStr
 
-        self.package_ping(
+        self.render_template(
+            self.template,
             title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=15158332,
+            values,
+            description=body,
+            footer=templates.corporation_footer(
+                character.corporation_id,
+                character.corporation_name,
+                character.corporation_ticker,
+            ),
         )
 
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
+        self._corp = character.corporation_id
+        self._alli = character.alliance_id
+        self._region = region_db.region_id
         self.force_at_ping = True
 
 
@@ -695,23 +640,17 @@ class MercenaryDenReinforced(NotificationPing):
     typeID: 85230
     """
 
+    template = EmbedTemplate(7419530, MERCENARY_DEN_TIMER_FIELDS)
+
     def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
+        system_db = self.get_system(self._data["solarsystemID"])
         logger.debug(f"Loaded system: {system_db.name} (ID: {system_db.system_id})")
-        planet_db, _ = ctm.MapSystemPlanet.objects.get_or_create_from_esi(
-            planet_id=self._data["planetID"]
-        )
+        planet_db = self.get_planet(self._data["planetID"])
 
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
+        region_db = system_db.constellation.region
         planet_name = planet_db.name
 
-        system_name = f"[{planet_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
-
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["typeID"]
-        )
+        structure_type = self.get_item_type(self._data["typeID"])
 
         _timeTill = filetime_to_dt(self._data["timestampExited"]).replace(
             tzinfo=datetime.timezone.utc
@@ -722,38 +661,29 @@ class MercenaryDenReinforced(NotificationPing):
         title = "Merc Den Reinforced"
         body = f"{structure_type.name} has lost its Shields"
 
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % (
-            self._notification.character.character.corporation_name,
-            zkillboard.corporation_url(corp_id),
-        )
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
+        character = self._notification.character.character
+        values = {
+            "planet": templates.planet_link(planet_name, system_db.name),
+            "region": templates.region_link(region_db.name),
+            "type": structure_type.name,
+            "corporation": templates.corporation_link(
+                character.corporation_id, character.corporation_name
+            ),
         }
 
-        fields = [
-            {"name": "System/Planet", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-            {"name": "Owner", "value": corp_name, "inline": False},
-            {"name": "Time Till Out", "value": tile_till, "inline": False},
-            {
-                "name": "Date Out",
-                "value": _timeTill.strftime("%Y-%m-%d %H:%M"),
-                "inline": False,
-            },
-        ]
+        values["time_till"] = tile_till
+        values["date_out"] = _timeTill.strftime("%Y-%m-%d %H:%M")
 
-        self.package_ping(
+        self.render_template(
+            self.template,
             title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=7419530,
+            values,
+            description=body,
+            footer=templates.corporation_footer(
+                character.corporation_id,
+                character.corporation_name,
+                character.corporation_ticker,
+            ),
         )
 
         if timers_enabled():
@@ -766,13 +696,13 @@ class MercenaryDenReinforced(NotificationPing):
                     system_db.name,
                     TimerType.ARMOR,
                     _timeTill,
-                    self._notification.character.character.corporation,
+                    character.corporation,
                 )
             except Exception as e:
                 logger.exception(
                     f"PINGER: Failed to build timer Merc Den Reinforced {e}"
                 )
 
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
+        self._corp = character.corporation_id
+        self._alli = character.alliance_id
+        self._region = region_db.region_id
@@ -0,0 +1,246 @@
+"""
+YAML parsing for notification text.
+
+Uses libyaml's C loader when PyYAML was built with it. Only the safe schema is
+loaded, plus python tuples which show up in a few notifications, any other tag
+is read as its plain value instead of constructing objects.
+
+Parsed notifications are kept in a small LRU keyed by notification id so a
+notification retried or seen by a second character is only parsed once.
+
+Large batches, eg the backlog of a character after an outage, can be parsed
+with `parse_many()` which spreads them over a pool of spawned processes. Celery
+prefork children are daemonic and can't start processes of their own, they
+always parse in process.
+"""
+import logging
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _BaseLoader
+except ImportError:
+    from yaml import SafeLoader as _BaseLoader
+
+logger = logging.getLogger(__name__)
+
+CACHE_SIZE = 2048
+# chunks handed to each pool worker per batch
+CHUNKS_PER_WORKER = 4
+
+
+class NotificationLoader(_BaseLoader):
+    pass
+
+
+def _construct_tuple(loader, node):
+    return tuple(loader.construct_sequence(node))
+
+
+def _construct_int(loader, node):
+    return loader.construct_yaml_int(node)
+
+
+def _construct_float(loader, node):
+    return loader.construct_yaml_float(node)
+
+
+def _construct_bool(loader, node):
+    return loader.construct_yaml_bool(node)
+
+
+def _construct_none(loader, node):
+    return loader.construct_yaml_null(node)
+
+
+def _construct_untagged(loader, tag_suffix, node):
+    if isinstance(node, yaml.MappingNode):
+        return loader.construct_mapping(node)
+    if isinstance(node, yaml.SequenceNode):
+        return loader.construct_sequence(node)
+    return loader.construct_scalar(node)
+
+
+NotificationLoader.add_constructor("tag:yaml.org,2002:python/tuple", _construct_tuple)
+# the scalar python tags the old UnsafeLoader turned into python types
+NotificationLoader.add_constructor("tag:yaml.org,2002:python/int", _construct_int)
+NotificationLoader.add_constructor("tag:yaml.org,2002:python/long", _construct_int)
+NotificationLoader.add_constructor("tag:yaml.org,2002:python/float", _construct_float)
+NotificationLoader.add_constructor("tag:yaml.org,2002:python/bool", _construct_bool)
+NotificationLoader.add_constructor("tag:yaml.org,2002:python/none", _construct_none)
+NotificationLoader.add_multi_constructor("", _construct_untagged)
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+_pool_lock = threading.Lock()
+_pool = None
+_pool_disabled = False
+
+
+def is_c_loader():
+    return _BaseLoader.__name__.startswith("C")
+
+
+def parse(text):
+    return yaml.load(text, Loader=NotificationLoader)
+
+
+def _get_cached(notification_id, text):
+    with _lock:
+        cached = _cache.get(notification_id)
+        if cached is not None and cached[0] == text:
+            _cache.move_to_end(notification_id)
+            return cached[1]
+    return None
+
+
+def _store(notification_id, text, data):
+    with _lock:
+        _cache[notification_id] = (text, data)
+        _cache.move_to_end(notification_id)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def parse_notification(notification_id, text):
+    """
+    Parse the text of a notification, cached by notification id.
+    The returned dict is shared with the cache, don't modify it.
+    """
+    if notification_id is None:
+        return parse(text)
+
+    data = _get_cached(notification_id, text)
+    if data is None:
+        data = parse(text)
+        _store(notification_id, text, data)
+    return data
+
+
+def _try_parse(text):
+    """`(data, None)` or `(None, traceback)` if the text can't be parsed."""
+    try:
+        return parse(text), None
+    except Exception:
+        return None, traceback.format_exc()
+
+
+def _parse_chunk(texts):
+    return [_try_parse(text) for text in texts]
+
+
+def _is_daemon():
+    if multiprocessing.current_process().daemon:
+        return True
+    try:
+        # celery's prefork pool runs on billiard
+        from billiard.process import current_process
+    except ImportError:
+        return False
+    return bool(current_process().daemon)
+
+
+def _get_pool(workers):
+    global _pool, _pool_disabled
+    if _pool is not None or _pool_disabled:
+        return _pool
+
+    if _is_daemon():
+        _pool_disabled = True
+        return None
+
+    with _pool_lock:
+        if _pool is not None or _pool_disabled:
+            return _pool
+        try:
+            import django
+
+            workers = workers or os.cpu_count() or 1
+            # spawned so the children don't inherit db connections or redis sockets
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        except Exception as e:
+            logger.warning(f"PINGER: Unable to start the parser pool, parsing in process {e}")
+            _pool_disabled = True
+        return _pool
+
+
+def _parse_parallel(texts, workers):
+    global _pool
+    pool = _get_pool(workers)
+    if pool is None:
+        return None
+
+    chunks = (workers or os.cpu_count() or 1) * CHUNKS_PER_WORKER
+    size = math.ceil(len(texts) / chunks)
+    try:
+        results = pool.map(
+            _parse_chunk, [texts[i:i + size] for i in range(0, len(texts), size)]
+        )
+        return [result for chunk in results for result in chunk]
+    except Exception as e:
+        logger.warning(f"PINGER: Parser pool failed, parsing in process {e}")
+        if sys.version_info >= (3, 9):
+            pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            pool.shutdown(wait=False)
+        with _pool_lock:
+            # another thread may have started a new one already
+            if _pool is pool:
+                _pool = None
+        return None
+
+
+def parse_many(notifications, threshold=0, workers=None):
+    """
+    Parse `(notification_id, text)` pairs into the cache.
+
+    Returns `({notification_id: data}, {notification_id: traceback})`, one
+    broken notification doesn't stop the rest. When at least `threshold` of
+    them are not cached yet they are parsed in a process pool of `workers`
+    processes, a `threshold` of 0 always parses in process.
+    """
+    results = {}
+    failed = {}
+    missing = []
+    for notification_id, text in notifications:
+        data = None
+        if notification_id is not None:
+            data = _get_cached(notification_id, text)
+        if data is None:
+            missing.append((notification_id, text))
+        else:
+            results[notification_id] = data
+
+    parsed = None
+    if threshold and len(missing) >= threshold:
+        parsed = _parse_parallel([text for _, text in missing], workers)
+    if parsed is None:
+        parsed = _parse_chunk([text for _, text in missing])
+
+    for (notification_id, text), (data, error) in zip(missing, parsed):
+        if error is not None:
+            failed[notification_id] = error
+            continue
+        if notification_id is not None:
+            _store(notification_id, text, data)
+        results[notification_id] = data
+
+    return results, failed
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
@@ -1,6 +1,3 @@
-
-from corptools import models as ctm
-
 from django.utils.html import strip_tags
 
 from allianceauth.eveonline.evelinks import eveimageserver, evewho, zkillboard
@@ -22,10 +19,8 @@ class CorporationGoalCreated(NotificationPing):
     """
 
     def build_ping(self):
-        creator, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['creator_id'])
-        app_corp, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['corporation_id'])
+        creator = self.get_name(self._data['creator_id'])
+        app_corp = self.get_name(self._data['corporation_id'])
 
         title = "Corp Project Created"
         body = f"```{strip_tags(self._data['goal_name'])}```\n"
@@ -65,15 +60,12 @@ class CorporationGoalClosed(NotificationPing):
     """
 
     def build_ping(self):
-        creator, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['creator_id'])
+        creator = self.get_name(self._data['creator_id'])
         if "closer_id" in self._data:
-            closer, _ = ctm.EveName.objects.get_or_create_from_esi(
-                self._data['closer_id'])
+            closer = self.get_name(self._data['closer_id'])
         else:
             closer = creator
-        app_corp, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['corporation_id'])
+        app_corp = self.get_name(self._data['corporation_id'])
 
         title = "Corp Project Closed"
         body = f"```{strip_tags(self._data['goal_name'])} Closed by {closer}```\n"
@@ -112,10 +104,8 @@ class CorporationGoalCompleted(NotificationPing):
     """
 
     def build_ping(self):
-        creator, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['creator_id'])
-        app_corp, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['corporation_id'])
+        creator = self.get_name(self._data['creator_id'])
+        app_corp = self.get_name(self._data['corporation_id'])
 
         title = "Corp Project Completed"
         body = f"```{strip_tags(self._data['goal_name'])}```\n"
@@ -154,10 +144,8 @@ class CorporationGoalExpired(NotificationPing):
     """
 
     def build_ping(self):
-        creator, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['creator_id'])
-        app_corp, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['corporation_id'])
+        creator = self.get_name(self._data['creator_id'])
+        app_corp = self.get_name(self._data['corporation_id'])
 
         title = "Corp Project Expired"
         body = f"```{strip_tags(self._data['goal_name'])}```\n"
@@ -196,10 +184,8 @@ class CorporationGoalLimitReached(NotificationPing):
     """
 
     def build_ping(self):
-        creator, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['creator_id'])
-        app_corp, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['corporation_id'])
+        creator = self.get_name(self._data['creator_id'])
+        app_corp = self.get_name(self._data['corporation_id'])
 
         title = "Corp Project Limit Reached"
         body = f"```{strip_tags(self._data['goal_name'])}```\n"
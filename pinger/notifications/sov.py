@@ -1,11 +1,12 @@
 import datetime
 import logging
 
-from allianceauth.eveonline.evelinks import dotlan, eveimageserver, zkillboard
-from corptools import models as ctm
+from allianceauth.eveonline.evelinks import dotlan, zkillboard
 
+from . import templates
 from .base import NotificationPing
 from .helpers import create_timer, filetime_to_dt, format_timedelta, timers_enabled
+from .templates import EmbedTemplate, Field
 
 logger = logging.getLogger(__name__)
 
@@ -36,19 +37,15 @@ class AllAnchoringMsg(NotificationPing):
     """
 
     def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarSystemID"])
+        system_db = self.get_system(self._data["solarSystemID"])
 
         system_name = system_db.name
         system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
 
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["typeID"]
-        )
-        moon_name, _ = ctm.MapSystemMoon.objects.get_or_create_from_esi(
-            self._data["moonID"]
-        )
+        structure_type = self.get_item_type(self._data["typeID"])
+        moon_name = self.get_moon(self._data["moonID"])
 
-        owner, _ = ctm.EveName.objects.get_or_create_from_esi(self._data["corpID"])
+        owner = self.get_name(self._data["corpID"])
 
         alliance = "-" if owner.alliance is None else owner.alliance.name
         alliance_id = "-" if owner.alliance is None else owner.alliance.eve_id
@@ -68,12 +65,10 @@ class AllAnchoringMsg(NotificationPing):
         for m in self._data["corpsPresent"]:
             moons = []
             for moon in m["towers"]:
-                _moon_name, _ = ctm.MapSystemMoon.objects.get_or_create_from_esi(
-                    moon["moonID"]
-                )
+                _moon_name = self.get_moon(moon["moonID"])
                 moons.append(_moon_name.name)
 
-            _owner, _ = ctm.EveName.objects.get_or_create_from_esi(m["corpID"])
+            _owner = self.get_name(m["corpID"])
 
             fields.append({"name": _owner.name, "value": "\n".join(moons)})
 
@@ -103,14 +98,21 @@ class SovStructureReinforced(NotificationPing):
         solarSystemID: 30004639
     """
 
-    def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarSystemID"])
+    template = EmbedTemplate(
+        7419530,
+        (
+            Field("System", "system"),
+            Field("Region", "region"),
+            Field("Time Till Decloaks", "time_till", inline=False),
+            Field("Date Out", "date_out", inline=False),
+        ),
+    )
 
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
+    def build_ping(self):
+        system_db = self.get_system(self._data["solarSystemID"])
+        region_db = system_db.constellation.region
 
-        system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
+        system_name = templates.system_link(system_db.name)
 
         title = "Entosis Notification"
         body = "Sov Struct Reinforced in %s" % system_name
@@ -128,33 +130,23 @@ class SovStructureReinforced(NotificationPing):
             ref_time_delta.replace(tzinfo=datetime.timezone.utc)
             - datetime.datetime.now(datetime.timezone.utc)
         )
-        alli_id = self._notification.character.character.alliance_id
-        alli_ticker = self._notification.character.character.alliance_ticker
-
-        footer = {
-            "icon_url": eveimageserver.alliance_logo_url(alli_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.alliance_name, alli_ticker),
-        }
-
-        fields = [
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-            {"name": "Time Till Decloaks", "value": tile_till, "inline": False},
-            {
-                "name": "Date Out",
-                "value": ref_time_delta.strftime("%Y-%m-%d %H:%M"),
-                "inline": False,
-            },
-        ]
+        character = self._notification.character.character
 
-        self.package_ping(
+        self.render_template(
+            self.template,
             title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=7419530,
+            {
+                "system": system_name,
+                "region": templates.region_link(region_db.name),
+                "time_till": tile_till,
+                "date_out": ref_time_delta.strftime("%Y-%m-%d %H:%M"),
+            },
+            description=body,
+            footer=templates.alliance_footer(
+                character.alliance_id,
+                character.alliance_name,
+                character.alliance_ticker,
+            ),
         )
         if timers_enabled():
             try:
@@ -166,16 +158,16 @@ class SovStructureReinforced(NotificationPing):
                     system_db.name,
                     TimerType.HULL,
                     ref_time_delta,
-                    self._notification.character.character.corporation,
+                    character.corporation,
                 )
             except Exception as e:
                 logger.exception(
                     f"PINGER: Failed to build timer SovStructureReinforced {e}"
                 )
 
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
+        self._corp = character.corporation_id
+        self._alli = character.alliance_id
+        self._region = region_db.region_id
 
 
 class EntosisCaptureStarted(NotificationPing):
@@ -188,49 +180,42 @@ class EntosisCaptureStarted(NotificationPing):
         structureTypeID: 32458
     """
 
+    template = EmbedTemplate(
+        15158332, (Field("System", "system"), Field("Region", "region"))
+    )
+
     def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarSystemID"])
+        system_db = self.get_system(self._data["solarSystemID"])
+        region_db = system_db.constellation.region
 
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
+        system_name = templates.system_link(system_db.name)
 
-        system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
-
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
+        structure_type = self.get_item_type(self._data["structureTypeID"])
 
         title = "Entosis Notification"
 
         body = "Entosis has started in %s on %s" % (system_name, structure_type.name)
 
-        alli_id = self._notification.character.character.alliance_id
-        alli_ticker = self._notification.character.character.alliance_ticker
-
-        footer = {
-            "icon_url": eveimageserver.alliance_logo_url(alli_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.alliance_name, alli_ticker),
-        }
+        character = self._notification.character.character
 
-        fields = [
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-        ]
-
-        self.package_ping(
+        self.render_template(
+            self.template,
             title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=15158332,
+            {
+                "system": system_name,
+                "region": templates.region_link(region_db.name),
+            },
+            description=body,
+            footer=templates.alliance_footer(
+                character.alliance_id,
+                character.alliance_name,
+                character.alliance_ticker,
+            ),
         )
 
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
+        self._corp = character.corporation_id
+        self._alli = character.alliance_id
+        self._region = region_db.region_id
         self.force_at_ping = True
 
 
@@ -2,13 +2,11 @@ import datetime
 import logging
 import time
 
-from allianceauth.eveonline.evelinks import dotlan, eveimageserver, zkillboard
-from corptools import models as ctm
-from corptools.task_helpers.update_tasks import fetch_location_name
+from allianceauth.eveonline.evelinks import dotlan, eveimageserver
 
 from ..exceptions import MutedException
-from ..models import MutedStructure
 from ..providers import cache_client
+from . import templates
 from .base import NotificationPing
 from .helpers import (
     create_timer,
@@ -17,92 +15,62 @@ from .helpers import (
     time_till_to_string,
     timers_enabled,
 )
+from .templates import EmbedTemplate, Field
 
 logger = logging.getLogger(__name__)
 
 
-class StructureLostShields(NotificationPing):
-    category = "sturucture-attack"  # Structure Alerts
+STRUCTURE_TIMER_FIELDS = (
+    Field("System", "system"),
+    Field("Type", "type"),
+    Field("Owner", "corporation", inline=False),
+    Field("Time Till Out", "time_till", inline=False),
+    Field("Date Out", "date_out", inline=False),
+)
 
-    """
-        StructureLostShields Example
 
-        solarsystemID: 30004608
-        structureID: &id001 1036096310753
-        structureShowInfoData:
-        - showinfo
-        - 35835
-        - *id001
-        structureTypeID: 35835
-        timeLeft: 958011150532
-        timestamp: 132792333490000000
-        vulnerableTime: 9000000000
+class StructureTimerPing(NotificationPing, abstract=True):
+    """
+    A structure lost a layer and came out of it with a timer, subclasses
+    declare their `template` and the `Timer.TimerType` name of the next timer.
     """
 
-    def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
+    category = "sturucture-attack"  # Structure Alerts
 
-        system_name = system_db.name
-        system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
+    template = None
+    timer_type = None
 
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
+    def build_ping(self):
+        system_db = self.get_system(self._data["solarsystemID"])
 
-        try:
-            structure_name = fetch_location_name(
-                self._data["structureID"],
-                "solar_system",
-                self._notification.character.character.character_id,
-            )
-            if structure_name:
-                structure_name = structure_name.location_name
-            else:
-                structure_name = "Attack Notification"
+        structure_type = self.get_item_type(self._data["structureTypeID"])
 
-        except Exception as e:
-            logger.error(f"PINGER: Error fetching structure name? {e}")
-            structure_name = "Attack Notification"
+        structure_name = self.get_structure_name(
+            self._data["structureID"], "Attack Notification"
+        )
 
         _secondsRemaining = self._data["timeLeft"] / 10000000  # seconds
         _refTimeDelta = datetime.timedelta(seconds=_secondsRemaining)
-        tile_till = format_timedelta(_refTimeDelta)
         ref_date_time = self._notification.timestamp + _refTimeDelta
 
-        title = structure_name
-        body = "Structure has lost its Shields"
-
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % (
-            self._notification.character.character.corporation_name,
-            zkillboard.corporation_url(corp_id),
-        )
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
-        }
-
-        fields = [
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-            {"name": "Owner", "value": corp_name, "inline": False},
-            {"name": "Time Till Out", "value": tile_till, "inline": False},
+        character = self._notification.character.character
+        self.render_template(
+            self.template,
+            structure_name,
             {
-                "name": "Date Out",
-                "value": ref_date_time.strftime("%Y-%m-%d %H:%M"),
-                "inline": False,
+                "system": templates.system_link(system_db.name),
+                "type": structure_type.name,
+                "corporation": templates.corporation_link(
+                    character.corporation_id, character.corporation_name
+                ),
+                "time_till": format_timedelta(_refTimeDelta),
+                "date_out": ref_date_time.strftime("%Y-%m-%d %H:%M"),
             },
-        ]
-
-        self.package_ping(
-            title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=7419530,
+            footer=templates.corporation_footer(
+                character.corporation_id,
+                character.corporation_name,
+                character.corporation_ticker,
+            ),
         )
 
         if timers_enabled():
@@ -113,23 +81,43 @@ class StructureLostShields(NotificationPing):
                     structure_name,
                     structure_type.name,
                     system_db.name,
-                    Timer.TimerType.ARMOR,
+                    getattr(Timer.TimerType, self.timer_type),
                     ref_date_time,
-                    self._notification.character.character.corporation,
+                    character.corporation,
                 )
             except Exception as e:
                 logger.exception(
-                    f"PINGER: Failed to build timer StructureLostShields {e}"
+                    f"PINGER: Failed to build timer {type(self).__name__} {e}"
                 )
 
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
+        self._corp = character.corporation_id
+        self._alli = character.alliance_id
         self._region = system_db.constellation.region.region_id
 
 
-class StructureLostArmor(NotificationPing):
-    category = "sturucture-attack"  # Structure Alerts
+class StructureLostShields(StructureTimerPing):
+    """
+        StructureLostShields Example
+
+        solarsystemID: 30004608
+        structureID: &id001 1036096310753
+        structureShowInfoData:
+        - showinfo
+        - 35835
+        - *id001
+        structureTypeID: 35835
+        timeLeft: 958011150532
+        timestamp: 132792333490000000
+        vulnerableTime: 9000000000
+    """
+
+    timer_type = "ARMOR"
+    template = EmbedTemplate(
+        7419530, STRUCTURE_TIMER_FIELDS, "Structure has lost its Shields"
+    )
+
 
+class StructureLostArmor(StructureTimerPing):
     """
         StructureLostArmor Example
 
@@ -145,92 +133,10 @@ class StructureLostArmor(NotificationPing):
         vulnerableTime: 18000000000
     """
 
-    def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
-
-        system_name = system_db.name
-        system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
-
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
-
-        try:
-            structure_name = fetch_location_name(
-                self._data["structureID"],
-                "solar_system",
-                self._notification.character.character.character_id,
-            )
-            if structure_name:
-                structure_name = structure_name.location_name
-            else:
-                structure_name = "Attack Notification"
-
-        except Exception as e:
-            logger.error(f"PINGER: Error fetching structure name? {e}")
-            structure_name = "Attack Notification"
-
-        _secondsRemaining = self._data["timeLeft"] / 10000000  # seconds
-        _refTimeDelta = datetime.timedelta(seconds=_secondsRemaining)
-        tile_till = format_timedelta(_refTimeDelta)
-        ref_date_time = self._notification.timestamp + _refTimeDelta
-
-        title = structure_name
-        body = "Structure has lost its Armor"
-
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % (
-            self._notification.character.character.corporation_name,
-            zkillboard.corporation_url(corp_id),
-        )
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
-        }
-
-        fields = [
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-            {"name": "Owner", "value": corp_name, "inline": False},
-            {"name": "Time Till Out", "value": tile_till, "inline": False},
-            {
-                "name": "Date Out",
-                "value": ref_date_time.strftime("%Y-%m-%d %H:%M"),
-                "inline": False,
-            },
-        ]
-
-        self.package_ping(
-            title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=7419530,
-        )
-
-        if timers_enabled():
-            try:
-                from allianceauth.timerboard.models import Timer
-
-                self.timer = create_timer(
-                    structure_name,
-                    structure_type.name,
-                    system_db.name,
-                    Timer.TimerType.HULL,
-                    ref_date_time,
-                    self._notification.character.character.corporation,
-                )
-            except Exception as e:
-                logger.exception(
-                    f"PINGER: Failed to build timer StructureLostArmor {e}"
-                )
-
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
+    timer_type = "HULL"
+    template = EmbedTemplate(
+        7419530, STRUCTURE_TIMER_FIELDS, "Structure has lost its Armor"
+    )
 
 
 class StructureUnderAttack(NotificationPing):
@@ -263,48 +169,30 @@ class StructureUnderAttack(NotificationPing):
         structureTypeID: 35835
     """
 
-    def build_ping(self):
-        try:
-            muted = MutedStructure.objects.get(structure_id=self._data["structureID"])
-            if muted.expired():
-                muted.delete()
-            else:
-                raise MutedException()
-        except MutedStructure.DoesNotExist:
-            # no mutes move on
-            pass
-
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
+    template = EmbedTemplate(
+        15158332,
+        (
+            Field("System", "system"),
+            Field("Region", "region"),
+            Field("Type", "type"),
+            Field("Attacker", "attacker", inline=False),
+        ),
+    )
 
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
+    def build_ping(self):
+        if self.is_muted(self._data["structureID"]):
+            raise MutedException()
 
-        system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
+        system_db = self.get_system(self._data["solarsystemID"])
+        region_db = system_db.constellation.region
 
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
+        structure_type = self.get_item_type(self._data["structureTypeID"])
 
-        _url = eveimageserver.type_icon_url(self._data["structureTypeID"], 64)
+        _url = templates.type_icon_url(self._data["structureTypeID"], 64)
 
-        try:
-            structure_name = fetch_location_name(
-                self._data["structureID"],
-                "solar_system",
-                self._notification.character.character.character_id,
-            )
-            if structure_name:
-                structure_name = structure_name.location_name
-            else:
-                logger.error(
-                    f"PINGER: Failed to fetch structure_name: {structure_name} "
-                    f"(structureID={self._data['structureID']}, charID={self._notification.character.character.character_id})"
-                )
-                structure_name = "Attack Notification"
-        except Exception as e:
-            logger.error(f"PINGER: Error fetching structure name? {e}")
-            structure_name = "Attack Notification"
+        structure_name = self.get_structure_name(
+            self._data["structureID"], "Attack Notification"
+        )
 
         title = structure_name
         shld = float(self._data["shieldPercentage"])
@@ -316,20 +204,9 @@ class StructureUnderAttack(NotificationPing):
             )
         )
 
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        # corp_name = "[%s](%s)" % \
-        #     (self._notification.character.character.corporation_name,
-        #      zkillboard.corporation_url(corp_id))
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
-        }
+        character = self._notification.character.character
 
-        attacking_char, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data["charID"]
-        )
+        attacking_char = self.get_name(self._data["charID"])
 
         char_name = getattr(attacking_char, "name", "") or ""
         char_id = getattr(attacking_char, "eve_id", "") or ""
@@ -350,26 +227,27 @@ class StructureUnderAttack(NotificationPing):
             alliance_id = getattr(attacking_char.alliance, "eve_id", "") or ""
             attackerStr += f", **[{alliance_name}](https://zkillboard.com/alliance/{alliance_id})**"
 
-        fields = [
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-            {"name": "Attacker", "value": attackerStr, "inline": False},
-        ]
-
-        self.package_ping(
+        self.render_template(
+            self.template,
             title,
-            body,
-            self._notification.timestamp,
+            {
+                "system": templates.system_link(system_db.name),
+                "region": templates.region_link(region_db.name),
+                "type": structure_type.name,
+                "attacker": attackerStr,
+            },
+            description=body,
+            footer=templates.corporation_footer(
+                character.corporation_id,
+                character.corporation_name,
+                character.corporation_ticker,
+            ),
             img_url=_url,
-            fields=fields,
-            footer=footer,
-            colour=15158332,
         )
 
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
+        self._corp = character.corporation_id
+        self._alli = character.alliance_id
+        self._region = region_db.region_id
         self.force_at_ping = True
 
         if structure_name != "Unknown":
@@ -396,7 +274,7 @@ class OwnershipTransferred(NotificationPing):
     """
 
     def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarSystemID"])
+        system_db = self.get_system(self._data["solarSystemID"])
 
         system_name = system_db.name
         region_name = system_db.constellation.region.name
@@ -404,21 +282,15 @@ class OwnershipTransferred(NotificationPing):
         system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
         region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
 
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
+        structure_type = self.get_item_type(self._data["structureTypeID"])
 
         structure_name = self._data["structureName"]
 
         title = "Structure Transfered"
 
-        originator, _ = ctm.EveName.objects.get_or_create_from_esi(self._data["charID"])
-        new_owner, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data["newOwnerCorpID"]
-        )
-        old_owner, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data["oldOwnerCorpID"]
-        )
+        originator = self.get_name(self._data["charID"])
+        new_owner = self.get_name(self._data["newOwnerCorpID"])
+        old_owner = self.get_name(self._data["oldOwnerCorpID"])
 
         body = "Structure Transfered from %s to %s" % (old_owner.name, new_owner.name)
 
@@ -458,9 +330,66 @@ class OwnershipTransferred(NotificationPing):
         self._region = system_db.constellation.region.region_id
 
 
-class StructureAnchoring(NotificationPing):
+STRUCTURE_ADMIN_FIELDS = (
+    Field("Corporation", "corporation"),
+    Field("System", "system"),
+    Field("Region", "region"),
+    Field("Type", "type"),
+)
+
+
+class StructureAdminPing(NotificationPing, abstract=True):
+    """
+    Structure state changes that all share one embed, subclasses declare their
+    `template` and add any extra field values in `get_values()`.
+    """
+
     category = "sturucture-admin"  # Structure Alerts
 
+    template = None
+    default_name = "Structure Notification"
+
+    def get_values(self):
+        return {}
+
+    def build_ping(self):
+        system_db = self.get_system(self._data["solarsystemID"])
+        region_db = system_db.constellation.region
+
+        structure_type = self.get_item_type(self._data["structureTypeID"])
+
+        structure_name = self.get_structure_name(
+            self._data["structureID"], self.default_name
+        )
+
+        character = self._notification.character.character
+        values = {
+            "corporation": templates.corporation_link(
+                character.corporation_id, character.corporation_name
+            ),
+            "system": templates.system_link(system_db.name),
+            "region": templates.region_link(region_db.name),
+            "type": structure_type.name,
+        }
+        values.update(self.get_values())
+
+        self.render_template(
+            self.template,
+            structure_name,
+            values,
+            footer=templates.corporation_footer(
+                character.corporation_id,
+                character.corporation_name,
+                character.corporation_ticker,
+            ),
+        )
+
+        self._corp = character.corporation_id
+        self._alli = character.alliance_id
+        self._region = region_db.region_id
+
+
+class StructureAnchoring(StructureAdminPing):
     """
     StructureAnchoring
 
@@ -480,73 +409,12 @@ class StructureAnchoring(NotificationPing):
     vulnerableTime: 9000000000
     """
 
-    def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
+    template = EmbedTemplate(
+        1752220, STRUCTURE_ADMIN_FIELDS, "Structure Anchoring!"
+    )
 
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
-
-        system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
-
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
-
-        try:
-            structure_name = fetch_location_name(
-                self._data["structureID"],
-                "solar_system",
-                self._notification.character.character.character_id,
-            )
-            if structure_name:
-                structure_name = structure_name.location_name
-            else:
-                structure_name = "Structure Notification"
-
-        except Exception as e:
-            logger.error(f"PINGER: Error fetching structure name? {e}")
-            structure_name = "Structure Notification"
-
-        title = structure_name
-        body = "Structure Anchoring!"
-
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % (
-            self._notification.character.character.corporation_name,
-            zkillboard.corporation_url(corp_id),
-        )
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
-        }
-
-        fields = [
-            {"name": "Corporation", "value": corp_name, "inline": True},
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-        ]
-        self.package_ping(
-            title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=1752220,
-        )
-
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
-        self.force_at_ping = False
-
-
-class StructureWentLowPower(NotificationPing):
-    category = "sturucture-admin"  # Structure Alerts
 
+class StructureWentLowPower(StructureAdminPing):
     """
     StructureWentLowPower
 
@@ -559,74 +427,12 @@ class StructureWentLowPower(NotificationPing):
     structureTypeID: 35832
     """
 
-    def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
-
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
-
-        system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
-
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
-
-        try:
-            structure_name = fetch_location_name(
-                self._data["structureID"],
-                "solar_system",
-                self._notification.character.character.character_id,
-            )
-            if structure_name:
-                structure_name = structure_name.location_name
-            else:
-                structure_name = "Structure Notification"
-
-        except Exception as e:
-            logger.error(f"PINGER: Error fetching structure name? {e}")
-            structure_name = "Structure Notification"
-
-        title = structure_name
-        body = "Structure Went Low Power!"
-
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % (
-            self._notification.character.character.corporation_name,
-            zkillboard.corporation_url(corp_id),
-        )
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
-        }
-
-        fields = [
-            {"name": "Corporation", "value": corp_name, "inline": True},
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-        ]
-
-        self.package_ping(
-            title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=15158332,
-        )
-
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
-        self.force_at_ping = False
-
+    template = EmbedTemplate(
+        15158332, STRUCTURE_ADMIN_FIELDS, "Structure Went Low Power!"
+    )
 
-class StructureWentHighPower(NotificationPing):
-    category = "sturucture-admin"  # Structure Alerts
 
+class StructureWentHighPower(StructureAdminPing):
     """
     StructureWentHighPower
 
@@ -639,74 +445,12 @@ class StructureWentHighPower(NotificationPing):
     structureTypeID: 35841
     """
 
-    def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
-
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
-
-        system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
-
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
-
-        try:
-            structure_name = fetch_location_name(
-                self._data["structureID"],
-                "solar_system",
-                self._notification.character.character.character_id,
-            )
-            if structure_name:
-                structure_name = structure_name.location_name
-            else:
-                structure_name = "Structure Notification"
-
-        except Exception as e:
-            logger.error(f"PINGER: Error fetching structure name? {e}")
-            structure_name = "Structure Notification"
-
-        title = structure_name
-        body = "Structure Went High Power!"
-
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % (
-            self._notification.character.character.corporation_name,
-            zkillboard.corporation_url(corp_id),
-        )
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
-        }
-
-        fields = [
-            {"name": "Corporation", "value": corp_name, "inline": True},
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-        ]
-
-        self.package_ping(
-            title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=3066993,
-        )
-
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
-        self.force_at_ping = False
-
+    template = EmbedTemplate(
+        3066993, STRUCTURE_ADMIN_FIELDS, "Structure Went High Power!"
+    )
 
-class StructureUnanchoring(NotificationPing):
-    category = "sturucture-admin"  # Structure Alerts
 
+class StructureUnanchoring(StructureAdminPing):
     """
     StructureUnanchoring
 
@@ -725,81 +469,25 @@ class StructureUnanchoring(NotificationPing):
     timeLeft: 27000531441
     """
 
-    def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
-
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
-
-        system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
-
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
-
-        try:
-            structure_name = fetch_location_name(
-                self._data["structureID"],
-                "solar_system",
-                self._notification.character.character.character_id,
-            )
-            if structure_name:
-                structure_name = structure_name.location_name
-            else:
-                structure_name = "Structure Notification"
-
-        except Exception as e:
-            logger.error(f"PINGER: Error fetching structure name? {e}")
-            structure_name = "Structure Notification"
-
-        title = structure_name
-        body = "Structure Unanchoring!"
-
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % (
-            self._notification.character.character.corporation_name,
-            zkillboard.corporation_url(corp_id),
-        )
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
-        }
+    template = EmbedTemplate(
+        10181046,
+        STRUCTURE_ADMIN_FIELDS
+        + (
+            Field("Time Till Out", "time_till", inline=False),
+            Field("Date Out", "date_out", inline=False),
+        ),
+        "Structure Unanchoring!",
+    )
+
+    def get_values(self):
         date_out = time_till_to_dt(self._data["timeLeft"], self._notification.timestamp)
-        time_till = time_till_to_string(self._data["timeLeft"])
-        fields = [
-            {"name": "Corporation", "value": corp_name, "inline": True},
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-            {"name": "Time Till Out", "value": time_till, "inline": False},
-            {
-                "name": "Date Out",
-                "value": date_out.strftime("%Y-%m-%d %H:%M"),
-                "inline": False,
-            },
-        ]
-
-        self.package_ping(
-            title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=10181046,
-        )
-
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
-        self.force_at_ping = False
+        return {
+            "time_till": time_till_to_string(self._data["timeLeft"]),
+            "date_out": date_out.strftime("%Y-%m-%d %H:%M"),
+        }
 
 
-class StructureDestroyed(NotificationPing):
-    category = "sturucture-admin"  # Structure Alerts
-
+class StructureDestroyed(StructureAdminPing):
     """
     StructureDestroyed
 
@@ -818,69 +506,10 @@ class StructureDestroyed(NotificationPing):
     structureTypeID: 35825
     """
 
-    def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
-
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
-
-        system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
-
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
-
-        try:
-            structure_name = fetch_location_name(
-                self._data["structureID"],
-                "solar_system",
-                self._notification.character.character.character_id,
-            )
-            if structure_name:
-                structure_name = structure_name.location_name
-            else:
-                structure_name = "Attack Notification"
-
-        except Exception as e:
-            logger.error(f"PINGER: Error fetching structure name? {e}")
-            structure_name = "Attack Notification"
-
-        title = structure_name
-        body = "Structure Destroyed!"
-
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % (
-            self._notification.character.character.corporation_name,
-            zkillboard.corporation_url(corp_id),
-        )
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
-        }
-
-        fields = [
-            {"name": "Corporation", "value": corp_name, "inline": True},
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-        ]
-
-        self.package_ping(
-            title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=15158332,
-        )
-
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
-        self.force_at_ping = False
+    default_name = "Attack Notification"
+    template = EmbedTemplate(
+        15158332, STRUCTURE_ADMIN_FIELDS, "Structure Destroyed!"
+    )
 
 
 """
@@ -914,9 +543,7 @@ structureTypeID: 35833
 """
 
 
-class StructureNoReagentsAlert(NotificationPing):
-    category = "sturucture-admin"  # Structure Alerts
-
+class StructureNoReagentsAlert(StructureAdminPing):
     """
     StructureNoReagentsAlert
 
@@ -929,73 +556,13 @@ class StructureNoReagentsAlert(NotificationPing):
     structureTypeID: 81826
     """
 
-    def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
-
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
-
-        system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
-
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
-
-        try:
-            structure_name = fetch_location_name(
-                self._data["structureID"],
-                "solar_system",
-                self._notification.character.character.character_id,
-            )
-            if structure_name:
-                structure_name = structure_name.location_name
-            else:
-                structure_name = "Structure Notification"
-
-        except Exception as e:
-            logger.error(f"PINGER: Error fetching structure name? {e}")
-            structure_name = "Structure Notification"
+    force_at_ping = True
+    template = EmbedTemplate(
+        10181046, STRUCTURE_ADMIN_FIELDS, "Structure Out of Reagents!"
+    )
 
-        title = structure_name
-        body = "Structure Out of Reagents!"
-
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % (
-            self._notification.character.character.corporation_name,
-            zkillboard.corporation_url(corp_id),
-        )
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
-        }
-        fields = [
-            {"name": "Corporation", "value": corp_name, "inline": True},
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-        ]
-
-        self.package_ping(
-            title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=10181046,
-        )
-
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
-        self.force_at_ping = True
-
-
-class StructureLowReagentsAlert(NotificationPing):
-    category = "sturucture-admin"  # Structure Alerts
 
+class StructureLowReagentsAlert(StructureAdminPing):
     """
     StructureLowReagentsAlert
 
@@ -1008,65 +575,7 @@ class StructureLowReagentsAlert(NotificationPing):
     structureTypeID: 81826
     """
 
-    def build_ping(self):
-        system_db = ctm.MapSystem.objects.get(system_id=self._data["solarsystemID"])
-
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
-
-        system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
-
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data["structureTypeID"]
-        )
-
-        try:
-            structure_name = fetch_location_name(
-                self._data["structureID"],
-                "solar_system",
-                self._notification.character.character.character_id,
-            )
-            if structure_name:
-                structure_name = structure_name.location_name
-            else:
-                structure_name = "Structure Notification"
-
-        except Exception as e:
-            logger.error(f"PINGER: Error fetching structure name? {e}")
-            structure_name = "Structure Notification"
-
-        title = structure_name
-        body = "Structure Low Reagents!"
-
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % (
-            self._notification.character.character.corporation_name,
-            zkillboard.corporation_url(corp_id),
-        )
-        footer = {
-            "icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-            "text": "%s (%s)"
-            % (self._notification.character.character.corporation_name, corp_ticker),
-        }
-        fields = [
-            {"name": "Corporation", "value": corp_name, "inline": True},
-            {"name": "System", "value": system_name, "inline": True},
-            {"name": "Region", "value": region_name, "inline": True},
-            {"name": "Type", "value": structure_type.name, "inline": True},
-        ]
-
-        self.package_ping(
-            title,
-            body,
-            self._notification.timestamp,
-            fields=fields,
-            footer=footer,
-            colour=10181046,
-        )
-
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
-        self.force_at_ping = True
+    force_at_ping = True
+    template = EmbedTemplate(
+        10181046, STRUCTURE_ADMIN_FIELDS, "Structure Low Reagents!"
+    )
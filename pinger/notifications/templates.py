@@ -0,0 +1,153 @@
+"""
+Declarative embed templates.
+
+A ping class declares its embed once as an `EmbedTemplate` of `Field`s. The
+template is compiled when the class is defined: every static piece of JSON,
+the colour, the field names and inline flags and the fixed description, is
+encoded up front. Rendering only encodes the values and joins the pieces, the
+output is byte for byte what `NotificationPing.package_ping()` would produce
+for the same embed.
+
+Footers, zkill/dotlan links and type icons only depend on their ids so they
+are cached per process.
+"""
+import functools
+import json
+from json.encoder import encode_basestring_ascii
+
+from allianceauth.eveonline.evelinks import dotlan, eveimageserver, zkillboard
+
+CACHE_SIZE = 4096
+
+
+def encode(value):
+    """`json.dumps(value)` with a fast path for strings."""
+    if type(value) is str:
+        return encode_basestring_ascii(value)
+    return json.dumps(value)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def corporation_link(corporation_id, corporation_name):
+    return "[%s](%s)" % (corporation_name, zkillboard.corporation_url(corporation_id))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def corporation_footer(corporation_id, corporation_name, corporation_ticker):
+    """Encoded footer with the corp logo and `name (ticker)`."""
+    return encode({
+        "icon_url": eveimageserver.corporation_logo_url(corporation_id, 64),
+        "text": "%s (%s)" % (corporation_name, corporation_ticker),
+    })
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def alliance_footer(alliance_id, alliance_name, alliance_ticker):
+    """Encoded footer with the alliance logo and `name (ticker)`."""
+    return encode({
+        "icon_url": eveimageserver.alliance_logo_url(alliance_id, 64),
+        "text": "%s (%s)" % (alliance_name, alliance_ticker),
+    })
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def system_link(system_name):
+    return f"[{system_name}]({dotlan.solar_system_url(system_name)})"
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def planet_link(planet_name, system_name):
+    """The planet's name linked to its system."""
+    return f"[{planet_name}]({dotlan.solar_system_url(system_name)})"
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def region_link(region_name):
+    return f"[{region_name}]({dotlan.region_url(region_name)})"
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def type_icon_url(type_id, size=64):
+    return eveimageserver.type_icon_url(type_id, size)
+
+
+class Field:
+    """An embed field, `key` is looked up in the values given to `render()`."""
+
+    __slots__ = ("name", "key", "inline", "prefix", "suffix")
+
+    def __init__(self, name, key, inline=True):
+        self.name = name
+        self.key = key
+        self.inline = inline
+        self.prefix = '{"name": ' + encode(name) + ', "value": '
+        self.suffix = ', "inline": ' + encode(inline) + "}"
+
+
+class EmbedTemplate:
+    """
+    A precompiled embed.
+
+    `description` is either fixed here or given to every `render()` call.
+    """
+
+    def __init__(self, colour, fields=(), description=None):
+        self.colour = colour
+        self.fields = tuple(fields)
+        self.description = description
+
+        self._head = '{"color": ' + encode(colour) + ', "title": '
+        if description is not None:
+            self._description = (
+                ', "description": ' + encode(description) + ', "timestamp": '
+            )
+        else:
+            self._description = None
+        self._fields = tuple((f.prefix, f.key, f.suffix) for f in self.fields)
+
+    def extend(self, fields=(), colour=None, description=None):
+        """A new template with more fields and optionally a new colour/body."""
+        return EmbedTemplate(
+            self.colour if colour is None else colour,
+            self.fields + tuple(fields),
+            self.description if description is None else description,
+        )
+
+    def render(self, title, timestamp, values=None, description=None,
+               footer=None, img_url=None):
+        """
+        The embed JSON. `footer` is an encoded footer as returned by
+        `corporation_footer()`.
+        """
+        parts = [self._head, encode(title)]
+        if self._description is not None:
+            parts.append(self._description)
+        else:
+            parts.append(', "description": ')
+            parts.append(encode(description))
+            parts.append(', "timestamp": ')
+        parts.append(encode(timestamp.replace(tzinfo=None).isoformat()))
+
+        if self._fields:
+            parts.append(', "fields": [')
+            first = True
+            for prefix, key, suffix in self._fields:
+                if not first:
+                    parts.append(", ")
+                first = False
+                parts.append(prefix)
+                parts.append(encode(values[key]))
+                parts.append(suffix)
+            parts.append("]")
+
+        if img_url:
+            parts.append(', "image": {"url": ')
+            parts.append(encode(img_url))
+            parts.append("}")
+
+        if footer:
+            parts.append(', "footer": ')
+            parts.append(footer)
+
+        parts.append("}")
+        return "".join(parts)
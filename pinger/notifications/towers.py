@@ -1,13 +1,13 @@
 
 import time
 
-from allianceauth.eveonline.evelinks import dotlan, eveimageserver, zkillboard
-from corptools import models as ctm
+from allianceauth.eveonline.evelinks import zkillboard
 
 from ..exceptions import MutedException
-from ..models import MutedStructure
 from ..providers import cache_client
+from . import templates
 from .base import NotificationPing
+from .templates import EmbedTemplate, Field
 
 
 class TowerAlertMsg(NotificationPing):
@@ -27,32 +27,27 @@ class TowerAlertMsg(NotificationPing):
     typeID: 27786
     """
 
-    def build_ping(self):
-        try:
-            muted = MutedStructure.objects.get(
-                structure_id=self._data['moonID'])
-            if muted.expired():
-                muted.delete()
-            else:
-                raise MutedException()
-        except MutedStructure.DoesNotExist:
-            # no mutes move on
-            pass
-
-        system_db = ctm.MapSystem.objects.get(
-            system_id=self._data['solarSystemID'])
+    template = EmbedTemplate(
+        15105570,
+        (
+            Field("Moon", "moon"),
+            Field("System", "system"),
+            Field("Region", "region"),
+            Field("Type", "type"),
+            Field("Attacker", "attacker", inline=False),
+        ),
+    )
 
-        system_name = system_db.name
-        region_name = system_db.constellation.region.name
+    def build_ping(self):
+        if self.is_muted(self._data['moonID']):
+            raise MutedException()
 
-        system_name = f"[{system_name}]({dotlan.solar_system_url(system_name)})"
-        region_name = f"[{region_name}]({dotlan.region_url(region_name)})"
+        system_db = self.get_system(self._data['solarSystemID'])
+        region_db = system_db.constellation.region
 
-        moon, _ = ctm.MapSystemMoon.objects.get_or_create_from_esi(
-            self._data['moonID'])
+        moon = self.get_moon(self._data['moonID'])
 
-        structure_type, _ = ctm.EveItemType.objects.get_or_create_from_esi(
-            self._data['typeID'])
+        structure_type = self.get_item_type(self._data['typeID'])
 
         title = "Starbase Under Attack!"
         shld = float(self._data['shieldValue']*100)
@@ -61,25 +56,16 @@ class TowerAlertMsg(NotificationPing):
         body = "Structure under Attack!\n[ S: {0:.2f}% A: {1:.2f}% H: {2:.2f}% ]".format(
             shld, armr, hull)
 
-        corp_id = self._notification.character.character.corporation_id
-        corp_ticker = self._notification.character.character.corporation_ticker
-        corp_name = "[%s](%s)" % \
-            (self._notification.character.character.corporation_name,
-             zkillboard.corporation_url(corp_id))
-        footer = {"icon_url": eveimageserver.corporation_logo_url(corp_id, 64),
-                  "text": "%s (%s)" % (self._notification.character.character.corporation_name, corp_ticker)}
+        character = self._notification.character.character
 
         attackerStr = "Unknown"
         if self._data['aggressorID']:
-            attacking_char, _ = ctm.EveName.objects.get_or_create_from_esi(
-                self._data['aggressorID'])
-            attacking_char_corp, _ = ctm.EveName.objects.get_or_create_from_esi(
-                self._data['aggressorCorpID'])
+            attacking_char = self.get_name(self._data['aggressorID'])
+            attacking_char_corp = self.get_name(self._data['aggressorCorpID'])
             attacking_alliance_name = ""
             attacking_alliance_id = None
             if self._data.get('aggressorAllianceID', False):
-                attacking_char_alliance, _ = ctm.EveName.objects.get_or_create_from_esi(
-                    self._data['aggressorAllianceID'])
+                attacking_char_alliance = self.get_name(self._data['aggressorAllianceID'])
                 attacking_alliance_name = attacking_char_alliance.name
                 attacking_alliance_id = attacking_char_alliance.eve_id
 
@@ -88,22 +74,27 @@ class TowerAlertMsg(NotificationPing):
                           f"[{attacking_char_corp.name}]({zkillboard.corporation_url(attacking_char_corp.eve_id)})",
                           f"**[{attacking_alliance_name}]({zkillboard.alliance_url(attacking_alliance_id)})**" if attacking_alliance_id else "")
 
-        fields = [{'name': 'Moon', 'value': moon.name, 'inline': True},
-                  {'name': 'System', 'value': system_name, 'inline': True},
-                  {'name': 'Region', 'value': region_name, 'inline': True},
-                  {'name': 'Type', 'value': structure_type.name, 'inline': True},
-                  {'name': 'Attacker', 'value': attackerStr, 'inline': False}]
-
-        self.package_ping(title,
-                          body,
-                          self._notification.timestamp,
-                          fields=fields,
-                          footer=footer,
-                          colour=15105570)
-
-        self._corp = self._notification.character.character.corporation_id
-        self._alli = self._notification.character.character.alliance_id
-        self._region = system_db.constellation.region.region_id
+        self.render_template(
+            self.template,
+            title,
+            {
+                'moon': moon.name,
+                'system': templates.system_link(system_db.name),
+                'region': templates.region_link(region_db.name),
+                'type': structure_type.name,
+                'attacker': attackerStr,
+            },
+            description=body,
+            footer=templates.corporation_footer(
+                character.corporation_id,
+                character.corporation_name,
+                character.corporation_ticker,
+            ),
+        )
+
+        self._corp = character.corporation_id
+        self._alli = character.alliance_id
+        self._region = region_db.region_id
         self.force_at_ping = True
 
         if moon.name:
@@ -1,5 +1,4 @@
 from allianceauth.eveonline.evelinks import eveimageserver
-from corptools import models as ctm
 from django.utils.html import strip_tags
 
 from .base import NotificationPing
@@ -27,10 +26,8 @@ class WarDeclared(NotificationPing):
 
     def build_ping(self):
         title = "War Declared"
-        declared_by_name, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['declaredByID'])
-        against_by_name, _ = ctm.EveName.objects.get_or_create_from_esi(
-            self._data['againstID'])
+        declared_by_name = self.get_name(self._data['declaredByID'])
+        against_by_name = self.get_name(self._data['againstID'])
         body = f"War against `{against_by_name}` declared by `{declared_by_name}`\nWar HQ `{strip_tags(self._data['warHQ'])}`\nFighting can commence in {self._data['delayHours']} hours"
 
         corp_id = self._notification.character.character.corporation_id
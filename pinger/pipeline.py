@@ -0,0 +1,266 @@
+"""
+Redis Streams pipeline.
+
+An optional alternative to chaining `apply_async` calls between stages. Each
+stage reads its own stream through a consumer group and acknowledges and
+deletes entries once they are done, so stages scale on their own, the length
+of each stream is the backlog of that stage and entries from a dead consumer
+get claimed by another.
+
+    fetch --(process stream)--> process --(send stream)--> send
+
+Consumers are run with `python manage.py pinger_stream_worker <stage>`.
+
+A handler can raise `Deferred` to leave its entry pending for a while. Entries
+are grouped by the consumer's `key`, eg the webhook, and once one is deferred
+the rest of its group is held behind it in order while other groups carry on.
+"""
+import logging
+import os
+import socket
+import time
+
+from redis.exceptions import ResponseError
+
+from .providers import cache_client
+
+logger = logging.getLogger(__name__)
+
+GROUP_NAME = "ct-pinger"
+
+STREAMS = {
+    "process": "ct-pinger-stream-process",
+    "send": "ct-pinger-stream-send",
+}
+
+# stop fetching more while a stage is this far behind
+MAX_BACKLOG = 1000
+
+# entries pending longer than this are claimed by whoever is free
+CLAIM_IDLE_MS = 60 * 1000
+
+# held entries are claimed back this often so nobody else takes them as stalled
+HOLD_REFRESH_MS = CLAIM_IDLE_MS // 4
+
+# give up on entries that keep killing consumers
+MAX_DELIVERIES = 5
+
+
+class Deferred(Exception):
+    """Raised by a handler to try its entry again in `countdown` seconds."""
+
+    def __init__(self, countdown):
+        super().__init__(countdown)
+        self.countdown = countdown
+
+
+# entries this process is holding back, `{stage: {entry_id: (group, fields)}}`
+_held = {}
+# `{(stage, group): unix time}` a deferred group can go again at
+_deferred_until = {}
+# `{stage: unix time}` the held entries were last claimed back
+_refreshed_at = {}
+
+
+def default_consumer_name():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def ensure_group(stage):
+    try:
+        cache_client.xgroup_create(STREAMS[stage], GROUP_NAME, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def publish(stage, **fields):
+    return cache_client.xadd(STREAMS[stage], fields)
+
+
+def _done(stage, entry_id):
+    pipe = cache_client.pipeline()
+    pipe.xack(STREAMS[stage], GROUP_NAME, entry_id)
+    pipe.xdel(STREAMS[stage], entry_id)
+    pipe.execute()
+
+
+def _decode(fields):
+    return {k.decode("utf-8"): v.decode("utf-8") for k, v in fields.items()}
+
+
+def _delivery_count(stage, entry_id):
+    pending = cache_client.xpending_range(
+        STREAMS[stage], GROUP_NAME, min=entry_id, max=entry_id, count=1
+    )
+    return pending[0]["times_delivered"] if pending else 0
+
+
+def _entry_order(entry_id):
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode("utf-8")
+    return tuple(int(part) for part in entry_id.split("-"))
+
+
+def _is_deferred(stage, group, now):
+    return _deferred_until.get((stage, group), 0) > now
+
+
+def _run(stage, entry_id, fields, handler, group):
+    try:
+        handler(fields)
+    except Deferred as e:
+        # not acked, it stays pending in the stream until we get back to it
+        _deferred_until[(stage, group)] = time.time() + e.countdown
+        _held.setdefault(stage, {})[entry_id] = (group, fields)
+        logger.info(
+            f"PINGER: STREAM {stage} deferred {group} for {e.countdown:.2f}s"
+        )
+        return
+    except Exception:
+        deliveries = _delivery_count(stage, entry_id)
+        logger.exception(
+            f"PINGER: STREAM {stage} failed {entry_id} ({deliveries} deliveries)"
+        )
+        if deliveries >= MAX_DELIVERIES:
+            logger.error(f"PINGER: STREAM {stage} dropping {entry_id} {fields}")
+            _done(stage, entry_id)
+        return
+    _done(stage, entry_id)
+
+
+def _handle(stage, entries, handler, key=None):
+    held = _held.setdefault(stage, {})
+    held_groups = {group for group, _ in held.values()}
+    now = time.time()
+    for entry_id, fields in entries:
+        if entry_id in held:
+            # reclaimed from ourselves, it waits its turn
+            continue
+        if not fields:
+            # deleted while pending
+            _done(stage, entry_id)
+            continue
+        fields = _decode(fields)
+        group = key(fields) if key is not None else None
+        if group in held_groups or _is_deferred(stage, group, now):
+            # keep the group in order behind the entry it is waiting on
+            held[entry_id] = (group, fields)
+            held_groups.add(group)
+            continue
+        _run(stage, entry_id, fields, handler, group)
+        if entry_id in held:
+            held_groups.add(group)
+
+
+def _refresh_held(stage, consumer):
+    """
+    Claim the held entries back to ourselves, resetting their idle time so
+    another consumer's `xautoclaim` doesn't take them and run them out of
+    order. Anything another consumer has taken already is dropped.
+    """
+    held = _held.get(stage)
+    now = time.time()
+    if not held or now - _refreshed_at.get(stage, 0) < HOLD_REFRESH_MS / 1000:
+        return
+    _refreshed_at[stage] = now
+
+    stream = STREAMS[stage]
+    entry_ids = list(held)
+    pipe = cache_client.pipeline()
+    for entry_id in entry_ids:
+        pipe.xpending_range(
+            stream, GROUP_NAME, min=entry_id, max=entry_id, count=1,
+            consumername=consumer,
+        )
+    owned = [entry_id for entry_id, pending in zip(entry_ids, pipe.execute()) if pending]
+    for entry_id in entry_ids:
+        if entry_id not in owned:
+            logger.warning(f"PINGER: STREAM {stage} lost held {entry_id}")
+            del held[entry_id]
+    if owned:
+        cache_client.xclaim(stream, GROUP_NAME, consumer, 0, owned, justid=True)
+
+
+def _handle_held(stage, handler):
+    """Run the held entries whose group is ready again, oldest first."""
+    now = time.time()
+    for deferred_key, until in list(_deferred_until.items()):
+        if until <= now:
+            del _deferred_until[deferred_key]
+
+    held = _held.get(stage)
+    if not held:
+        return 0
+    waiting = set()
+    handled = 0
+    for entry_id in sorted(held, key=_entry_order):
+        group, fields = held[entry_id]
+        if group in waiting or _is_deferred(stage, group, now):
+            waiting.add(group)
+            continue
+        del held[entry_id]
+        _run(stage, entry_id, fields, handler, group)
+        handled += 1
+        if entry_id in held:
+            waiting.add(group)
+    return handled
+
+
+def _next_ready_ms(stage, block):
+    """Don't block on the stream past the moment a held group can go again."""
+    if not _held.get(stage):
+        return block
+    ready = min(
+        _deferred_until.get((stage, group), 0) for group, _ in _held[stage].values()
+    )
+    return max(min(block, int((ready - time.time()) * 1000)), 1)
+
+
+def consume(stage, handler, consumer=None, count=10, block=5000, key=None):
+    """
+    Read one batch for `stage`, held entries that are ready and stalled entries
+    from other consumers first. `key(fields)` groups entries that have to be
+    handled in order.
+    """
+    stream = STREAMS[stage]
+    if consumer is None:
+        consumer = default_consumer_name()
+
+    _refresh_held(stage, consumer)
+    handled = _handle_held(stage, handler)
+
+    _, claimed, *_ = cache_client.xautoclaim(
+        stream, GROUP_NAME, consumer, CLAIM_IDLE_MS, start_id="0-0", count=count
+    )
+    if claimed:
+        _handle(stage, claimed, handler, key=key)
+
+    response = cache_client.xreadgroup(
+        GROUP_NAME, consumer, {stream: ">"}, count=count,
+        block=_next_ready_ms(stage, block),
+    )
+    handled += len(claimed)
+    for _, entries in response:
+        _handle(stage, entries, handler, key=key)
+        handled += len(entries)
+    return handled
+
+
+def get_backlog(stage):
+    return cache_client.xlen(STREAMS[stage])
+
+
+def get_stage_stats():
+    """Returns `{stage: (length, pending)}` for every stage."""
+    output = {}
+    for stage, stream in STREAMS.items():
+        if not cache_client.exists(stream):
+            output[stage] = (0, 0)
+            continue
+        try:
+            pending = cache_client.xpending(stream, GROUP_NAME)["pending"]
+        except ResponseError:
+            pending = 0
+        output[stage] = (cache_client.xlen(stream), pending)
+    return output
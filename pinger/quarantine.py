@@ -0,0 +1,114 @@
+"""
+Quarantine for notifications that can't be handled.
+
+A notification whose text fails to parse or whose parser raises is stored
+with its raw text and traceback instead of failing the whole batch, the rest
+of the batch carries on. Once the parser is fixed they can be replayed with
+`python manage.py pinger_quarantine replay`.
+"""
+import logging
+import traceback
+
+from django.db.models import Count, F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+STAGE_PARSE = "parse"
+STAGE_ROUTE = "route"
+STAGE_BUILD = "build"
+
+
+def add(notification, stage, error=None):
+    """Quarantine a `tasks.Notification`, call from the `except` block."""
+    from .models import QuarantinedNotification
+
+    if error is None:
+        error = traceback.format_exc()
+    text = notification.notification_text
+    if isinstance(text, bytes):
+        text = text.decode("utf-8", errors="replace")
+
+    logger.error(
+        f"PINGER: Quarantined {notification.notification_id} "
+        f"{notification.notification_type} failed to {stage}\n{error}"
+    )
+    try:
+        ob, created = QuarantinedNotification.objects.get_or_create(
+            notification_id=notification.notification_id,
+            defaults={
+                "character_id": notification.character.character.character_id,
+                "notification_type": notification.notification_type,
+                "timestamp": notification.timestamp,
+                "text": text,
+                "stage": stage,
+                "error": error,
+            },
+        )
+        if not created:
+            QuarantinedNotification.objects.filter(pk=ob.pk).update(
+                stage=stage,
+                error=error,
+                attempts=F("attempts") + 1,
+                last_failed=timezone.now(),
+            )
+    except Exception:
+        # never let the quarantine take the batch down with it
+        logger.exception(
+            f"PINGER: Failed to quarantine {notification.notification_id}"
+        )
+
+
+def get_counts():
+    """`[(notification_type, count)]` of everything in quarantine."""
+    from .models import QuarantinedNotification
+
+    return list(
+        QuarantinedNotification.objects.values_list("notification_type")
+        .annotate(count=Count("id"))
+        .order_by("-count")
+    )
+
+
+def replay(queryset):
+    """
+    Process quarantined notifications again, ignoring their age and whether
+    they were seen before. Anything that still fails stays quarantined.
+    Returns `(replayed, failed)`.
+    """
+    from .tasks import _process_notifications
+
+    started = timezone.now()
+    by_character = {}
+    for q in queryset:
+        by_character.setdefault(q.character_id, []).append(q)
+
+    replayed = 0
+    failed = 0
+    for character_id, items in by_character.items():
+        notifs = [
+            {
+                "notification_id": q.notification_id,
+                "type": q.notification_type,
+                "text": q.text,
+                "timestamp": q.timestamp,
+            }
+            for q in items
+        ]
+        try:
+            _process_notifications(character_id, notifs, replay=True)
+        except Exception:
+            logger.exception(f"PINGER: Failed to replay notifications for {character_id}")
+            failed += len(items)
+            continue
+
+        # anything quarantined again has a newer last_failed
+        done = queryset.model.objects.filter(
+            pk__in=[q.pk for q in items], last_failed__lt=started
+        )
+        cleared = done.count()
+        done.delete()
+        replayed += cleared
+        failed += len(items) - cleared
+
+    return replayed, failed
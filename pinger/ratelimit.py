@@ -0,0 +1,168 @@
+"""
+Discord webhook rate limits.
+
+Every webhook response carries `X-RateLimit-Remaining`,
+`X-RateLimit-Reset-After` and `X-RateLimit-Bucket`. They are kept in redis per
+discord bucket so every worker knows when a webhook is out of requests and
+waits for the reset instead of being answered with a 429. On top of that a
+global token bucket keeps all webhooks together under discord's global limit.
+"""
+import time
+
+from .app_settings import CT_PINGER_GLOBAL_RATE_LIMIT
+from .providers import cache_client
+
+BUCKET_MAP_KEY = "ct-pinger-webhook-buckets"
+GLOBAL_KEY = "ct-pinger-webhook-global"
+STATS_KEY = "ct-pinger-webhook-stats"
+
+
+def _build_bucket_key(bucket):
+    return f"ct-pinger-webhook-bucket-{bucket}"
+
+
+# KEYS: webhook bucket, global bucket
+# ARGV: now, global rate per second
+# returns 0 and takes a request from both buckets, or the seconds to wait
+_ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local wait = 0
+
+local remaining = tonumber(redis.call('HGET', KEYS[1], 'remaining'))
+local reset_at = tonumber(redis.call('HGET', KEYS[1], 'reset_at'))
+local limited = remaining ~= nil and reset_at ~= nil and reset_at > now
+if limited and remaining <= 0 then
+    wait = reset_at - now
+end
+
+local g = redis.call('HMGET', KEYS[2], 'tokens', 'at', 'blocked_until')
+local tokens = tonumber(g[1]) or rate
+local at = tonumber(g[2]) or now
+local blocked_until = tonumber(g[3]) or 0
+tokens = math.min(rate, tokens + (now - at) * rate)
+if blocked_until > now then
+    wait = math.max(wait, blocked_until - now)
+elseif tokens < 1 then
+    wait = math.max(wait, (1 - tokens) / rate)
+end
+
+if wait <= 0 then
+    tokens = tokens - 1
+    if limited then
+        redis.call('HINCRBY', KEYS[1], 'remaining', -1)
+    end
+end
+redis.call('HSET', KEYS[2], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('EXPIRE', KEYS[2], 60)
+return tostring(wait)
+"""
+
+# KEYS: webhook bucket
+# ARGV: remaining, reset_at, now
+_UPDATE_SCRIPT = """
+local remaining = tonumber(ARGV[1])
+local reset_at = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cur_reset = tonumber(redis.call('HGET', KEYS[1], 'reset_at'))
+local cur_remaining = tonumber(redis.call('HGET', KEYS[1], 'remaining'))
+-- responses arrive out of order, keep the lowest count of the current window
+if cur_reset == nil or cur_reset <= now or reset_at > cur_reset + 1
+        or cur_remaining == nil or remaining < cur_remaining then
+    redis.call('HSET', KEYS[1], 'remaining', remaining, 'reset_at', tostring(reset_at))
+end
+redis.call('EXPIREAT', KEYS[1], math.ceil(reset_at) + 1)
+return 1
+"""
+
+_acquire = None
+_update = None
+
+
+def _get_bucket_key(hook_id):
+    bucket = cache_client.hget(BUCKET_MAP_KEY, hook_id)
+    if bucket is None:
+        # not seen a response yet
+        return _build_bucket_key(f"hook-{hook_id}")
+    return _build_bucket_key(bucket.decode("utf-8"))
+
+
+def acquire(hook_id, now=None):
+    """Take a request for `hook_id`, returns 0 or the seconds to wait first."""
+    global _acquire
+    if _acquire is None:
+        _acquire = cache_client.register_script(_ACQUIRE_SCRIPT)
+    if now is None:
+        now = time.time()
+    wait = _acquire(
+        keys=[_get_bucket_key(hook_id), GLOBAL_KEY],
+        args=[now, CT_PINGER_GLOBAL_RATE_LIMIT],
+    )
+    return max(float(wait), 0)
+
+
+def wait(hook_id, max_wait):
+    """
+    Block until a request for `hook_id` is available, returns 0 once it is or
+    the wait left when that would be longer than `max_wait` seconds.
+    """
+    waited = 0
+    while True:
+        delay = acquire(hook_id)
+        if delay <= 0:
+            return 0
+        if waited + delay > max_wait:
+            return delay
+        time.sleep(delay)
+        waited += delay
+
+
+def read_headers(headers):
+    try:
+        return (
+            int(headers.get("X-RateLimit-Remaining")),
+            float(headers.get("X-RateLimit-Reset-After")),
+            headers.get("X-RateLimit-Bucket"),
+        )
+    except (AttributeError, TypeError, ValueError):
+        return None, None, None
+
+
+def update_from_headers(hook_id, headers, now=None):
+    """Feed the webhook's bucket from any discord response headers."""
+    global _update
+    remaining, reset_after, bucket = read_headers(headers)
+    if remaining is None:
+        return
+
+    if _update is None:
+        _update = cache_client.register_script(_UPDATE_SCRIPT)
+    if now is None:
+        now = time.time()
+
+    if bucket:
+        cache_client.hset(BUCKET_MAP_KEY, hook_id, bucket)
+        key = _build_bucket_key(bucket)
+    else:
+        key = _build_bucket_key(f"hook-{hook_id}")
+    _update(keys=[key], args=[remaining, now + reset_after, now])
+
+
+def block_global(retry_after, now=None):
+    """Discord told us we hit the global limit, hold every webhook."""
+    if now is None:
+        now = time.time()
+    cache_client.hset(GLOBAL_KEY, "blocked_until", now + retry_after)
+    cache_client.expire(GLOBAL_KEY, int(retry_after) + 60)
+
+
+def record(status_code):
+    cache_client.hincrby(STATS_KEY, "sent")
+    if status_code == 429:
+        cache_client.hincrby(STATS_KEY, "429")
+
+
+def get_stats():
+    return {
+        k.decode("utf-8"): int(v) for k, v in cache_client.hgetall(STATS_KEY).items()
+    }
@@ -0,0 +1,216 @@
+"""
+Compiled webhook routing table.
+
+Which webhooks want which ping types, and their corporation, alliance and
+region filters, are compiled into frozensets once and shared through redis.
+Every change to a webhook, a ping type or one of the filters bumps the version
+so every process recompiles on its next lookup, routing a ping never touches
+the database.
+
+Per ping type the routes are indexed by corporation, alliance and region with
+an extra bucket for webhooks that don't filter on it. The webhooks for a ping
+are the intersection of the three buckets it falls in, no matter how many
+webhooks there are. The fuel, ozone and gas pings are routed the same way
+under their own pseudo types.
+"""
+import json
+import logging
+import threading
+import time
+
+from .providers import cache_client
+
+logger = logging.getLogger(__name__)
+
+TABLE_KEY = "ct-pinger-routing-table"
+VERSION_KEY = "ct-pinger-routing-version"
+
+# how often each process checks redis for a newer table
+VERSION_CHECK_SECONDS = 5
+
+# pseudo ping types for the webhook flags
+FUEL_PINGS = "fuel_pings"
+LO_PINGS = "lo_pings"
+GAS_PINGS = "gas_pings"
+FLAG_TYPES = (FUEL_PINGS, LO_PINGS, GAS_PINGS)
+
+
+class Route:
+    """A webhook subscribed to a ping type, empty filters match anything."""
+
+    __slots__ = ("hook_id", "corporations", "alliances", "regions")
+
+    def __init__(self, hook_id, corporations, alliances, regions):
+        self.hook_id = hook_id
+        self.corporations = frozenset(corporations)
+        self.alliances = frozenset(alliances)
+        self.regions = frozenset(regions)
+
+    def matches(self, corporation_id, alliance_id, region_id):
+        if corporation_id is not None and self.corporations and corporation_id not in self.corporations:
+            return False
+        if alliance_id is not None and self.alliances and alliance_id not in self.alliances:
+            return False
+        if region_id is not None and self.regions and region_id not in self.regions:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"Route({self.hook_id})"
+
+
+class RouteIndex:
+    """The routes of one ping type bucketed by what they filter on."""
+
+    __slots__ = (
+        "routes",
+        "hook_ids",
+        "any_corporation",
+        "by_corporation",
+        "any_alliance",
+        "by_alliance",
+        "any_region",
+        "by_region",
+    )
+
+    def __init__(self, routes):
+        self.routes = tuple(routes)
+        self.hook_ids = frozenset(r.hook_id for r in self.routes)
+        self.any_corporation, self.by_corporation = self._bucket("corporations")
+        self.any_alliance, self.by_alliance = self._bucket("alliances")
+        self.any_region, self.by_region = self._bucket("regions")
+
+    def _bucket(self, attr):
+        unfiltered = set()
+        by_id = {}
+        for route in self.routes:
+            ids = getattr(route, attr)
+            if not ids:
+                unfiltered.add(route.hook_id)
+            for _id in ids:
+                by_id.setdefault(_id, set()).add(route.hook_id)
+        unfiltered = frozenset(unfiltered)
+        return unfiltered, {
+            _id: frozenset(hooks | unfiltered) for _id, hooks in by_id.items()
+        }
+
+    def targets(self, corporation_id, alliance_id, region_id):
+        """frozenset of the hook ids that want a ping, `None` matches anything."""
+        targets = self.hook_ids
+        if corporation_id is not None:
+            targets = targets & self.by_corporation.get(
+                corporation_id, self.any_corporation
+            )
+        if alliance_id is not None and targets:
+            targets = targets & self.by_alliance.get(alliance_id, self.any_alliance)
+        if region_id is not None and targets:
+            targets = targets & self.by_region.get(region_id, self.any_region)
+        return targets
+
+
+_EMPTY = RouteIndex(())
+
+_lock = threading.Lock()
+_table = None
+_version = None
+_checked_at = 0
+
+
+def compile_table():
+    """`{class_tag: [route list]}` straight from the database."""
+    from .models import DiscordWebhook
+
+    def _ids(field, column):
+        through = getattr(DiscordWebhook, field).through
+        out = {}
+        for hook_id, value in through.objects.values_list("discordwebhook_id", column):
+            out.setdefault(hook_id, []).append(value)
+        return out
+
+    corporations = _ids("corporation_filter", "evecorporationinfo__corporation_id")
+    alliances = _ids("alliance_filter", "eveallianceinfo__alliance_id")
+    regions = _ids("region_filter", "mapregion__region_id")
+
+    subscriptions = list(
+        DiscordWebhook.ping_types.through.objects.values_list(
+            "discordwebhook_id", "pingtype__class_tag"
+        )
+    )
+    for hook_id, *flags in DiscordWebhook.objects.values_list("id", *FLAG_TYPES):
+        subscriptions += [
+            (hook_id, flag) for flag, enabled in zip(FLAG_TYPES, flags) if enabled
+        ]
+
+    table = {}
+    for hook_id, class_tag in subscriptions:
+        table.setdefault(class_tag, []).append([
+            hook_id,
+            corporations.get(hook_id, []),
+            alliances.get(hook_id, []),
+            regions.get(hook_id, []),
+        ])
+    for routes in table.values():
+        routes.sort()
+    return table
+
+
+def _load(data):
+    return {
+        class_tag: RouteIndex(Route(*route) for route in routes)
+        for class_tag, routes in data.items()
+    }
+
+
+def _get_version():
+    version = cache_client.get(VERSION_KEY)
+    return int(version) if version is not None else 0
+
+
+def _fetch(version):
+    raw = cache_client.get(TABLE_KEY)
+    if raw is not None:
+        cached = json.loads(raw)
+        if cached["version"] == version:
+            return cached["routes"]
+
+    routes = compile_table()
+    cache_client.set(TABLE_KEY, json.dumps({"version": version, "routes": routes}))
+    logger.info(f"PINGER: Compiled routing table v{version}")
+    return routes
+
+
+def get_table():
+    """`{class_tag: RouteIndex}` for every ping type with a webhook."""
+    global _table, _version, _checked_at
+    now = time.monotonic()
+    if _table is not None and now - _checked_at < VERSION_CHECK_SECONDS:
+        return _table
+
+    with _lock:
+        if _table is not None and now - _checked_at < VERSION_CHECK_SECONDS:
+            return _table
+        version = _get_version()
+        if _table is None or version != _version:
+            _table = _load(_fetch(version))
+            _version = version
+        _checked_at = now
+        return _table
+
+
+def get_index(class_tag):
+    return get_table().get(class_tag, _EMPTY)
+
+
+def get_targets(class_tag, corporation_id, alliance_id, region_id):
+    """Sorted hook ids that want a ping of `class_tag` with these filters."""
+    return sorted(
+        get_index(class_tag).targets(corporation_id, alliance_id, region_id)
+    )
+
+
+def invalidate():
+    """Drop the compiled table everywhere, call after any webhook change."""
+    global _table
+    cache_client.incr(VERSION_KEY)
+    with _lock:
+        _table = None
@@ -0,0 +1,198 @@
+"""
+Redis backed schedule of when each (corporation, character) pair is next due.
+
+Members of the sorted set are `"{corporation_id}:{character_id}"` scored with
+the unix time the character's notification cache expires. Claiming a member
+pushes its score out by a lease instead of removing it, so a lost task only
+delays that character until the lease runs out.
+
+Each corporation's character ids are also kept in a set of their own, so
+looking at one corporation never walks the whole schedule.
+"""
+import time
+
+from .providers import cache_client
+
+SCHEDULE_KEY = "ct-pinger-schedule"
+CORP_SIZE_KEY = "ct-pinger-schedule-corps"
+# set once the per corporation sets have been built from the schedule
+INDEXED_KEY = "ct-pinger-schedule-indexed"
+
+# how long a claimed character is reserved for before it is considered lost.
+CLAIM_LEASE_SECONDS = 5 * 60
+
+_CLAIM_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[3])
+for _, member in ipairs(due) do
+    redis.call('ZADD', KEYS[1], ARGV[2], member)
+end
+return due
+"""
+
+_claim = None
+
+
+def _member(corporation_id, character_id):
+    return f"{corporation_id}:{character_id}"
+
+
+def _split(member):
+    if isinstance(member, bytes):
+        member = member.decode("utf-8")
+    corporation_id, character_id = member.split(":")
+    return int(corporation_id), int(character_id)
+
+
+def _build_corp_poll_key(corporation_id):
+    return f"ct-pinger-corp-poll-{corporation_id}"
+
+
+def _build_corp_key(corporation_id):
+    return f"ct-pinger-schedule-corp-{corporation_id}"
+
+
+def _build_index():
+    """Fill the per corporation sets from a schedule that was built without them."""
+    pipe = cache_client.pipeline()
+    for member, _ in cache_client.zscan_iter(SCHEDULE_KEY):
+        corporation_id, character_id = _split(member)
+        pipe.sadd(_build_corp_key(corporation_id), character_id)
+    pipe.set(INDEXED_KEY, 1)
+    pipe.execute()
+
+
+def _get_corporation_characters(corporation_id):
+    return [int(c) for c in cache_client.smembers(_build_corp_key(corporation_id))]
+
+
+def get_corporation_schedule(corporation_id):
+    """Returns `{character_id: due}` for one corporation."""
+    character_ids = _get_corporation_characters(corporation_id)
+    pipe = cache_client.pipeline()
+    for character_id in character_ids:
+        pipe.zscore(SCHEDULE_KEY, _member(corporation_id, character_id))
+    return {
+        character_id: score
+        for character_id, score in zip(character_ids, pipe.execute())
+        if score is not None
+    }
+
+
+def get_schedule_size():
+    return cache_client.zcard(SCHEDULE_KEY)
+
+
+def get_corporation_size(corporation_id):
+    size = cache_client.hget(CORP_SIZE_KEY, corporation_id)
+    return int(size) if size else 0
+
+
+def sync_corporation(corporation_id, character_ids, due=None):
+    """
+    Make the schedule match the characters a corporation has available.
+    New characters are due straight away, known ones keep their slot.
+    """
+    if due is None:
+        due = time.time()
+
+    if not cache_client.exists(INDEXED_KEY):
+        _build_index()
+
+    existing = _get_corporation_characters(corporation_id)
+    corp_key = _build_corp_key(corporation_id)
+    pipe = cache_client.pipeline()
+    if character_ids:
+        # nx keeps the slot of anyone already scheduled
+        pipe.zadd(
+            SCHEDULE_KEY,
+            {_member(corporation_id, character_id): due for character_id in character_ids},
+            nx=True,
+        )
+        pipe.sadd(corp_key, *character_ids)
+    for character_id in existing:
+        if character_id not in character_ids:
+            pipe.zrem(SCHEDULE_KEY, _member(corporation_id, character_id))
+            pipe.srem(corp_key, character_id)
+    pipe.hset(CORP_SIZE_KEY, corporation_id, len(character_ids))
+    pipe.execute()
+
+
+def prune_corporations(active_corporation_ids):
+    """Drop every corporation that is no longer being monitored."""
+    active = set(active_corporation_ids)
+    removed = 0
+    for corporation_id in cache_client.hkeys(CORP_SIZE_KEY):
+        corporation_id = int(corporation_id)
+        if corporation_id in active:
+            continue
+        stale = [
+            _member(corporation_id, character_id)
+            for character_id in _get_corporation_characters(corporation_id)
+        ]
+        pipe = cache_client.pipeline()
+        if stale:
+            pipe.zrem(SCHEDULE_KEY, *stale)
+        pipe.delete(_build_corp_key(corporation_id))
+        pipe.hdel(CORP_SIZE_KEY, corporation_id)
+        pipe.execute()
+        removed += len(stale)
+    return removed
+
+
+def schedule(corporation_id, character_id, due):
+    """Set when a character is next due, only if it is still scheduled."""
+    cache_client.zadd(
+        SCHEDULE_KEY, {_member(corporation_id, character_id): due}, xx=True
+    )
+
+
+def find_slot(earliest, dues, spacing):
+    """
+    First time from `earliest` that is at least `spacing` seconds away from all
+    of `dues`, the due times of the rest of the corporation.
+    """
+    due = earliest
+    for other in sorted(dues):
+        if other - spacing < due < other + spacing:
+            due = other + spacing
+    return due
+
+
+def schedule_spread(corporation_id, character_id, earliest, spacing):
+    """
+    Schedule a character into the first free slot after `earliest` so its corp
+    is polled every `spacing` seconds instead of in clumps. Returns the due time.
+    """
+    dues = get_corporation_schedule(corporation_id)
+    dues.pop(character_id, None)
+    due = find_slot(earliest, dues.values(), spacing)
+    schedule(corporation_id, character_id, due)
+    return due
+
+
+def claim_due(limit=500, now=None, lease=CLAIM_LEASE_SECONDS):
+    """Atomically reserve up to `limit` due pairs, returns `[(corp, char), ...]`."""
+    global _claim
+    if limit <= 0:
+        # LIMIT 0 -1 in the script would hand out everything
+        return []
+    if _claim is None:
+        _claim = cache_client.register_script(_CLAIM_SCRIPT)
+
+    if now is None:
+        now = time.time()
+
+    due = _claim(keys=[SCHEDULE_KEY], args=[now, now + lease, limit])
+    return [_split(m) for m in due]
+
+
+def acquire_corporation(corporation_id, spacing):
+    """
+    Only allow one pull per corporation every `spacing` seconds.
+    Returns 0 when acquired otherwise the seconds until it can be.
+    """
+    spacing = max(int(spacing), 1)
+    if cache_client.set(_build_corp_poll_key(corporation_id), 1, nx=True, ex=spacing):
+        return 0
+    ttl = cache_client.ttl(_build_corp_poll_key(corporation_id))
+    return ttl if ttl and ttl > 0 else spacing
@@ -0,0 +1,70 @@
+"""
+Spread corporations over several worker nodes.
+
+Worker nodes register themselves in redis from celery's worker signals. Any
+node can dispatch updates, every corporation is sent to the node picked for it
+by a consistent hash ring so a node dropping out only moves its own
+corporations.
+"""
+import bisect
+import hashlib
+import time
+
+from .providers import cache_client
+
+NODES_KEY = "ct-pinger-nodes"
+
+# a node that has not been seen for this long is dropped from the ring
+NODE_TIMEOUT_SECONDS = 60
+
+# points on the ring per node, smooths out the spread of corporations
+RING_REPLICAS = 64
+
+
+def _hash(value):
+    return int(hashlib.md5(str(value).encode("utf-8")).hexdigest()[:16], 16)
+
+
+class HashRing:
+    def __init__(self, nodes, replicas=RING_REPLICAS):
+        self.nodes = sorted(nodes)
+        self._ring = sorted(
+            (_hash(f"{node}-{i}"), node) for node in self.nodes for i in range(replicas)
+        )
+        self._keys = [k for k, _ in self._ring]
+
+    def get_node(self, key):
+        if not self._ring:
+            return None
+        idx = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._ring[idx][1]
+
+
+def register_node(node_name, now=None):
+    if now is None:
+        now = time.time()
+    cache_client.zadd(NODES_KEY, {node_name: now})
+
+
+def unregister_node(node_name):
+    cache_client.zrem(NODES_KEY, node_name)
+
+
+def get_live_nodes(now=None):
+    if now is None:
+        now = time.time()
+    cache_client.zremrangebyscore(NODES_KEY, "-inf", now - NODE_TIMEOUT_SECONDS)
+    return [n.decode("utf-8") for n in cache_client.zrange(NODES_KEY, 0, -1)]
+
+
+def get_ring():
+    return HashRing(get_live_nodes())
+
+
+def assign(ring, pairs):
+    """Group `(corporation_id, character_id)` pairs by the node that owns the corp."""
+    output = {}
+    for corporation_id, character_id in pairs:
+        node = ring.get_node(corporation_id)
+        output.setdefault(node, []).append((corporation_id, character_id))
+    return output
@@ -0,0 +1,110 @@
+import logging
+
+from celery.signals import (
+    heartbeat_sent, worker_process_init, worker_ready, worker_shutdown,
+)
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .app_settings import CT_PINGER_SHARD_QUEUE, CT_PINGER_SHARDING
+from .models import DiscordWebhook, MutedStructure, PingType
+
+logger = logging.getLogger(__name__)
+
+# the celery node name of this worker, once registered for sharding
+_node_name = None
+
+
+@worker_process_init.connect
+@worker_ready.connect
+def warm_universe(sender=None, **kwargs):
+    from . import universe
+
+    try:
+        universe.warm()
+    except Exception:
+        # not the end of the world, it loads on first use
+        logger.exception("PINGER: Failed to warm the universe cache")
+
+
+@worker_ready.connect
+def register_pinger_node(sender=None, **kwargs):
+    global _node_name
+    if not CT_PINGER_SHARDING:
+        return
+
+    queues = [q.name for q in sender.task_consumer.queues]
+    if CT_PINGER_SHARD_QUEUE and CT_PINGER_SHARD_QUEUE not in queues:
+        # not a pinger worker
+        return
+
+    from . import sharding
+
+    _node_name = sender.hostname
+    sharding.register_node(_node_name)
+    logger.info(f"PINGER: Registered {_node_name} for sharding")
+
+
+@heartbeat_sent.connect
+def refresh_pinger_node(sender=None, **kwargs):
+    if _node_name is None:
+        return
+
+    from . import sharding
+
+    sharding.register_node(_node_name)
+
+
+@worker_shutdown.connect
+def close_webhook_client(sender=None, **kwargs):
+    from . import delivery
+
+    delivery.close()
+
+
+@worker_shutdown.connect
+def unregister_pinger_node(sender=None, **kwargs):
+    if _node_name is None:
+        return
+
+    from . import sharding
+
+    sharding.unregister_node(_node_name)
+    logger.info(f"PINGER: Unregistered {_node_name} from sharding")
+
+
+@receiver(post_save, sender=MutedStructure)
+def mute_structure(sender, instance, **kwargs):
+    from . import mutes
+
+    # an older row saved again mustn't cut short a newer one
+    mutes.refresh(instance.structure_id)
+
+
+@receiver(post_delete, sender=MutedStructure)
+def unmute_structure(sender, instance, **kwargs):
+    from . import mutes
+
+    # only unmuted if no other live row still mutes it
+    mutes.refresh(instance.structure_id)
+
+
+def _invalidate_routing():
+    from . import routing
+
+    routing.invalidate()
+
+
+@receiver(post_save, sender=DiscordWebhook)
+@receiver(post_delete, sender=DiscordWebhook)
+@receiver(post_save, sender=PingType)
+@receiver(post_delete, sender=PingType)
+@receiver(m2m_changed, sender=DiscordWebhook.ping_types.through)
+@receiver(m2m_changed, sender=DiscordWebhook.corporation_filter.through)
+@receiver(m2m_changed, sender=DiscordWebhook.alliance_filter.through)
+@receiver(m2m_changed, sender=DiscordWebhook.region_filter.through)
+def webhooks_changed(sender, **kwargs):
+    # after the commit so nobody recompiles the table from the old rows
+    transaction.on_commit(_invalidate_routing)
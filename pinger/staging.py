@@ -0,0 +1,82 @@
+"""
+Short lived store for fetched notifications.
+
+The fetch stage writes each notification to redis once and only hands the
+ids to `process_notifications`, so the notification text never goes through
+the broker.
+"""
+import datetime
+import json
+import logging
+import random
+
+from .providers import cache_client
+
+logger = logging.getLogger(__name__)
+
+STAGE_TTL_SECONDS = 60 * 60
+PAYLOAD_STATS_KEY = "ct-pinger-payload-stats"
+
+# measuring a batch means serialising all of it, only do 1 in this many
+PAYLOAD_SAMPLE_RATE = 100
+
+
+def _build_note_key(notification_id):
+    return f"ct-pinger-note-{notification_id}"
+
+
+def _serialize(note):
+    data = dict(note)
+    timestamp = data.pop("timestamp", None)
+    if isinstance(timestamp, datetime.datetime):
+        data["time"] = timestamp.timestamp()
+    return json.dumps(data)
+
+
+def stage(notifs):
+    """Store the notifications and return their ids in the same order."""
+    ids = []
+    pipe = cache_client.pipeline()
+    for note in notifs:
+        nid = note.get("notification_id")
+        pipe.set(_build_note_key(nid), _serialize(note), ex=STAGE_TTL_SECONDS)
+        ids.append(nid)
+    pipe.execute()
+    return ids
+
+
+def load(notification_ids):
+    """
+    Fetch staged notifications, returns `(notifications, missing_ids)` as
+    anything that has expired is skipped.
+    """
+    if not notification_ids:
+        return [], []
+
+    output = []
+    missing = []
+    raw = cache_client.mget([_build_note_key(nid) for nid in notification_ids])
+    for nid, data in zip(notification_ids, raw):
+        if data is None:
+            logger.warning(f"PINGER: Staged Notification {nid} has expired")
+            missing.append(nid)
+            continue
+        output.append(json.loads(data))
+    return output, missing
+
+
+def sample_payload():
+    return random.randrange(PAYLOAD_SAMPLE_RATE) == 0
+
+
+def record_payload_sizes(inline_bytes, staged_bytes):
+    pipe = cache_client.pipeline()
+    pipe.hincrby(PAYLOAD_STATS_KEY, "batches", 1)
+    pipe.hincrby(PAYLOAD_STATS_KEY, "inline_bytes", inline_bytes)
+    pipe.hincrby(PAYLOAD_STATS_KEY, "staged_bytes", staged_bytes)
+    pipe.execute()
+
+
+def get_payload_stats():
+    stats = cache_client.hgetall(PAYLOAD_STATS_KEY)
+    return {k.decode("utf-8"): int(v) for k, v in stats.items()}
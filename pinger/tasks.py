@@ -6,9 +6,9 @@ import time
 from functools import wraps
 from http.cookiejar import http2time
 
-import requests
-from bravado.exception import HTTPError
+from bravado.exception import HTTPError, HTTPNotModified
 from celery import shared_task
+from celery.utils import worker_direct
 from allianceauth.eveonline.evelinks import eveimageserver
 from corptools.models import (
     CharacterAudit,
@@ -21,17 +21,45 @@ from oauthlib.oauth2.rfc6749.errors import InvalidGrantError
 
 from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
 from django.db.models import Max, Q, Sum
 from django.utils import timezone
 
 from allianceauth.services.tasks import QueueOnce
 from esi.models import Token
 
-from pinger.app_settings import CT_PINGER_VALID_STATES
-from pinger.models import DiscordWebhook, FuelPingRecord, Ping, PingerConfig
-
-from . import notifications
-from .notifications.base import get_available_types
+from pinger.app_settings import (
+    CT_PINGER_ASYNC_FETCH,
+    CT_PINGER_ASYNC_FETCH_CONCURRENCY,
+    CT_PINGER_CONDITIONAL_REQUESTS,
+    CT_PINGER_PARALLEL_PARSE_THRESHOLD,
+    CT_PINGER_PARALLEL_PARSE_WORKERS,
+    CT_PINGER_PIPELINE_MODE,
+    CT_PINGER_SHARDING,
+    CT_PINGER_VALID_STATES,
+)
+from pinger.models import FuelPingRecord, Ping, PingerConfig
+
+from . import (
+    dedupe,
+    delivery,
+    fetcher,
+    governor,
+    health,
+    mutes,
+    names,
+    notifications,
+    pipeline,
+    quarantine,
+    ratelimit,
+    routing,
+    scheduler,
+    sharding,
+    staging,
+)
+from .exceptions import WebhookCooloff
+from .notifications import get_available_types
+from .notifications import parser as notification_parser
 from .providers import cache_client, esi
 
 TZ_STRING = "%Y-%m-%dT%H:%M:%SZ"
@@ -42,6 +70,9 @@ TASK_PRIO = 3
 
 LOOK_BACK_HOURS = 6
 
+# longest a delivery sleeps for a webhook bucket before handing back to celery
+RATE_LIMIT_MAX_WAIT = 2
+
 
 logger = logging.getLogger(__name__)
 
@@ -73,6 +104,10 @@ def clear_error_flag():
     cache.delete("esi_error_timeout")
 
 
+# anything shorter than this we just wait out inside the task
+MAX_INLINE_ESI_DELAY = 5
+
+
 def esi_error_retry(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -83,15 +118,28 @@ def esi_error_retry(func):
             args[0].retry(countdown=61)
         else:
             clear_error_flag()
+
+        delay = governor.get_delay()
+        if delay > MAX_INLINE_ESI_DELAY:
+            logger.warning(f"ESI error budget is low! will retry in {delay:.0f}s")
+            args[0].retry(countdown=delay + 1)
+        elif delay > 0:
+            time.sleep(delay)
+
         try:
             _ret = func(*args, **kwargs)
         except Exception as e:
             if isinstance(e, (HTTPError)):
                 code = e.status_code
+                headers = getattr(e.response, "headers", {})
+                governor.update_from_headers(headers)
                 if code == 420:
                     logger.warning(f"Hit ESI error limit! Pausing Tasks! {e}")
-                    set_error_flag(60)
-                    args[0].retry(countdown=61)
+                    _, reset = governor.read_headers(headers)
+                    reset = reset if reset is not None else 60
+                    governor.exhaust(reset)
+                    set_error_flag(reset)
+                    args[0].retry(countdown=reset + 1)
             elif isinstance(e, (OSError)):
                 logger.warning(f"Hit ESI error limit! Pausing Tasks! {e}")
             raise e
@@ -119,7 +167,21 @@ def _get_last_cache_etag(char_id):
 
 
 def _set_last_cache_etag(char_id, etag):
-    return cache.set(_build_char_cache_etag_id(char_id), etag)
+    # keep it around for a few full rotations, the default cache timeout is
+    # shorter than the time between two updates with the same character.
+    return cache.set(_build_char_cache_etag_id(char_id), etag, CACHE_TIME_SECONDS * 6)
+
+
+ETAG_STATS_KEY = "ct-pinger-etag-stats"
+
+
+def _record_etag_result(hit):
+    cache_client.hincrby(ETAG_STATS_KEY, "hit" if hit else "miss", 1)
+
+
+def get_etag_stats():
+    stats = cache_client.hgetall(ETAG_STATS_KEY)
+    return {k.decode("utf-8"): int(v) for k, v in stats.items()}
 
 
 def _build_char_cache_id(char_id):
@@ -163,11 +225,7 @@ def _set_cache_data_for_corp(corp_id, last_char, char_array, next_update):
     cache.set(_build_corp_cache_id(corp_id), json.dumps(data), CACHE_TIME_SECONDS + 60)
 
 
-@shared_task
-def bootstrap_notification_tasks():
-    # build model for all known corps and fire off updates to get the ball rolling.
-    # run at 10m intervals to keep sync, otherwise run at 10m/people in corp with roles intervals
-
+def _get_active_corporations():
     # get list of all active corp tasks from cache
     allis, corps, _ = get_settings()
     # get all new corps not in cache
@@ -191,7 +249,7 @@ def bootstrap_notification_tasks():
             query |= q
         all_member_corps_in_audit = all_member_corps_in_audit.filter(query)
 
-    corps = list(
+    return list(
         set(
             all_member_corps_in_audit.values_list(
                 "character__corporation_id", flat=True
@@ -199,15 +257,196 @@ def bootstrap_notification_tasks():
         )
     )
 
+
+def _get_corp_characters(corporation_id):
+    all_chars_in_corp = set(
+        CharacterAudit.objects.filter(
+            characterroles__station_manager=True,
+            character__corporation_id=corporation_id,
+            active=True,
+        ).values_list("character__character_id", flat=True)
+    )
+
+    all_hr_chars = list(
+        set(
+            CharacterAudit.objects.filter(
+                characterroles__personnel_manager=True,
+                character__corporation_id=corporation_id,
+                active=True,
+            ).values_list("character__character_id", flat=True)
+        )
+    )
+
+    # todo make this nicer...
+    if len(all_hr_chars) > 0:
+        hr_presented = False
+        for i in all_hr_chars:
+            if i in all_chars_in_corp:
+                hr_presented = True
+                logger.info(f"PINGER: HR {corporation_id} We have HR covered")
+                break
+
+        if not hr_presented:
+            logger.info(f"PINGER: HR {corporation_id} Adding a HR character")
+
+            all_chars_in_corp.add(all_hr_chars[0])
+
+    all_chars_in_corp = list(all_chars_in_corp)
+    all_chars_in_corp.sort()
+    return all_chars_in_corp
+
+
+def _get_next_character(last_character, all_chars_in_corp):
+    if last_character in all_chars_in_corp:
+        idx = all_chars_in_corp.index(last_character) + 1
+    else:
+        idx = 0
+
+    if idx == len(all_chars_in_corp):
+        idx = 0
+
+    # skip anyone backed off, if everyone is we just carry on as normal
+    for i in range(len(all_chars_in_corp)):
+        character_id = all_chars_in_corp[(idx + i) % len(all_chars_in_corp)]
+        if health.is_healthy(character_id):
+            return character_id
+
+    return all_chars_in_corp[idx]
+
+
+# notifications that mean a corp is being shot at right now
+ACTIVITY_HOT_TYPES = {"StructureUnderAttack", "TowerAlertMsg", "SkyhookUnderAttack"}
+# poll a corp as fast as we can for this long after an attack
+ACTIVITY_HOT_SECONDS = 30 * 60
+# corps with no notifications for this long are polled less often
+ACTIVITY_QUIET_SECONDS = 6 * 60 * 60
+ACTIVITY_QUIET_FACTOR = 2
+
+ACTIVITY_ATTACK_KEY = "ct-pinger-corp-last-attack"
+ACTIVITY_NOTIFICATION_KEY = "ct-pinger-corp-last-notification"
+
+
+def _record_corp_activity(corporation_id, notifs):
+    if not notifs:
+        return
+    last_notification = max(n.get("timestamp") for n in notifs).timestamp()
+    attacks = [
+        n.get("timestamp") for n in notifs if n.get("type") in ACTIVITY_HOT_TYPES
+    ]
+    pipe = cache_client.pipeline()
+    pipe.hset(ACTIVITY_NOTIFICATION_KEY, corporation_id, last_notification)
+    if attacks:
+        pipe.hset(ACTIVITY_ATTACK_KEY, corporation_id, max(attacks).timestamp())
+    pipe.execute()
+
+
+def get_corp_activity(corporation_id, now=None):
+    """Returns "hot", "quiet" or "normal" from the most recent notifications."""
+    if now is None:
+        now = time.time()
+    last_attack, last_notification = (
+        cache_client.pipeline()
+        .hget(ACTIVITY_ATTACK_KEY, corporation_id)
+        .hget(ACTIVITY_NOTIFICATION_KEY, corporation_id)
+        .execute()
+    )
+    if last_attack and now - float(last_attack) < ACTIVITY_HOT_SECONDS:
+        return "hot"
+    # never seen one? don't punish new corps
+    if last_notification and now - float(last_notification) > ACTIVITY_QUIET_SECONDS:
+        return "quiet"
+    return "normal"
+
+
+def _get_corp_update_delay(corporation_id, corp_size, min_delay=None):
+    """
+    Minimum time between two updates of the same corp.
+    Corps under attack are spread over the cache window when each character is
+    rescheduled, so only `min_delay` holds them back here. Quiet corps give up
+    the ESI calls that costs.
+    """
+    if min_delay is None:
+        _, _, min_delay = get_settings()
+    activity = get_corp_activity(corporation_id)
+    if activity == "hot":
+        return min_delay
+    # 10 min / characters we have for each corp
+    delay = CACHE_TIME_SECONDS / corp_size
+    if activity == "quiet":
+        delay *= ACTIVITY_QUIET_FACTOR
+    return max(delay, min_delay)
+
+
+def _queue_pingable_notifications(corporation_id, character_id, notifs, types, cutoff, etag=None):
+    """
+    Queue a characters new notifications for processing. `etag` is only stored
+    once the batch is processed, a failure leaves it to be fetched again.
+    """
+    pingable_notifs = []
+    pinged_already = dedupe.get_seen(
+        n.get("notification_id") for n in notifs if n.get("timestamp") > cutoff
+    )
+
+    for n in notifs:
+        if n.get("timestamp") > cutoff:
+            _t = sanitize_notification_type(n.get("type"))
+            if _t.startswith("unknown"):
+                logger.warning(
+                    f"PINGER: {corporation_id} Got Notification "
+                    f"{n.get('notification_id')} {n.get('type')} "
+                    f"{n.get('timestamp')}\n\n{n.get('text')}"
+                )
+            if notifications.normalise_type(_t) in types:
+                if n.get("notification_id") not in pinged_already:
+                    n["time"] = datetime.datetime.timestamp(n.get("timestamp"))
+                    pingable_notifs.append(n)
+
+    _record_corp_activity(
+        corporation_id, [n for n in notifs if n.get("timestamp") > cutoff]
+    )
+
+    logger.info(
+        f"PINGER: {corporation_id} Pings to process: {len(pingable_notifs)}"
+    )
+
+    # did we get any?
+    notification_ids = staging.stage(pingable_notifs)
+    args = [character_id, notification_ids]
+    if etag:
+        args.append(etag)
+
+    if staging.sample_payload():
+        inline_bytes = len(json.dumps([character_id, pingable_notifs], default=str))
+        staged_bytes = len(json.dumps(args))
+        staging.record_payload_sizes(inline_bytes, staged_bytes)
+        logger.debug(
+            f"PINGER: {corporation_id} Payload {inline_bytes} bytes inline, {staged_bytes} bytes staged"
+        )
+
+    if CT_PINGER_PIPELINE_MODE == "streams":
+        fields = {"notification_ids": json.dumps(notification_ids)}
+        if etag:
+            fields["etag"] = etag
+        pipeline.publish("process", character_id=character_id, **fields)
+    else:
+        process_notifications.apply_async(priority=TASK_PRIO, args=args)
+
+
+@shared_task(bind=True)
+def bootstrap_notification_tasks(self):
+    # build the schedule for all known corps, dispatch_notification_updates does the rest.
+    # run at 10m intervals to pick up new characters and corporations.
+    # safe to run on any node, syncing the schedule is idempotent.
+
+    corps = _get_active_corporations()
+
     logger.warning(f"PINGER: Bootstrap found {len(corps)} to check.")
-    # fire off tasks for each corp with active models
     for cid in corps:
-        _, _, next_update = _get_cache_data_for_corp(cid)
-        if next_update < -60:  # 1 min since last update should have fired.
-            logger.warning(f"PINGER: {cid} Out of Sync, Starting back up!")
-            corporation_notification_update.apply_async(
-                args=[cid], priority=TASK_PRIO + 1
-            )
+        scheduler.sync_corporation(cid, _get_corp_characters(cid))
+
+    removed = scheduler.prune_corporations(corps)
+    if removed:
+        logger.warning(f"PINGER: Bootstrap removed {removed} stale characters.")
 
     all_corps_in_audit = CorporationAudit.objects.all()
     for c in all_corps_in_audit:
@@ -221,6 +460,7 @@ def bootstrap_notification_tasks():
 
 @shared_task()
 def queue_corporation_notification_update(corporation_id, wait_time):
+    # No longer used, kept so messages queued by older versions still run.
     corporation_notification_update.apply_async(
         args=[corporation_id], priority=(TASK_PRIO + 1), countdown=wait_time
     )
@@ -399,37 +639,20 @@ def corporation_lo_check(self, corporation_id):
 
             set_lo_ping_state(corporation_id, sorted_hash)
 
-            webhooks = DiscordWebhook.objects.filter(lo_pings=True).prefetch_related(
-                "alliance_filter", "corporation_filter", "region_filter"
-            )
-
-            logger.info(f"PINGER: FUEL Webhooks {webhooks.count()}")
-
-            for hook in webhooks:
-                corporations = hook.corporation_filter.all().values_list(
-                    "corporation_id", flat=True
-                )
-
-                corp_filter = corporation_id
+            hook_ids = routing.get_targets(routing.LO_PINGS, corporation_id, None, None)
+            logger.info(f"PINGER: FUEL Webhooks {len(hook_ids)}")
 
-                if corp_filter is not None and len(corporations) > 0:
-                    if corp_filter not in corporations:
-                        logger.info(
-                            f"PINGER: FUEL  Skipped {self.structure.name} Corp {corp_filter} not in {corporations}"
-                        )
-                        continue
-
-                alert = False
+            for hook_id in hook_ids:
                 p = Ping.objects.create(
                     notification_id=-1,
-                    hook=hook,
+                    hook_id=hook_id,
                     body=json.dumps(embed),
                     time=timezone.now(),
-                    alerting=alert,
+                    alerting=False,
                 )
                 p.send_ping()
 
-                return embed
+            return embed
 
 
 def get_gas_key(corp_id):
@@ -550,221 +773,359 @@ def corporation_gas_check(self, corporation_id):
 
             set_gas_ping_state(corporation_id, sorted_hash)
 
-            webhooks = DiscordWebhook.objects.filter(gas_pings=True).prefetch_related(
-                "alliance_filter", "corporation_filter", "region_filter"
-            )
-            logger.info(f"PINGER: FUEL Webhooks {webhooks.count()}")
-
-            for hook in webhooks:
-                corporations = hook.corporation_filter.all().values_list(
-                    "corporation_id", flat=True
-                )
-
-                corp_filter = corporation_id
+            hook_ids = routing.get_targets(routing.GAS_PINGS, corporation_id, None, None)
+            logger.info(f"PINGER: FUEL Webhooks {len(hook_ids)}")
 
-                if corp_filter is not None and len(corporations) > 0:
-                    if corp_filter not in corporations:
-                        logger.info(
-                            f"PINGER: FUEL  Skipped Corp {corp_filter} not in {list(corporations)}"
-                        )
-                        continue
-
-                alert = False
+            for hook_id in hook_ids:
                 p = Ping.objects.create(
                     notification_id=-2,
-                    hook=hook,
+                    hook_id=hook_id,
                     body=json.dumps(embed),
                     time=timezone.now(),
-                    alerting=alert,
+                    alerting=False,
                 )
                 p.send_ping()
 
-                return embed
+            return embed
 
 
-@shared_task(bind=True, base=QueueOnce, max_retries=None)
-@esi_error_retry
-def corporation_notification_update(self, corporation_id):
-    # get oldest token and update notifications chained with a notification check
-    data = _get_cache_data_for_corp(corporation_id)
-    CUTTOFF = timezone.now() - datetime.timedelta(hours=LOOK_BACK_HOURS)
+def _get_notification_token(character_id):
+    token = Token.get_token(character_id, ["esi-characters.read_notifications.v1"])
+    if not token:
+        logger.error(f"PINGER: {character_id} has no tokens")
+        health.record_failure(character_id, "No Token")
+        return None
 
-    if data:
-        last_character = data[0]
+    try:
+        return token.valid_access_token()
+    except InvalidGrantError:
+        logger.error(f"PINGER: Invalid Grant on {token}")
+        health.record_failure(character_id, "Invalid Grant")
+        return None
 
-        logger.info(f"PINGER: {corporation_id} Last Update was with {last_character}")
 
-        all_chars_in_corp = set(
-            CharacterAudit.objects.filter(
-                characterroles__station_manager=True,
-                character__corporation_id=corporation_id,
-                active=True,
-            ).values_list("character__character_id", flat=True)
+# ESI answers these when the token can't read notifications, anything else
+# (5xx, timeouts, connection errors) is ESI's problem and not the character's
+CHARACTER_FAILURE_CODES = (401, 403)
+
+
+def _is_character_failure(status):
+    return status in CHARACTER_FAILURE_CODES
+
+
+def _backoff_character(corporation_id, character_id):
+    # demote this one, the rest of the corp keeps its cadence.
+    backoff = health.get_backoff(character_id) or health.BACKOFF_BASE_SECONDS
+    scheduler.schedule(corporation_id, character_id, time.time() + backoff)
+    logger.warning(
+        f"PINGER: {corporation_id} Backing off {character_id} for {backoff:.0f}s"
+    )
+
+
+def _reschedule_character(corporation_id, character_id, next_expire):
+    now = time.mktime(timezone.now().timetuple())
+    if not next_expire or next_expire < now:
+        next_expire = now + CACHE_TIME_SECONDS
+    # one second after the cache expires ESI will have fresh data for us
+    due = next_expire + 1
+    if get_corp_activity(corporation_id) == "hot":
+        # each character is only fresh once per cache window, keep the corp's
+        # characters an even share of it apart so there is no long gap.
+        size = scheduler.get_corporation_size(corporation_id) or 1
+        due = scheduler.schedule_spread(
+            corporation_id, character_id, due, CACHE_TIME_SECONDS / size
         )
+    else:
+        scheduler.schedule(corporation_id, character_id, due)
+    return due - 1 - now
+
+
+def _update_corp_rotation(corporation_id, character_id):
+    _, all_chars_in_corp, _ = _get_cache_data_for_corp(corporation_id)
+    if not all_chars_in_corp:
+        all_chars_in_corp = _get_corp_characters(corporation_id)
+    delay = (
+        _get_corp_update_delay(corporation_id, len(all_chars_in_corp))
+        if all_chars_in_corp
+        else 0
+    )
+    # leverage cache for pinger_stats and the cogs
+    _set_cache_data_for_corp(corporation_id, character_id, all_chars_in_corp, delay)
+
 
-        all_hr_chars = list(
-            set(
-                CharacterAudit.objects.filter(
-                    characterroles__personnel_manager=True,
-                    character__corporation_id=corporation_id,
-                    active=True,
-                ).values_list("character__character_id", flat=True)
+def _send_updates(dispatch, queue=None):
+    options = {"priority": TASK_PRIO + 1}
+    if queue is not None:
+        options["queue"] = queue
+    if CT_PINGER_ASYNC_FETCH and fetcher.fetcher_available():
+        bulk_notification_update.apply_async(args=[dispatch], **options)
+    else:
+        for corporation_id, character_id in dispatch:
+            corporation_notification_update.apply_async(
+                args=[corporation_id, character_id], **options
             )
+
+
+@shared_task(bind=True)
+def dispatch_notification_updates(self):
+    """
+    Send out an update for every (corporation, character) that is due.
+    Run every few seconds from beat, any node can run it as claiming the due
+    updates is atomic.
+    """
+
+    if get_error_flag() >= timezone.now():
+        logger.warning("PINGER: Hit ESI error limit! Skipping dispatch!")
+        return "ESI Error Limit"
+
+    remain, reset_in = governor.get_budget()
+    if governor.is_budget_paused(remain):
+        logger.warning(
+            f"PINGER: ESI error budget at {remain}, pausing dispatch for {reset_in:.0f}s"
         )
+        return "ESI Error Budget"
 
-        all_hr_chars = list(
-            set(
-                CharacterAudit.objects.filter(
-                    characterroles__personnel_manager=True,
-                    character__corporation_id=corporation_id,
-                    active=True,
-                ).values_list("character__character_id", flat=True)
+    if CT_PINGER_PIPELINE_MODE == "streams":
+        backlog = pipeline.get_backlog("process")
+        if backlog > pipeline.MAX_BACKLOG:
+            # due characters stay in the schedule until processing catches up
+            logger.warning(
+                f"PINGER: {backlog} notification batches waiting, pausing dispatch"
             )
-        )
+            return "Pipeline Backlog"
+
+    limit = 500
+    if remain is not None and remain < governor.SLOW_THRESHOLD:
+        # slow down, only a handful of requests until the window resets
+        limit = max(1, remain - governor.PAUSE_THRESHOLD)
+
+    _, _, min_delay = get_settings()
+    due = scheduler.claim_due(limit=limit)
+    dispatch = []
+    for corporation_id, character_id in due:
+        size = scheduler.get_corporation_size(corporation_id) or 1
+        spacing = _get_corp_update_delay(corporation_id, size, min_delay=min_delay)
+        wait = scheduler.acquire_corporation(corporation_id, spacing)
+        if wait:
+            # another character from this corp went recently, space them out.
+            scheduler.schedule(corporation_id, character_id, time.time() + wait)
+            continue
+        dispatch.append((corporation_id, character_id))
 
-        # todo make this nicer...
-        if len(all_hr_chars) > 0:
-            hr_presented = False
-            for i in all_hr_chars:
-                if i in all_chars_in_corp:
-                    hr_presented = True
-                    logger.info(f"PINGER: HR {corporation_id} We have HR covered")
-                    break
+    if dispatch and CT_PINGER_SHARDING:
+        # each corp goes to the node that owns it on the ring
+        ring = sharding.get_ring()
+        for node, pairs in sharding.assign(ring, dispatch).items():
+            _send_updates(pairs, queue=worker_direct(node) if node else None)
+    elif dispatch:
+        _send_updates(dispatch)
 
-            if not hr_presented:
-                logger.info(f"PINGER: HR {corporation_id} Adding a HR character")
+    return f"Dispatched {len(dispatch)} of {len(due)} due updates"
 
-                all_chars_in_corp.add(all_hr_chars[0])
 
-        all_chars_in_corp = list(all_chars_in_corp)
-        all_chars_in_corp.sort()
-        logger.info(
-            f"PINGER: {corporation_id} We have these Characters {all_chars_in_corp}"
-        )
+@shared_task(bind=True, base=QueueOnce, max_retries=None)
+@esi_error_retry
+def corporation_notification_update(self, corporation_id, character_id=None):
+    # update notifications for one character, the scheduler decides who and when.
+    CUTTOFF = timezone.now() - datetime.timedelta(hours=LOOK_BACK_HOURS)
 
-        if last_character in all_chars_in_corp:
-            idx = all_chars_in_corp.index(last_character) + 1
-        else:
-            idx = 0
+    if character_id is None:
+        # queued by an older version, pick the next one in the rotation.
+        last_character, _, _ = _get_cache_data_for_corp(corporation_id)
+        all_chars_in_corp = _get_corp_characters(corporation_id)
+        if not all_chars_in_corp:
+            return
+        character_id = _get_next_character(last_character, all_chars_in_corp)
 
-        if idx == len(all_chars_in_corp):
-            idx = 0
+    logger.info(f"PINGER: {corporation_id} Updating with {character_id}")
 
-        character_id = all_chars_in_corp[idx]
-        logger.info(f"PINGER: {corporation_id} Updating with {character_id}")
+    access_token = _get_notification_token(character_id)
+    if not access_token:
+        _backoff_character(corporation_id, character_id)
+        return
 
-        # if the char bugs out we will retry. so use next toon.
-        # TODO Blacklist bad chars
-        req_scopes = ["esi-characters.read_notifications.v1"]
+    last_expire = _get_last_cache_expire(character_id)
 
-        token = Token.get_token(character_id, req_scopes)
+    types = get_available_types()
+    # update notifications for this character inline.
+
+    request_options = {}
+    if CT_PINGER_CONDITIONAL_REQUESTS:
+        etag = _get_last_cache_etag(character_id)
+        if etag:
+            request_options["headers"] = {"If-None-Match": etag}
+
+    notifs = esi.client.Character.get_characters_character_id_notifications(
+        character_id=character_id,
+        token=access_token,
+        _request_options=request_options,
+    )
 
-        if not token:
-            self.retry(countdown=30)
-            logger.error(f"{character_id} has no tokens, retrying in 30s")
+    # CCPLEASE Why do you make me do this....
+    # I hate this... i am unsure of the possible dangers of allowing invalid data through...
+    # maybe we can make this an option later on or add some kind of admin ping on bad data...
+    # TODO yell in the direction of CCP and find a nicer way to manage this.
+    # notifs.operation.swagger_spec.config["validate_responses"] = False
+    notifs.request_config.also_return_response = True
+    _notifs = []
+    not_modified = False
+
+    start = time.perf_counter()
+    try:
+        _notifs, response = notifs.results()
+    except HTTPNotModified as e:
+        # nothing has changed since the last time we used this character
+        not_modified = True
+        response = e.response
+    except Exception as e:
+        status = e.status_code if isinstance(e, HTTPError) else None
+        if _is_character_failure(status):
+            health.record_failure(character_id, e)
+            _backoff_character(corporation_id, character_id)
+        elif status != 420:
+            # ESI is having a bad time, not this character. try again as normal.
+            _reschedule_character(corporation_id, character_id, None)
+        raise e
+    finally:
+        # As this is a spec level change i think it needs to be reverted
+        # if it is not all requests stop being validated this is bad...
+        # but for now lets not... see what happens...
+        # notifs.operation.swagger_spec.config["validate_responses"] = False
+        pass
 
-        try:
-            access_token = token.valid_access_token()
-        except InvalidGrantError:
-            logger.error(
-                f"Invalid Grant on {token}, Deleting {token.character_name}'s token"
-            )
-            self.retry(countdown=10)
+    health.record_success(character_id, time.perf_counter() - start)
+    governor.update_from_headers(response.headers)
+    next_expire = http2time(response.headers.get("Expires"))
+    if next_expire == last_expire:
+        logger.info("PINGER: CACHE: Same Cache as last update.")
 
-        last_expire = _get_last_cache_expire(character_id)
-        _set_cache_data_for_corp(corporation_id, character_id, all_chars_in_corp, 10)
+    secs_till_expire = _reschedule_character(corporation_id, character_id, next_expire)
+    _set_last_cache_expire(character_id, next_expire)
 
-        types = get_available_types()
-        # update notifications for this character inline.
+    etag = None
+    if CT_PINGER_CONDITIONAL_REQUESTS:
+        _record_etag_result(not_modified)
+        etag = response.headers.get("ETag")
 
-        notifs = esi.client.Character.get_characters_character_id_notifications(
-            character_id=character_id, token=access_token
+    if not_modified:
+        logger.info(
+            f"PINGER: {corporation_id} No new Notifications since last update with {character_id}"
+        )
+    else:
+        _queue_pingable_notifications(
+            corporation_id, character_id, _notifs, types, CUTTOFF, etag=etag
         )
 
-        # CCPLEASE Why do you make me do this....
-        # I hate this... i am unsure of the possible dangers of allowing invalid data through...
-        # maybe we can make this an option later on or add some kind of admin ping on bad data...
-        # TODO yell in the direction of CCP and find a nicer way to manage this.
-        # notifs.operation.swagger_spec.config["validate_responses"] = False
-        notifs.request_config.also_return_response = True
-        _notifs = []
+    _update_corp_rotation(corporation_id, character_id)
+    logger.info(
+        f"PINGER: {corporation_id} {character_id} will update again in {secs_till_expire} seconds."
+    )
 
-        try:
-            _notifs, response = notifs.results()
-        except Exception as e:
-            raise e
-        finally:
-            # As this is a spec level change i think it needs to be reverted
-            # if it is not all requests stop being validated this is bad...
-            # but for now lets not... see what happens...
-            # notifs.operation.swagger_spec.config["validate_responses"] = False
-            pass
 
-        now = time.mktime(timezone.now().timetuple())
-        next_expire = http2time(response.headers.get("Expires"))
+def _build_fetch_job(corporation_id, character_id):
+    access_token = _get_notification_token(character_id)
+    if not access_token:
+        _backoff_character(corporation_id, character_id)
+        return None
 
-        secs_till_expire = next_expire - now
-        if next_expire == last_expire:
-            logger.info("PINGER: CACHE: Same Cache as last update.")
-        if secs_till_expire < 30:
-            logger.warning(
-                f"PINGER: CACHE: Almost expired cache {token.character_name}, retrying with this character in {secs_till_expire + 1} seconds"
-            )
-            _set_cache_data_for_corp(
-                corporation_id, last_character, all_chars_in_corp, 0
-            )
-            self.retry(countdown=secs_till_expire + 1)
-        elif secs_till_expire < 570:
-            logger.warning(
-                f"PINGER: CACHE: Mid cache cycle {token.character_name}, retrying with next character"
-            )
-            self.retry(countdown=1)
+    etag = ""
+    if CT_PINGER_CONDITIONAL_REQUESTS:
+        etag = _get_last_cache_etag(character_id)
 
-        _set_last_cache_expire(character_id, next_expire)
+    return fetcher.FetchJob(corporation_id, character_id, access_token, etag)
 
-        pingable_notifs = []
-        pinged_already = set(
-            list(Ping.objects.values_list("notification_id", flat=True))
-        )
 
-        for n in _notifs:
-            if n.get("timestamp") > CUTTOFF:
-                _t = sanitize_notification_type(n.get("type"))
-                if _t.startswith("unknown"):
-                    logger.warning(
-                        f"PINGER: {corporation_id} Got Notification "
-                        f"{n.get('notification_id')} {n.get('type')} "
-                        f"{n.get('timestamp')}\n\n{n.get('text')}"
-                    )
-                if _t in types.keys():
-                    if n.get("notification_id") not in pinged_already:
-                        n["time"] = datetime.datetime.timestamp(n.get("timestamp"))
-                        pingable_notifs.append(n)
+def _handle_fetch_job(job, types, cutoff):
+    if job.status == 420:
+        logger.warning(f"PINGER: ASYNC Hit ESI error limit! Pausing Tasks! {job.error}")
+        _, reset = governor.read_headers(job.headers)
+        reset = reset if reset is not None else 60
+        governor.exhaust(reset)
+        set_error_flag(reset)
+        # straight back in the queue once the error window has passed
+        scheduler.schedule(job.corporation_id, job.character_id, time.time() + reset + 1)
+        return
 
-        logger.info(
-            f"PINGER: {corporation_id} Pings to process: {len(pingable_notifs)}"
+    if not job.ok:
+        logger.warning(
+            f"PINGER: ASYNC {job.corporation_id} Failed to update with "
+            f"{job.character_id} ({job.status}) {job.error}"
         )
+        if _is_character_failure(job.status):
+            health.record_failure(job.character_id, f"{job.status} {job.error}")
+            _backoff_character(job.corporation_id, job.character_id)
+        else:
+            _reschedule_character(job.corporation_id, job.character_id, None)
+        return
 
-        # did we get any?
-        process_notifications.apply_async(
-            priority=TASK_PRIO, args=[character_id, pingable_notifs]
-        )
+    health.record_success(job.character_id, job.latency)
 
-        _, _, min_delay = get_settings()
+    next_expire = http2time(job.headers.get("Expires"))
+    _reschedule_character(job.corporation_id, job.character_id, next_expire)
+    _set_last_cache_expire(job.character_id, next_expire)
 
-        delay = max(CACHE_TIME_SECONDS / len(all_chars_in_corp), min_delay)
+    etag = None
+    if CT_PINGER_CONDITIONAL_REQUESTS:
+        _record_etag_result(job.not_modified)
+        etag = job.headers.get("ETag")
 
-        # leverage cache
-        _set_cache_data_for_corp(corporation_id, character_id, all_chars_in_corp, delay)
-        # schedule the next corp token depending on the amount available ( 10 min / characters we have ) for each corp
-        logger.info(
-            f"PINGER: {corporation_id} We have {len(all_chars_in_corp)} Characters, will update every {delay} seconds."
-        )
-        # cant requeue ourself in a queueonce enviro
-        queue_corporation_notification_update.apply_async(
-            args=[corporation_id, delay], priority=(TASK_PRIO + 1), countdown=1
+    if not job.not_modified:
+        _queue_pingable_notifications(
+            job.corporation_id, job.character_id, job.notifications, types, cutoff,
+            etag=etag,
         )
 
+    _update_corp_rotation(job.corporation_id, job.character_id)
+
+
+@shared_task(bind=True, base=QueueOnce)
+def bulk_notification_update(self, due):
+    """
+    Update a batch of `[corporation_id, character_id]` pairs from one event loop
+    instead of one task per corp. Sent by the dispatcher when
+    `CT_PINGER_ASYNC_FETCH` is enabled.
+    """
+    if not fetcher.fetcher_available():
+        logger.error("PINGER: ASYNC httpx is not installed, can't bulk update")
+        return "httpx not installed"
+
+    jobs = []
+    for corporation_id, character_id in due:
+        job = _build_fetch_job(corporation_id, character_id)
+        if job:
+            jobs.append(job)
+
+    start = time.perf_counter()
+    fetcher.fetch_notifications(jobs, concurrency=CT_PINGER_ASYNC_FETCH_CONCURRENCY)
+    logger.info(
+        f"PINGER: ASYNC Fetched {len(jobs)} Characters in {time.perf_counter() - start:.2f}s"
+    )
+
+    types = get_available_types()
+    CUTTOFF = timezone.now() - datetime.timedelta(hours=LOOK_BACK_HOURS)
+    for job in jobs:
+        if not job.sent:
+            # never sent, error budget ran out. try again shortly.
+            scheduler.schedule(job.corporation_id, job.character_id, time.time() + 60)
+            continue
+        _handle_fetch_job(job, types, CUTTOFF)
+
+    return f"Updated {len(jobs)} Characters"
+
+
+@shared_task
+def cleanup_mutes():
+    """Drop expired mutes and resync the mute index with the database."""
+    deleted = mutes.cleanup()
+    if deleted:
+        logger.info(f"PINGER: Removed {deleted} expired mutes")
+
+
+@shared_task
+def refresh_structure_name(structure_id, character_id):
+    """Refresh a stale structure name in the background."""
+    return names.resolve(structure_id, character_id)
+
 
 class Notification:
     # Settings
@@ -790,17 +1151,44 @@ class Notification:
 
 
 @shared_task(bind=True, base=QueueOnce)
-def process_notifications(self, cid, notifs):
+def process_notifications(self, cid, notifs, etag=None):
+    _process_notifications(cid, notifs, etag=etag)
+
+
+def process_stream_entry(fields):
+    _process_notifications(
+        int(fields["character_id"]),
+        json.loads(fields["notification_ids"]),
+        etag=fields.get("etag"),
+    )
+
+
+def _process_notifications(cid, notifs, replay=False, etag=None):
+    """
+    Build and send the pings for a batch of a characters notifications.
+    `replay` skips the age and already seen checks for quarantined notifications.
+    `etag` is the ESI ETag of the batch, stored once it has been handled.
+    """
     char = CharacterAudit.objects.get(character__character_id=cid)
     new_notifs = []
     CUTTOFF = timezone.now() - datetime.timedelta(hours=LOOK_BACK_HOURS)
 
+    if len(notifs) and not isinstance(notifs[0], dict):
+        # just the ids, grab the rest from the staging store
+        notifs, expired = staging.load(notifs)
+        if expired:
+            # keep the old etag so the next update fetches them again
+            logger.warning(
+                f"PINGER: {char} Lost {len(expired)} Staged Notifications, not storing the ETag"
+            )
+            etag = None
+
     for note in notifs:
-        if not isinstance(note["timestamp"], datetime.datetime):
+        if not isinstance(note.get("timestamp"), datetime.datetime):
             note["timestamp"] = datetime.datetime.fromtimestamp(
                 note.get("time"), tz=datetime.timezone.utc
             )
-        if note.get("timestamp") > CUTTOFF:
+        if replay or note.get("timestamp") > CUTTOFF:
             if note.get("type").startswith("unknown"):
                 logger.info(
                     f"PINGER: {char} Got Notification {note.get('notification_id')} {note.get('type')} {note.get('timestamp')}\n\n{note.get('text')}"
@@ -816,77 +1204,101 @@ def process_notifications(self, cid, notifs):
             new_notifs.append(n)
 
     pings = {}
+    handled = {}
     # grab all notifications within scope.
-    types = get_available_types()
-    pinged_already = set(
-        list(
-            Ping.objects.filter(
-                time__gte=(CUTTOFF - datetime.timedelta(days=1))
-            ).values_list("notification_id", flat=True)
-        )
-    )
-    # parse them into the parsers
+    if replay:
+        pinged_already = set()
+    else:
+        pinged_already = dedupe.get_seen(n.notification_id for n in new_notifs)
+    to_build = []
     for n in new_notifs:
         if n.notification_id not in pinged_already:
             pinged_already.add(n.notification_id)
-            try:
-                _t = (
-                    n.notification_type.replace(" ", "")
-                    .replace("(", "")
-                    .replace(")", "")
+            handled[n.notification_id] = n.timestamp
+            parser_class = notifications.get_parser(n.notification_type)
+            if parser_class is None:
+                logger.warning(
+                    f"PINGER: No parser for {n.notification_id} {n.notification_type}"
                 )
-                note = types[_t](n)
-                if _t not in pings:
-                    pings[_t] = []
-                pings[_t].append(note)
-            except notifications.MutedException:
-                pass
+                continue
+            to_build.append((n, parser_class))
 
-    # send them to webhooks as needed
-    for k, l in pings.items():
-        webhooks = DiscordWebhook.objects.filter(
-            ping_types__class_tag=k
-        ).prefetch_related("alliance_filter", "corporation_filter", "region_filter")
-
-        for hook in webhooks:
-            regions = hook.region_filter.all().values_list("region_id", flat=True)
-            alliances = hook.alliance_filter.all().values_list("alliance_id", flat=True)
-            corporations = hook.corporation_filter.all().values_list(
-                "corporation_id", flat=True
+    # parse the batch up front, big backlogs are spread over a process pool
+    parsed, failed = notification_parser.parse_many(
+        ((n.notification_id, n.notification_text) for n, _ in to_build),
+        threshold=CT_PINGER_PARALLEL_PARSE_THRESHOLD,
+        workers=CT_PINGER_PARALLEL_PARSE_WORKERS,
+    )
+    if failed:
+        for n, _ in to_build:
+            if n.notification_id in failed:
+                quarantine.add(n, quarantine.STAGE_PARSE, failed[n.notification_id])
+        to_build = [(n, pc) for n, pc in to_build if n.notification_id not in failed]
+
+    # work out who wants what before building anything
+    routed = []
+    for n, parser_class in to_build:
+        data = parsed[n.notification_id]
+        try:
+            corp_filter, alli_filter, region_filter, _t = parser_class.get_routing_key(
+                n, data
             )
+        except Exception:
+            quarantine.add(n, quarantine.STAGE_ROUTE)
+            continue
+        if not routing.get_index(_t).targets(corp_filter, alli_filter, region_filter):
+            logger.debug(f"PINGER: No webhooks for {n.notification_id} {_t}")
+            continue
+        routed.append((n, parser_class))
 
-            for p in l:
-                corp_filter, alli_filter, region_filter = p.get_filters()
-
-                if corp_filter is not None and len(corporations) > 0:
-                    if corp_filter not in corporations:
-                        logging.info(f"PINGER: ignroing Ping {p} corp filter")
-                        continue
-
-                if alli_filter is not None and len(alliances) > 0:
-                    if alli_filter not in alliances:
-                        logging.info(f"PINGER: ignroing Ping {p} alli filter")
-                        continue
-
-                if region_filter is not None and len(regions) > 0:
-                    if region_filter not in regions:
-                        logging.info(f"PINGER: ignroing Ping {p} region filter")
-                        continue
-
-                ping_ob = Ping.objects.create(
-                    notification_id=p._notification.notification_id,
-                    time=p._notification.timestamp,
-                    body=p._ping,
-                    hook=hook,
-                    alerting=p.force_at_ping,
+    # resolve everything the batch references in one go
+    context = notifications.ResolvedContext.build(
+        parsed[n.notification_id] for n, _ in routed
+    )
+
+    # parse them into the parsers
+    for n, parser_class in routed:
+        try:
+            note = parser_class(n, context=context)
+            _t = parser_class.__name__
+            if _t not in pings:
+                pings[_t] = []
+            pings[_t].append(note)
+        except notifications.MutedException:
+            pass
+        except Exception:
+            # one broken notification shouldn't hold up the rest
+            quarantine.add(n, quarantine.STAGE_BUILD)
+
+    # send them to webhooks as needed
+    pings_out = []
+    for k, l in pings.items():
+        index = routing.get_index(k)
+        for p in l:
+            hook_ids = sorted(index.targets(*p.get_filters()))
+            for hook_id in hook_ids:
+                pings_out.append(
+                    Ping(
+                        notification_id=p._notification.notification_id,
+                        time=p._notification.timestamp,
+                        body=p._ping,
+                        hook_id=hook_id,
+                        alerting=p.force_at_ping,
+                    )
                 )
-                logging.info(f"PINGER: Sending Ping {ping_ob}")
-                ping_ob.send_ping()
-                try:
-                    if p.timer:
-                        p.timer.save()
-                except Exception:
-                    logger.exception("PINGER: Faiiled to add Timer...")
+            try:
+                if hook_ids and p.timer:
+                    p.timer.save()
+            except Exception:
+                logger.exception("PINGER: Faiiled to add Timer...")
+
+    if pings_out:
+        _send_pings_bulk(pings_out, char)
+
+    # only once everything went out, a failure above leaves them for the next update.
+    dedupe.mark_seen(handled)
+    if etag:
+        _set_last_cache_etag(cid, etag)
 
 
 def _build_wh_cache_key(wh_id):
@@ -912,11 +1324,133 @@ def _get_cooloff_time(wh_id):
         return 0
 
 
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _create_pings(pings):
+    """`bulk_create` the pings, making sure every one of them has its id."""
+    Ping.objects.bulk_create(pings)
+    if all(p.pk is not None for p in pings):
+        return pings
+
+    # backends that don't return ids from bulk inserts, eg MySQL
+    ids = {}
+    for pk, notification_id, hook_id in Ping.objects.filter(
+        notification_id__in={p.notification_id for p in pings},
+        hook_id__in={p.hook_id for p in pings},
+        ping_sent=False,
+    ).values_list("id", "notification_id", "hook_id"):
+        key = (notification_id, hook_id)
+        ids[key] = max(pk, ids.get(key, 0))
+    for p in pings:
+        p.pk = p.id = ids.get((p.notification_id, p.hook_id))
+    return [p for p in pings if p.pk is not None]
+
+
+def _send_pings_bulk(pings, source=""):
+    """Save a batch of pings in one go and queue one delivery per webhook."""
+    counter = _QueryCounter()
+    with connection.execute_wrapper(counter):
+        pings = _create_pings(pings)
+
+    by_hook = {}
+    for p in pings:
+        by_hook.setdefault(p.hook_id, []).append(p.id)
+    for hook_id, ping_ids in by_hook.items():
+        queue_pings(hook_id, ping_ids)
+
+    logger.info(
+        f"PINGER: {source} Queued {len(pings)} Pings to {len(by_hook)} Webhooks "
+        f"with {counter.count} Queries and {len(by_hook)} Messages"
+    )
+
+
+def queue_pings(hook_id, ping_ids):
+    if CT_PINGER_PIPELINE_MODE == "streams":
+        pipeline.publish("send", ping_ids=json.dumps(ping_ids), hook_id=hook_id)
+    else:
+        send_pings.apply_async(priority=2, args=[hook_id, ping_ids])
+
+
+def queue_ping(ping_id, hook_id):
+    if CT_PINGER_PIPELINE_MODE == "streams":
+        pipeline.publish("send", ping_id=ping_id, hook_id=hook_id)
+    else:
+        send_ping.apply_async(priority=2, args=[ping_id])
+
+
 @shared_task(bind=True, max_retries=None)
 def send_ping(self, ping_id):
-    ping_ob = Ping.objects.get(id=ping_id)
+    try:
+        return _send_ping(ping_id)
+    except WebhookCooloff as e:
+        self.retry(countdown=e.countdown)
+
+
+@shared_task(bind=True, max_retries=None)
+def send_pings(self, hook_id, ping_ids):
+    """Deliver pings to one webhook in order, picking up where a cooloff stopped it."""
+    pings = Ping.objects.select_related("hook").in_bulk(ping_ids)
+    for i, ping_id in enumerate(ping_ids):
+        ping_ob = pings.get(ping_id)
+        if ping_ob is None:
+            continue
+        try:
+            _deliver_ping(ping_ob)
+        except WebhookCooloff as e:
+            self.retry(args=[hook_id, ping_ids[i:]], countdown=e.countdown)
+        except Exception:
+            logger.exception(f"PINGER: Failed to send Ping {ping_id} to {hook_id}")
+
+
+def send_stream_key(fields):
+    # pings for one webhook go out in order, the other webhooks don't wait on it
+    return fields["hook_id"]
+
+
+def send_stream_entry(fields):
+    if "ping_ids" in fields:
+        ping_ids = json.loads(fields["ping_ids"])
+    else:
+        ping_ids = [int(fields["ping_id"])]
+
+    # anything sent before a cooloff is skipped when the entry comes back
+    pings = (
+        Ping.objects.select_related("hook")
+        .filter(ping_sent=False)
+        .in_bulk(ping_ids)
+    )
+    for ping_id in ping_ids:
+        ping_ob = pings.get(ping_id)
+        if ping_ob is None:
+            continue
+        try:
+            # never sleep here, that would hold up every other webhook
+            _deliver_ping(ping_ob, max_wait=0)
+        except WebhookCooloff as e:
+            # leave the entry pending, this webhook is held until it has room
+            raise pipeline.Deferred(e.countdown)
+
+
+def _send_ping(ping_id):
+    return _deliver_ping(Ping.objects.select_related("hook").get(id=ping_id))
+
+
+def _deliver_ping(ping_ob, max_wait=RATE_LIMIT_MAX_WAIT):
+    ping_id = ping_ob.id
     CUTTOFF = timezone.now() - datetime.timedelta(hours=LOOK_BACK_HOURS)
 
+    wh_sleep = _get_cooloff_time(ping_ob.hook.id)
+    if wh_sleep > 0:
+        logger.warning(f"Webhook rate limited: trying again in {wh_sleep} seconds...")
+        raise WebhookCooloff(wh_sleep)
+
     if ping_ob.notification_id > 0:
         saved = cache_client.sadd(
             "ct-pinger-ping-lock-set", f"{ping_id}{ping_ob.notification_id}"
@@ -927,17 +1461,22 @@ def send_ping(self, ping_id):
             ping_ob.save()
             return
 
-    wh_sleep = _get_cooloff_time(ping_ob.hook.id)
-    if wh_sleep > 0:
-        logger.warning(f"Webhook rate limited: trying again in {wh_sleep} seconds...")
-        self.retry(countdown=wh_sleep)
-
     if ping_ob.ping_sent is True:
         return "Already done!"
 
     if ping_ob.time < CUTTOFF:
         return "TOO OLD!"
 
+    # wait for discord to have room for it rather than eat a 429
+    wh_sleep = ratelimit.wait(ping_ob.hook_id, max_wait)
+    if wh_sleep > 0:
+        if ping_ob.notification_id > 0:
+            cache_client.srem(
+                "ct-pinger-ping-lock-set", f"{ping_id}{ping_ob.notification_id}"
+            )
+        logger.info(f"PINGER: Webhook bucket empty, trying again in {wh_sleep:.2f} seconds")
+        raise WebhookCooloff(wh_sleep)
+
     alertText = ""
     if ping_ob.alerting and not ping_ob.hook.no_at_pings:
         alertText = '"content": "@here", '
@@ -946,11 +1485,9 @@ def send_ping(self, ping_id):
 
     logger.debug(payload)
     url = ping_ob.hook.discord_webhook
-    custom_headers = {"Content-Type": "application/json"}
-
-    response = requests.post(
-        url, headers=custom_headers, data=payload, params={"wait": True}
-    )
+    response = delivery.post_webhook(url, payload)
+    ratelimit.update_from_headers(ping_ob.hook_id, response.headers)
+    ratelimit.record(response.status_code)
 
     if response.status_code in [200, 204]:
         logger.debug(f"{ping_ob.notification_id} Ping Sent!")
@@ -964,8 +1501,10 @@ def send_ping(self, ping_id):
         errors = json.loads(response.content.decode("utf-8"))
         wh_sleep = (int(errors["retry_after"]) / 1000) + 0.15
         logger.warning(f"Webhook rate limited: trying again in {wh_sleep} seconds...")
+        if errors.get("global"):
+            ratelimit.block_global(wh_sleep)
         _set_wh_cooloff(ping_ob.hook.id, wh_sleep)
-        self.retry(countdown=wh_sleep)
+        raise WebhookCooloff(wh_sleep)
     else:
         if ping_ob.notification_id > 0:
             saved = cache_client.srem(
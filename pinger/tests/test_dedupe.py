@@ -0,0 +1,43 @@
+import datetime
+import time
+
+from django.test import TestCase
+from django.utils import timezone
+
+from pinger import dedupe
+from pinger.models import DiscordWebhook, Ping
+from pinger.providers import cache_client
+
+
+class TestDedupe(TestCase):
+
+    def setUp(self):
+        cache_client.delete(dedupe.SEEN_KEY)
+
+    def tearDown(self):
+        cache_client.delete(dedupe.SEEN_KEY)
+
+    def test_mark_then_seen(self):
+        now = time.time()
+        dedupe.mark_seen({1: now, 2: now})
+
+        self.assertEqual(dedupe.get_seen([1, 2, 3]), {1, 2})
+        self.assertEqual(dedupe.get_seen([]), set())
+
+    def test_old_entries_are_trimmed(self):
+        now = time.time()
+        dedupe.mark_seen({1: now - dedupe.SEEN_WINDOW_SECONDS - 60})
+        dedupe.mark_seen({2: timezone.now()})
+
+        self.assertEqual(dedupe.get_seen([1, 2]), {2})
+        self.assertEqual(dedupe.get_index_size(), 1)
+
+    def test_warms_from_recent_pings(self):
+        hook = DiscordWebhook.objects.create(discord_webhook="https://example.com/hook")
+        Ping.objects.create(notification_id=1, hook=hook, body="{}", time=timezone.now())
+        Ping.objects.create(
+            notification_id=2, hook=hook, body="{}",
+            time=timezone.now() - datetime.timedelta(seconds=dedupe.SEEN_WINDOW_SECONDS + 60),
+        )
+
+        self.assertEqual(dedupe.get_seen([1, 2, 3]), {1})
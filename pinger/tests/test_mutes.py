@@ -0,0 +1,58 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from pinger import mutes
+from pinger.models import MutedStructure
+from pinger.providers import cache_client
+
+STRUCTURE_ID = 1000000000001
+
+
+class TestMutes(TestCase):
+
+    def setUp(self):
+        cache_client.set(mutes.READY_KEY, 1)
+
+    def tearDown(self):
+        cache_client.delete(mutes.READY_KEY, mutes._build_mute_key(STRUCTURE_ID))
+
+    def test_save_mutes(self):
+        MutedStructure.objects.create(structure_id=STRUCTURE_ID)
+
+        self.assertTrue(mutes.is_muted(STRUCTURE_ID))
+
+    def test_delete_keeps_other_live_row(self):
+        older = MutedStructure.objects.create(structure_id=STRUCTURE_ID)
+        newer = MutedStructure.objects.create(structure_id=STRUCTURE_ID)
+
+        older.delete()
+        self.assertTrue(mutes.is_muted(STRUCTURE_ID))
+
+        newer.delete()
+        self.assertFalse(mutes.is_muted(STRUCTURE_ID))
+
+    def test_cleanup_keeps_other_live_row(self):
+        MutedStructure.objects.create(structure_id=STRUCTURE_ID)
+        expired = MutedStructure.objects.create(structure_id=STRUCTURE_ID)
+        # auto_now, so age it with an update
+        MutedStructure.objects.filter(pk=expired.pk).update(
+            date_added=timezone.now() - datetime.timedelta(seconds=mutes.MUTE_SECONDS + 60)
+        )
+
+        self.assertEqual(mutes.cleanup(), 1)
+        self.assertTrue(mutes.is_muted(STRUCTURE_ID))
+
+    def test_resaving_older_row_keeps_newer_mute(self):
+        older = MutedStructure.objects.create(structure_id=STRUCTURE_ID)
+        MutedStructure.objects.create(structure_id=STRUCTURE_ID)
+
+        older.date_added = timezone.now() - datetime.timedelta(days=1)
+        with mock.patch.object(MutedStructure._meta.get_field("date_added"), "auto_now", False):
+            older.save()
+
+        self.assertGreater(
+            cache_client.ttl(mutes._build_mute_key(STRUCTURE_ID)), mutes.MUTE_SECONDS - 60
+        )
@@ -0,0 +1,55 @@
+import yaml
+
+from django.test import SimpleTestCase
+
+from pinger.notifications import parser
+
+
+class BrokenPool:
+
+    def __init__(self):
+        self.shutdown_called = False
+
+    def map(self, fn, chunks):
+        raise RuntimeError("A process in the pool was terminated abruptly")
+
+    def shutdown(self, wait=True, **kwargs):
+        self.shutdown_called = True
+
+
+class TestParser(SimpleTestCase):
+
+    def test_python_tags_match_unsafe_loader(self):
+        text = (
+            "a: !!python/long 123\n"
+            "b: !!python/int '0x1f'\n"
+            "c: !!python/float 1.5\n"
+            "d: !!python/bool true\n"
+            "e: !!python/none ''\n"
+            "f: !!python/tuple [1, 2]\n"
+            "g: !!python/unicode abc\n"
+        )
+        data = parser.parse(text)
+
+        self.assertEqual(data, yaml.load(text, Loader=yaml.UnsafeLoader))
+        self.assertIsInstance(data["a"], int)
+        self.assertIsInstance(data["c"], float)
+
+    def test_unknown_tags_are_plain_data(self):
+        data = parser.parse("a: !!python/object:os.system ls\nb: !custom [1, 2]\n")
+
+        self.assertEqual(data, {"a": "ls", "b": [1, 2]})
+
+    def test_pool_failure_parses_in_process(self):
+        pool = BrokenPool()
+        parser._pool = pool
+        try:
+            results, failed = parser.parse_many(
+                [(900001, "a: 1\n"), (900002, "b: [2\n")], threshold=1, workers=1
+            )
+        finally:
+            parser._pool = None
+
+        self.assertEqual(results, {900001: {"a": 1}})
+        self.assertEqual(list(failed), [900002])
+        self.assertTrue(pool.shutdown_called)
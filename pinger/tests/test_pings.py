@@ -0,0 +1,83 @@
+from unittest import mock
+
+from celery.exceptions import Retry
+
+from django.test import TestCase
+from django.utils import timezone
+
+from pinger import tasks
+from pinger.exceptions import WebhookCooloff
+from pinger.models import DiscordWebhook, Ping
+
+
+class TestCreatePings(TestCase):
+
+    def setUp(self):
+        self.hook = DiscordWebhook.objects.create(discord_webhook="https://example.com/hook")
+        self.other_hook = DiscordWebhook.objects.create(discord_webhook="https://example.com/other")
+
+    def _pings(self):
+        return [
+            Ping(notification_id=nid, hook=hook, body="{}", time=timezone.now())
+            for nid in (1, 2) for hook in (self.hook, self.other_hook)
+        ]
+
+    def test_every_ping_has_its_id(self):
+        pings = tasks._create_pings(self._pings())
+
+        self.assertEqual(len(pings), 4)
+        self.assertEqual(
+            {(p.notification_id, p.hook_id) for p in Ping.objects.filter(id__in=[p.id for p in pings])},
+            {(p.notification_id, p.hook_id) for p in pings},
+        )
+
+    def test_backend_without_bulk_ids(self):
+        # an unsent ping from an earlier run for the same notification
+        older = Ping.objects.create(notification_id=1, hook=self.hook, body="{}", time=timezone.now())
+        bulk_create = Ping.objects.bulk_create
+
+        def _bulk_create_without_ids(objs):
+            bulk_create(objs)
+            for p in objs:
+                p.pk = p.id = None
+
+        with mock.patch.object(Ping.objects, "bulk_create", side_effect=_bulk_create_without_ids):
+            pings = tasks._create_pings(self._pings())
+
+        self.assertEqual(len(pings), 4)
+        self.assertNotIn(older.id, [p.id for p in pings])
+        for p in pings:
+            saved = Ping.objects.get(id=p.id)
+            self.assertEqual((saved.notification_id, saved.hook_id), (p.notification_id, p.hook_id))
+
+
+class TestSendPings(TestCase):
+
+    def setUp(self):
+        self.hook = DiscordWebhook.objects.create(discord_webhook="https://example.com/hook")
+        self.ping_ids = [
+            Ping.objects.create(notification_id=nid, hook=self.hook, body="{}", time=timezone.now()).id
+            for nid in (1, 2, 3)
+        ]
+
+    @mock.patch("celery.app.task.Task.retry", side_effect=Retry())
+    @mock.patch("pinger.tasks._deliver_ping")
+    def test_resumes_from_the_cooloff(self, deliver_ping, retry):
+        deliver_ping.side_effect = [None, WebhookCooloff(5)]
+
+        with self.assertRaises(Retry):
+            tasks.send_pings(self.hook.id, self.ping_ids)
+
+        self.assertEqual(deliver_ping.call_count, 2)
+        retry.assert_called_once_with(args=[self.hook.id, self.ping_ids[1:]], countdown=5)
+
+    @mock.patch("pinger.tasks._deliver_ping")
+    def test_failures_dont_stop_the_rest(self, deliver_ping):
+        deliver_ping.side_effect = [Exception("boom"), None]
+
+        tasks.send_pings(self.hook.id, [self.ping_ids[0], 0, self.ping_ids[2]])
+
+        self.assertEqual(
+            [c.args[0].id for c in deliver_ping.call_args_list],
+            [self.ping_ids[0], self.ping_ids[2]],
+        )
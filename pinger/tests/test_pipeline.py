@@ -0,0 +1,86 @@
+import time
+
+from django.test import SimpleTestCase
+
+from pinger import pipeline
+from pinger.providers import cache_client
+
+STAGE = "send"
+CONSUMER = "test-consumer"
+OTHER_CONSUMER = "other-consumer"
+
+
+def _key(fields):
+    return fields["hook_id"]
+
+
+class TestDeferred(SimpleTestCase):
+
+    def setUp(self):
+        cache_client.delete(pipeline.STREAMS[STAGE])
+        pipeline.ensure_group(STAGE)
+        pipeline._held.clear()
+        pipeline._deferred_until.clear()
+        pipeline._refreshed_at.clear()
+        self.handled = []
+
+    def tearDown(self):
+        cache_client.delete(pipeline.STREAMS[STAGE])
+        pipeline._held.clear()
+        pipeline._deferred_until.clear()
+        pipeline._refreshed_at.clear()
+
+    def _defer_hook_1(self, fields):
+        if fields["hook_id"] == "1":
+            raise pipeline.Deferred(60)
+        self.handled.append(fields["n"])
+
+    def _consume(self, consumer=CONSUMER):
+        pipeline.consume(STAGE, self._defer_hook_1, consumer=consumer, block=1, key=_key)
+
+    def test_group_held_in_order_others_carry_on(self):
+        pipeline.publish(STAGE, hook_id=1, n=1)
+        pipeline.publish(STAGE, hook_id=2, n=2)
+        pipeline.publish(STAGE, hook_id=1, n=3)
+
+        self._consume()
+
+        self.assertEqual(self.handled, ["2"])
+        self.assertEqual(
+            sorted(fields["n"] for _, fields in pipeline._held[STAGE].values()), ["1", "3"]
+        )
+
+    def test_held_entries_are_claimed_back(self):
+        pipeline.publish(STAGE, hook_id=1, n=1)
+        self._consume()
+        entry_id = next(iter(pipeline._held[STAGE]))
+
+        pipeline._refreshed_at.clear()
+        pipeline._refresh_held(STAGE, CONSUMER)
+
+        pending = cache_client.xpending_range(
+            pipeline.STREAMS[STAGE], pipeline.GROUP_NAME, min=entry_id, max=entry_id, count=1
+        )[0]
+        self.assertEqual(pending["consumer"], CONSUMER.encode("utf-8"))
+        self.assertLess(pending["time_since_delivered"], pipeline.CLAIM_IDLE_MS)
+
+    def test_entry_taken_by_another_consumer_is_dropped(self):
+        pipeline.publish(STAGE, hook_id=1, n=1)
+        self._consume()
+        entry_id = next(iter(pipeline._held[STAGE]))
+        cache_client.xclaim(
+            pipeline.STREAMS[STAGE], pipeline.GROUP_NAME, OTHER_CONSUMER, 0, [entry_id]
+        )
+
+        pipeline._refreshed_at.clear()
+        pipeline._refresh_held(STAGE, CONSUMER)
+
+        self.assertEqual(pipeline._held[STAGE], {})
+
+    def test_expired_deferrals_are_dropped(self):
+        pipeline._deferred_until[(STAGE, "1")] = time.time() - 1
+        pipeline._deferred_until[(STAGE, "2")] = time.time() + 60
+
+        pipeline._handle_held(STAGE, self._defer_hook_1)
+
+        self.assertEqual(list(pipeline._deferred_until), [(STAGE, "2")])
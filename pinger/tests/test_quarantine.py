@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from pinger import quarantine
+from pinger.models import QuarantinedNotification
+
+GOOD_ID = 1
+BAD_ID = 2
+OTHER_CHARACTER_ID = 3
+
+
+def _quarantine(notification_id, character_id=1):
+    return QuarantinedNotification.objects.create(
+        notification_id=notification_id,
+        character_id=character_id,
+        notification_type="StructureUnderAttack",
+        timestamp=timezone.now(),
+        text="text: 1",
+        stage=quarantine.STAGE_BUILD,
+        error="Traceback",
+    )
+
+
+def _fail_again(cid, notifs, replay=False):
+    # what `quarantine.add` does to a notification that still fails
+    if any(n["notification_id"] == BAD_ID for n in notifs):
+        QuarantinedNotification.objects.filter(notification_id=BAD_ID).update(
+            last_failed=timezone.now()
+        )
+
+
+def _character_fails(cid, notifs, replay=False):
+    if cid == OTHER_CHARACTER_ID:
+        raise Exception("boom")
+
+
+class TestReplay(TestCase):
+
+    @mock.patch("pinger.tasks._process_notifications", side_effect=_fail_again)
+    def test_only_fixed_notifications_are_cleared(self, process_notifications):
+        _quarantine(GOOD_ID)
+        _quarantine(BAD_ID)
+
+        self.assertEqual(quarantine.replay(QuarantinedNotification.objects.all()), (1, 1))
+        self.assertEqual(
+            list(QuarantinedNotification.objects.values_list("notification_id", flat=True)),
+            [BAD_ID],
+        )
+
+        cid, notifs = process_notifications.call_args.args
+        self.assertEqual(cid, 1)
+        self.assertEqual(sorted(n["notification_id"] for n in notifs), [GOOD_ID, BAD_ID])
+        self.assertTrue(process_notifications.call_args.kwargs["replay"])
+
+    @mock.patch("pinger.tasks._process_notifications", side_effect=_character_fails)
+    def test_failed_character_keeps_its_notifications(self, process_notifications):
+        _quarantine(GOOD_ID)
+        _quarantine(BAD_ID, character_id=OTHER_CHARACTER_ID)
+
+        self.assertEqual(quarantine.replay(QuarantinedNotification.objects.all()), (1, 1))
+        self.assertEqual(
+            list(QuarantinedNotification.objects.values_list("notification_id", flat=True)),
+            [BAD_ID],
+        )
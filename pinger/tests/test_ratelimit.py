@@ -0,0 +1,92 @@
+import time
+
+from django.test import SimpleTestCase
+
+from pinger import ratelimit
+from pinger.app_settings import CT_PINGER_GLOBAL_RATE_LIMIT
+from pinger.providers import cache_client
+
+HOOK_ID = 1
+OTHER_HOOK_ID = 2
+BUCKET = "test-bucket"
+
+
+def _headers(remaining, reset_after, bucket=None):
+    headers = {
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset-After": str(reset_after),
+    }
+    if bucket:
+        headers["X-RateLimit-Bucket"] = bucket
+    return headers
+
+
+class TestRateLimit(SimpleTestCase):
+
+    def setUp(self):
+        self._clear()
+        # the keys expire on the real clock, and lua keeps 14 digits of it
+        self.now = time.time()
+
+    def tearDown(self):
+        self._clear()
+
+    def _clear(self):
+        cache_client.delete(
+            ratelimit.BUCKET_MAP_KEY,
+            ratelimit.GLOBAL_KEY,
+            ratelimit.STATS_KEY,
+            ratelimit._build_bucket_key(f"hook-{HOOK_ID}"),
+            ratelimit._build_bucket_key(f"hook-{OTHER_HOOK_ID}"),
+            ratelimit._build_bucket_key(BUCKET),
+        )
+
+    def test_unknown_bucket_is_free(self):
+        self.assertEqual(ratelimit.acquire(HOOK_ID, now=self.now), 0)
+
+    def test_empty_bucket_waits_for_the_reset(self):
+        ratelimit.update_from_headers(HOOK_ID, _headers(1, 2), now=self.now)
+
+        self.assertEqual(ratelimit.acquire(HOOK_ID, now=self.now + 0.1), 0)
+        self.assertAlmostEqual(ratelimit.acquire(HOOK_ID, now=self.now + 0.5), 1.5, places=3)
+        self.assertEqual(ratelimit.acquire(HOOK_ID, now=self.now + 2.5), 0)
+
+    def test_late_response_doesnt_refill(self):
+        ratelimit.update_from_headers(HOOK_ID, _headers(0, 2), now=self.now)
+        # answered before the one above but arrived after it
+        ratelimit.update_from_headers(HOOK_ID, _headers(3, 1.8), now=self.now + 0.2)
+
+        self.assertAlmostEqual(ratelimit.acquire(HOOK_ID, now=self.now + 0.5), 1.5, places=3)
+
+    def test_next_window_replaces(self):
+        ratelimit.update_from_headers(HOOK_ID, _headers(0, 2), now=self.now)
+        ratelimit.update_from_headers(HOOK_ID, _headers(4, 2), now=self.now + 3)
+
+        self.assertEqual(ratelimit.acquire(HOOK_ID, now=self.now + 3.1), 0)
+
+    def test_shared_bucket(self):
+        ratelimit.update_from_headers(OTHER_HOOK_ID, _headers(5, 2, BUCKET), now=self.now)
+        ratelimit.update_from_headers(HOOK_ID, _headers(0, 1.9, BUCKET), now=self.now + 0.1)
+
+        self.assertAlmostEqual(ratelimit.acquire(OTHER_HOOK_ID, now=self.now + 0.5), 1.5, places=3)
+
+    def test_bad_headers_are_ignored(self):
+        ratelimit.update_from_headers(HOOK_ID, {}, now=self.now)
+        ratelimit.update_from_headers(HOOK_ID, _headers("x", 2), now=self.now)
+
+        self.assertEqual(ratelimit.acquire(HOOK_ID, now=self.now), 0)
+
+    def test_global_limit(self):
+        for _ in range(CT_PINGER_GLOBAL_RATE_LIMIT):
+            self.assertEqual(ratelimit.acquire(HOOK_ID, now=self.now), 0)
+
+        self.assertAlmostEqual(
+            ratelimit.acquire(OTHER_HOOK_ID, now=self.now), 1 / CT_PINGER_GLOBAL_RATE_LIMIT, places=3
+        )
+        self.assertEqual(ratelimit.acquire(OTHER_HOOK_ID, now=self.now + 1), 0)
+
+    def test_block_global(self):
+        ratelimit.block_global(10, now=self.now)
+
+        self.assertAlmostEqual(ratelimit.acquire(HOOK_ID, now=self.now), 10, places=3)
+        self.assertEqual(ratelimit.acquire(HOOK_ID, now=self.now + 11), 0)
@@ -0,0 +1,71 @@
+import random
+
+from django.test import SimpleTestCase, TestCase
+
+from pinger import routing
+from pinger.models import DiscordWebhook, PingType
+from pinger.providers import cache_client
+
+
+class TestRouteIndex(SimpleTestCase):
+
+    def test_targets_match_every_route(self):
+        rng = random.Random(1)
+        ids = range(1, 6)
+
+        def _filter():
+            return rng.sample(ids, rng.randint(0, 2))
+
+        for _ in range(20):
+            routes = [
+                routing.Route(hook_id, _filter(), _filter(), _filter())
+                for hook_id in range(rng.randint(0, 8))
+            ]
+            index = routing.RouteIndex(routes)
+            for _ in range(50):
+                # None is a ping without that filter, 6 is in nobody's filters
+                ping = [rng.choice([None, 6, *ids]) for _ in range(3)]
+                self.assertEqual(
+                    index.targets(*ping),
+                    {r.hook_id for r in routes if r.matches(*ping)},
+                    msg=f"{routes} {ping}",
+                )
+
+
+class TestInvalidation(TestCase):
+
+    def setUp(self):
+        cache_client.delete(routing.TABLE_KEY, routing.VERSION_KEY)
+        routing.invalidate()
+        self.ping_type = PingType.objects.create(name="Test Ping", class_tag="TestPing")
+
+    def tearDown(self):
+        cache_client.delete(routing.TABLE_KEY, routing.VERSION_KEY)
+        routing.invalidate()
+
+    def test_ping_types_changed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            hook = DiscordWebhook.objects.create(discord_webhook="https://example.com/hook")
+        self.assertEqual(routing.get_targets("TestPing", None, None, None), [])
+
+        version = routing._get_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            hook.ping_types.add(self.ping_type)
+        self.assertGreater(routing._get_version(), version)
+        self.assertEqual(routing.get_targets("TestPing", None, None, None), [hook.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            hook.ping_types.remove(self.ping_type)
+        self.assertEqual(routing.get_targets("TestPing", None, None, None), [])
+
+    def test_waits_for_the_commit(self):
+        hook = DiscordWebhook.objects.create(discord_webhook="https://example.com/hook")
+        version = routing._get_version()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            hook.ping_types.add(self.ping_type)
+        self.assertEqual(routing._get_version(), version)
+
+        for callback in callbacks:
+            callback()
+        self.assertGreater(routing._get_version(), version)
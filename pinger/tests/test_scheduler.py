@@ -0,0 +1,138 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from pinger import scheduler
+from pinger.providers import cache_client
+
+WINDOW = 600
+
+
+def _worst_gap(place, size=6, cycles=5):
+    """
+    Poll a corp whose characters all expire within a few seconds of each other
+    and return the longest time it went without an update once settled.
+    """
+    dues = {c: c * 2 for c in range(size)}
+    polls = []
+    for _ in range(size * cycles):
+        character = min(dues, key=dues.get)
+        polled = dues.pop(character)
+        polls.append(polled)
+        dues[character] = place(polled + WINDOW + 1, dues.values(), WINDOW / size)
+    polls = polls[size * 2:]
+    return max(b - a for a, b in zip(polls, polls[1:]))
+
+
+class TestFindSlot(SimpleTestCase):
+
+    def test_free_slot_is_kept(self):
+        self.assertEqual(scheduler.find_slot(500, [100, 200], 100), 500)
+
+    def test_pushed_past_neighbours(self):
+        self.assertEqual(scheduler.find_slot(110, [100, 200], 100), 300)
+
+    def test_hot_corp_gap_is_a_share_of_the_window(self):
+        # rescheduled at their own expiry the clump never breaks up
+        clumped = _worst_gap(lambda earliest, dues, spacing: earliest)
+        spread = _worst_gap(scheduler.find_slot)
+
+        self.assertGreater(clumped, WINDOW - 20)
+        self.assertLessEqual(spread, WINDOW / 6 + 1)
+
+
+def _clear():
+    cache_client.delete(
+        scheduler.SCHEDULE_KEY,
+        scheduler.CORP_SIZE_KEY,
+        scheduler.INDEXED_KEY,
+        scheduler._build_corp_key(1),
+        scheduler._build_corp_key(2),
+    )
+
+
+class TestCorporationSchedule(SimpleTestCase):
+
+    def setUp(self):
+        _clear()
+
+    def tearDown(self):
+        _clear()
+
+    def test_sync_keeps_slots_and_drops_leavers(self):
+        scheduler.sync_corporation(1, [10, 11], due=100)
+        scheduler.sync_corporation(2, [20], due=100)
+        scheduler.schedule(1, 10, 500)
+
+        scheduler.sync_corporation(1, [10, 12], due=200)
+
+        self.assertEqual(scheduler.get_corporation_schedule(1), {10: 500, 12: 200})
+        self.assertEqual(scheduler.get_corporation_schedule(2), {20: 100})
+        self.assertEqual(scheduler.get_corporation_size(1), 2)
+
+    def test_prune(self):
+        scheduler.sync_corporation(1, [10, 11], due=100)
+        scheduler.sync_corporation(2, [20], due=100)
+
+        self.assertEqual(scheduler.prune_corporations([2]), 2)
+        self.assertEqual(scheduler.get_corporation_schedule(1), {})
+        self.assertEqual(scheduler.get_schedule_size(), 1)
+
+    def test_schedule_from_before_the_index(self):
+        cache_client.zadd(scheduler.SCHEDULE_KEY, {"1:10": 100, "1:11": 100, "2:20": 100})
+
+        scheduler.sync_corporation(1, [10], due=200)
+
+        self.assertEqual(scheduler.get_corporation_schedule(1), {10: 100})
+        self.assertEqual(scheduler.get_corporation_schedule(2), {20: 100})
+
+
+class TestClaimDue(SimpleTestCase):
+
+    def setUp(self):
+        _clear()
+
+    def tearDown(self):
+        _clear()
+
+    def test_claims_due_and_leases_them(self):
+        now = 1000000
+        scheduler.sync_corporation(1, [10, 11, 12], due=now - 10)
+        scheduler.schedule(1, 12, now + 100)
+
+        self.assertEqual(sorted(scheduler.claim_due(now=now)), [(1, 10), (1, 11)])
+        # leased, nobody else gets them
+        self.assertEqual(scheduler.claim_due(now=now + 1), [])
+        # a lost task only holds them until the lease runs out
+        self.assertEqual(
+            sorted(scheduler.claim_due(now=now + scheduler.CLAIM_LEASE_SECONDS + 1)),
+            [(1, 10), (1, 11), (1, 12)],
+        )
+
+    def test_limit(self):
+        now = 1000000
+        scheduler.sync_corporation(1, list(range(10)), due=now - 10)
+
+        self.assertEqual(scheduler.claim_due(limit=0, now=now), [])
+        self.assertEqual(scheduler.claim_due(limit=-5, now=now), [])
+        self.assertEqual(len(scheduler.claim_due(limit=4, now=now)), 4)
+        self.assertEqual(len(scheduler.claim_due(limit=4, now=now)), 4)
+        self.assertEqual(len(scheduler.claim_due(limit=4, now=now)), 2)
+
+    def test_concurrent_claims_never_overlap(self):
+        now = 1000000
+        scheduler.sync_corporation(1, list(range(200)), due=now - 10)
+        results = []
+
+        def claim():
+            results.append(scheduler.claim_due(limit=7, now=now))
+
+        threads = [threading.Thread(target=claim) for _ in range(40)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        claimed = [pair for result in results for pair in result]
+        self.assertEqual(len(claimed), 200)
+        self.assertEqual(len(set(claimed)), 200)
@@ -0,0 +1,51 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from pinger import staging, tasks
+from pinger.providers import cache_client
+
+CHARACTER_ID = 1
+STAGED_ID = 800001
+EXPIRED_ID = 800002
+
+
+def _note(notification_id):
+    # too old to ping, only the staging round trip matters here
+    return {
+        "notification_id": notification_id,
+        "type": "StructureUnderAttack",
+        "text": "text: 1",
+        "timestamp": timezone.now() - datetime.timedelta(days=7),
+    }
+
+
+@mock.patch("pinger.tasks.CharacterAudit")
+class TestStaging(TestCase):
+
+    def setUp(self):
+        staging.stage([_note(STAGED_ID)])
+        tasks._set_last_cache_etag(CHARACTER_ID, "old")
+
+    def tearDown(self):
+        cache_client.delete(
+            staging._build_note_key(STAGED_ID), staging._build_note_key(EXPIRED_ID)
+        )
+
+    def test_load_reports_expired(self, character_audit):
+        notes, missing = staging.load([STAGED_ID, EXPIRED_ID])
+
+        self.assertEqual([n["notification_id"] for n in notes], [STAGED_ID])
+        self.assertEqual(missing, [EXPIRED_ID])
+
+    def test_etag_stored_once_processed(self, character_audit):
+        tasks._process_notifications(CHARACTER_ID, [STAGED_ID], etag="new")
+
+        self.assertEqual(tasks._get_last_cache_etag(CHARACTER_ID), "new")
+
+    def test_expired_keeps_the_old_etag(self, character_audit):
+        tasks._process_notifications(CHARACTER_ID, [STAGED_ID, EXPIRED_ID], etag="new")
+
+        self.assertEqual(tasks._get_last_cache_etag(CHARACTER_ID), "old")
@@ -0,0 +1,82 @@
+import datetime
+
+from django.test import SimpleTestCase
+
+from pinger.notifications.base import NotificationPing, get_available_types
+from pinger.notifications.templates import EmbedTemplate, Field, encode
+
+
+class _Notification:
+    timestamp = datetime.datetime(
+        2024, 1, 2, 3, 4, 5, 678, tzinfo=datetime.timezone.utc
+    )
+
+
+class TestTemplates(SimpleTestCase):
+
+    def test_matches_package_ping(self):
+        ping = NotificationPing.__new__(NotificationPing)
+        ping._notification = _Notification()
+        footer = {"icon_url": "https://example.com/logo", "text": "Corp ü (TCK)"}
+        fields = [
+            {"name": "System", "value": "[Jita](https://example.com)", "inline": True},
+            {"name": "Date Out", "value": "2024-01-02 03:04", "inline": False},
+        ]
+        ping.package_ping(
+            "Name ☃",
+            'Body "quoted"',
+            ping._notification.timestamp,
+            fields=fields,
+            footer=footer,
+            img_url="https://example.com/icon",
+            colour=1752220,
+        )
+        expected = ping._ping
+
+        template = EmbedTemplate(
+            1752220,
+            (Field("System", "system"), Field("Date Out", "date_out", inline=False)),
+            'Body "quoted"',
+        )
+        ping.render_template(
+            template,
+            "Name ☃",
+            {"system": fields[0]["value"], "date_out": fields[1]["value"]},
+            footer=encode(footer),
+            img_url="https://example.com/icon",
+        )
+        self.assertEqual(ping._ping, expected)
+
+    def test_every_template_matches_package_ping(self):
+        footer = {"icon_url": "https://example.com/logo", "text": "Corp (TCK)"}
+        templated = [
+            (name, ping_class.template)
+            for name, ping_class in get_available_types().items()
+            if getattr(ping_class, "template", None) is not None
+        ]
+        self.assertGreater(len(templated), 15)
+
+        for name, template in templated:
+            with self.subTest(name):
+                values = {f.key: f"{f.key} ü" for f in template.fields}
+                description = template.description or "Under Attack!"
+                ping = NotificationPing.__new__(NotificationPing)
+                ping._notification = _Notification()
+                ping.package_ping(
+                    name,
+                    description,
+                    ping._notification.timestamp,
+                    fields=[
+                        {"name": f.name, "value": values[f.key], "inline": f.inline}
+                        for f in template.fields
+                    ],
+                    footer=footer,
+                    colour=template.colour,
+                )
+                expected = ping._ping
+
+                ping.render_template(
+                    template, name, values, description=description,
+                    footer=encode(footer),
+                )
+                self.assertEqual(ping._ping, expected)
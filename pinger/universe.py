@@ -0,0 +1,148 @@
+"""
+Process local copy of the map.
+
+Systems, constellations and regions come from the SDE and don't change, so
+every process loads them once into small `__slots__` objects shaped like the
+corptools models (`system.constellation.region.name`). The copy is only
+reloaded when `python manage.py pinger_universe_reload` bumps the version in
+redis.
+"""
+import logging
+import threading
+import time
+
+from .providers import cache_client
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "ct-pinger-universe-version"
+
+# how often each process checks redis for a reload
+VERSION_CHECK_SECONDS = 60
+
+
+class RegionInfo:
+    __slots__ = ("region_id", "name")
+
+    def __init__(self, region_id, name):
+        self.region_id = region_id
+        self.name = name
+
+
+class ConstellationInfo:
+    __slots__ = ("constellation_id", "name", "region")
+
+    def __init__(self, constellation_id, name, region):
+        self.constellation_id = constellation_id
+        self.name = name
+        self.region = region
+
+    @property
+    def region_id(self):
+        return self.region.region_id if self.region else None
+
+
+class SystemInfo:
+    __slots__ = ("system_id", "name", "constellation")
+
+    def __init__(self, system_id, name, constellation):
+        self.system_id = system_id
+        self.name = name
+        self.constellation = constellation
+
+    def __str__(self):
+        return self.name
+
+
+_systems = None
+_version = None
+_checked_at = 0
+_lock = threading.Lock()
+
+
+def _get_version():
+    version = cache_client.get(VERSION_KEY)
+    return int(version) if version else 0
+
+
+def _load():
+    from corptools.models import MapConstellation, MapRegion, MapSystem
+
+    regions = {
+        region_id: RegionInfo(region_id, name)
+        for region_id, name in MapRegion.objects.values_list("region_id", "name")
+    }
+    constellations = {
+        constellation_id: ConstellationInfo(
+            constellation_id, name, regions.get(region_id)
+        )
+        for constellation_id, name, region_id in MapConstellation.objects.values_list(
+            "constellation_id", "name", "region_id"
+        )
+    }
+    return {
+        system_id: SystemInfo(system_id, name, constellations.get(constellation_id))
+        for system_id, name, constellation_id in MapSystem.objects.values_list(
+            "system_id", "name", "constellation_id"
+        )
+    }
+
+
+def _get_systems():
+    global _systems, _version, _checked_at
+    now = time.monotonic()
+    if _systems is not None and now - _checked_at < VERSION_CHECK_SECONDS:
+        return _systems
+
+    with _lock:
+        if _systems is not None and now - _checked_at < VERSION_CHECK_SECONDS:
+            return _systems
+        version = _get_version()
+        if _systems is None or version != _version:
+            start = time.perf_counter()
+            _systems = _load()
+            logger.info(
+                f"PINGER: Loaded {len(_systems)} Systems (v{version}) "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+            _version = version
+        _checked_at = now
+    return _systems
+
+
+def warm():
+    _get_systems()
+
+
+def reload():
+    """Tell every process to reload the map on its next version check."""
+    return cache_client.incr(VERSION_KEY)
+
+
+def _system_from_db(system_id):
+    from corptools.models import MapSystem
+
+    system = MapSystem.objects.select_related("constellation__region").get(
+        system_id=system_id
+    )
+    region = system.constellation.region
+    return SystemInfo(
+        system.system_id,
+        system.name,
+        ConstellationInfo(
+            system.constellation.constellation_id,
+            system.constellation.name,
+            RegionInfo(region.region_id, region.name),
+        ),
+    )
+
+
+def get_system(system_id):
+    """`SystemInfo` for a system, raises `MapSystem.DoesNotExist` if unknown."""
+    systems = _get_systems()
+    system = systems.get(int(system_id))
+    if system is None:
+        # loaded since we warmed up?
+        system = _system_from_db(system_id)
+        systems[system.system_id] = system
+    return system